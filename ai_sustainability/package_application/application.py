@@ -2,10 +2,14 @@
 File with our Application class
 """
 
+import asyncio
+from functools import partial
 from typing import Optional, Tuple
 
 from decouple import config
 
+from ai_sustainability.package_application.cache import CacheStats, TTLCache
+from ai_sustainability.package_business.ai_statistics import AiStatistics
 from ai_sustainability.package_business.launch_mlflow import MlFlow
 from ai_sustainability.package_business.models import (
     AnswersStats,
@@ -15,7 +19,24 @@ from ai_sustainability.package_business.models import (
     UserFeedback,
     Username,
 )
-from ai_sustainability.package_data_access.db_connection import DbConnection
+from ai_sustainability.package_data_access.best_ais_table import BestAisTable
+from ai_sustainability.package_data_access.consistency import ConsistencyStats
+from ai_sustainability.package_data_access.db_interface import (
+    AsyncDBInterface,
+    DBInterface,
+)
+from ai_sustainability.package_data_access.query_metrics import (
+    QueryMetrics,
+    tag_queries,
+)
+
+CACHE_TTLS = {  # Time to live (in seconds) of the cached lookups
+    "ai_statistics": 3600.0,  # Updated in place by save_answers, rebuilt to get the changes of the other instances
+    "all_ais": 3600.0,  # Only changes when the graph is imported again
+    "all_users": 300.0,
+    "nb_users": 300.0,
+    "forms_names": 300.0,
+}
 
 
 class Application:
@@ -30,8 +51,12 @@ class Application:
         - get_all_users
         - get_all_forms_names
         - get_previous_form
+        - get_previous_form_and_best_ais
         - get_all_feedbacks
+        - get_feedbacks_page
+        - get_nb_users
         - get_nb_selected_edge_stats
+        - get_ai_statistics
         - user_exist
         - form_exist
         - save_answers
@@ -39,12 +64,25 @@ class Application:
         - create_experiment
         - get_experiment_id
         - change_experiment_name
+        - get_query_metrics
+        - get_consistency_stats
+        - get_cache_stats
     """
 
-    def __init__(self, database: DbConnection) -> None:
+    def __init__(
+        self,
+        database: DBInterface,
+        async_database: Optional[AsyncDBInterface] = None,
+        cache: Optional[TTLCache] = None,
+        best_ais_table: Optional[BestAisTable] = None,
+    ) -> None:
         self.database = database
+        self.async_database = async_database
+        self.cache = TTLCache(CACHE_TTLS) if cache is None else cache
+        self.best_ais_table = best_ais_table
         self.mlflow = MlFlow()
 
+    @tag_queries
     def get_next_question(self, form: Form, question_number: int) -> Question:
         """
         Get the next question
@@ -58,44 +96,98 @@ class Application:
         """
         return self.database.get_next_question(form, question_number)
 
+    @tag_queries
     def calcul_best_ais(self, form: Form) -> list[Tuple[str, float]]:
         """
         Calculate the name best AI to use for the user
+        (with a lookup in the precomputed table of the paths of the Form if the table was built from the actual graph)
         """
-        list_ai = self.database.get_all_ais()  # We get all existing AIs
+        list_ai = self.cache.get(("all_ais",), self.database.get_all_ais)  # We get all existing AIs
         nb_ai = int(config("NBEST_AI"))
-        return form.calcul_best_ais(nb_ai=nb_ai, list_ai=list_ai)
+        table = self.best_ais_table
+        if (
+            table is not None
+            and (table.list_ai, table.nb_ai) == (list_ai, nb_ai)
+            and table.version == self.database.get_question_graph().version
+        ):
+            best_ais = table.lookup(form)
+            if best_ais is not None:
+                return best_ais
+        # The coefficients not loaded yet are loaded with one query for all the answers of the Form
+        answers_id = [answer.answer_id for question in form.question_list for answer in question.choosen_answers]
+        coefficients = self.database.get_coefficients(answers_id)
+        return form.calcul_best_ais(nb_ai=nb_ai, list_ai=list_ai, coefficients=coefficients)
 
+    @tag_queries
     def get_best_ais(self, username: Username, form_name: str) -> list[str]:
         """
         Method used to retreive all the N_best Ais stored in a answer
         """
         return self.database.get_best_ais(username, form_name)
 
+    @tag_queries
     def get_all_users(self) -> list[Username]:
         """
         Return all users in the database
         """
-        return self.database.get_all_users()
+        return list(self.cache.get(("all_users",), self.database.get_all_users))
 
+    @tag_queries
     def get_all_forms_names(self, username: Username) -> list[str]:
         """
         Get all names of the forms of a user
         """
-        return self.database.get_all_forms_names(username)
+        return list(self.cache.get(("forms_names", username), partial(self.database.get_all_forms_names, username)))
 
+    @tag_queries
     def get_previous_form(self, username: Username, selected_form: str) -> Form:
         """
         Get a already completed Form stord in the DB
         """
         return self.database.retrieve_previous_form(username, selected_form)
 
+    @tag_queries
+    def get_previous_form_and_best_ais(self, username: Username, selected_form: str) -> Tuple[Form, list[str]]:
+        """
+        Get a already completed Form stored in the DB and its best AIs
+        The two queries run concurrently if the Application has an async database
+        """
+        if self.async_database is None:
+            return self.get_previous_form(username, selected_form), self.get_best_ais(username, selected_form)
+        return asyncio.run(self._get_previous_form_and_best_ais(self.async_database, username, selected_form))
+
+    @staticmethod
+    async def _get_previous_form_and_best_ais(
+        async_database: AsyncDBInterface, username: Username, selected_form: str
+    ) -> Tuple[Form, list[str]]:
+        previous_form, best_ais = await asyncio.gather(
+            async_database.retrieve_previous_form(username, selected_form),
+            async_database.get_best_ais(username, selected_form),
+        )
+        return previous_form, best_ais
+
+    @tag_queries
     def get_all_feedbacks(self) -> list[UserFeedback]:
         """
         Return all feedbacks from all users in the database
         """
         return self.database.get_all_feedbacks()
 
+    @tag_queries
+    def get_feedbacks_page(self, offset: int, limit: int) -> list[UserFeedback]:
+        """
+        Return the feedbacks of the users number offset to offset+limit (ordered by username)
+        """
+        return self.database.get_feedbacks_page(offset, limit)
+
+    @tag_queries
+    def get_nb_users(self) -> int:
+        """
+        Return the number of users in the database
+        """
+        return self.cache.get(("nb_users",), self.database.get_nb_users)
+
+    @tag_queries
     def get_nb_selected_answer_stats(self) -> list[AnswersStats]:
         """
         Return a list with all existing edges and the number of time they had been selected
@@ -103,18 +195,33 @@ class Application:
         """
         return self.database.get_nb_selected_edge()
 
+    @tag_queries
+    def get_ai_statistics(self) -> AiStatistics:
+        """
+        Return the statistics of the AIs recommended to all stored forms (number of recommendations by AI and by rank)
+        They are built from one bulk fetch of the best AIs of all forms, then updated in place by save_answers
+        """
+        return self.cache.get(("ai_statistics",), self._load_ai_statistics)
+
+    def _load_ai_statistics(self) -> AiStatistics:
+        list_ai = self.cache.get(("all_ais",), self.database.get_all_ais)
+        return AiStatistics.from_forms(list_ai, int(config("NBEST_AI")), self.database.get_all_best_ais())
+
+    @tag_queries
     def user_exist(self, username: Username) -> bool:
         """
         Check if a User exist for a specific user in the database
         """
         return self.database.check_node_exist(username)
 
+    @tag_queries
     def form_exist(self, username: Username, form_name: str) -> bool:
         """
         Check if a Form exist for a specific user in the database
         """
         return self.database.check_node_exist(f"{username}-answer1-{form_name}")
 
+    @tag_queries
     def save_answers(
         self, form: Form, list_best_ai: list[Tuple[str, float]], mlflow_id: Optional[str] = "", new_form_name: str = ""
     ) -> bool:
@@ -131,8 +238,21 @@ class Application:
         """
         if new_form_name and form.username is not None and form.experiment_id is not None:
             self.change_experiment_name(form.username, form.form_name, new_form_name)
-        return self.database.save_answers(form, list_best_ai, mlflow_id, new_form_name)
+        previous_form_name = form.form_name
+        saved = self.database.save_answers(form, list_best_ai, mlflow_id, new_form_name)
+        # The save can create the user node, a new form or rename a form
+        self.cache.invalidate(("forms_names", form.username))
+        self.cache.invalidate(("all_users",))
+        self.cache.invalidate(("nb_users",))
+        ai_statistics = self.cache.peek(("ai_statistics",))
+        if ai_statistics is not None and form.username is not None:
+            if new_form_name:  # The previous version of the form is dropped
+                ai_statistics.remove_form((form.username, previous_form_name))
+            if saved:
+                ai_statistics.set_form((form.username, form.form_name), [name for name, _ in list_best_ai])
+        return saved
 
+    @tag_queries
     def save_feedback(self, username: Username, feedback: Feedback) -> None:
         """
         Save a feedback from a user in the database
@@ -148,10 +268,12 @@ class Application:
         name = "experiment-" + username + "-" + form_name
         return self.mlflow.create_experiment(name, description)
 
+    @tag_queries
     def get_experiment_id(self, username: Username, form_name: str) -> Optional[str]:
         experiment_id = self.database.get_experiment_id(username, form_name)
         return experiment_id[0] if experiment_id else None
 
+    @tag_queries
     def change_experiment_name(self, username: Username, old_form_name: str, new_form_name: str) -> Optional[str]:
         """method used to change the name of an mlflow experiment and return the corresponding ID"""
         experiment_id = self.get_experiment_id(username, old_form_name)
@@ -159,3 +281,21 @@ class Application:
             return None
         new_experiment_name = "experiment-" + username + "-" + new_form_name
         return self.mlflow.change_experiment_name(experiment_id, new_experiment_name)
+
+    def get_query_metrics(self) -> QueryMetrics:
+        """
+        Return the cost of the queries sent to the database (latency, result size, request charge) by Application method
+        """
+        return self.database.get_query_metrics()
+
+    def get_consistency_stats(self) -> ConsistencyStats:
+        """
+        Return how often a write needed a retry to be visible in the database (since the start of the app)
+        """
+        return self.database.get_consistency_stats()
+
+    def get_cache_stats(self) -> dict[str, CacheStats]:
+        """
+        Return the hits and misses of the cache by lookup (Exemple : "all_ais")
+        """
+        return self.cache.stats
@@ -0,0 +1,130 @@
+"""
+File with the TTLCache class, used by the Application to keep the result of read-mostly lookups
+(Exemple : the list of all AIs) instead of querying the database at each rerun of a page
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+# The first element of a key is the name of the lookup (Exemple : ("forms_names", "bob"))
+CacheKey = Tuple[Hashable, ...]
+
+
+@dataclass
+class CacheStats:
+    """Dataclass with the counters of one lookup of the cache"""
+
+    nb_hits: int = 0
+    nb_misses: int = 0
+    nb_invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        nb_calls = self.nb_hits + self.nb_misses
+        return self.nb_hits / nb_calls if nb_calls else 0.0
+
+
+class TTLCache:
+    """
+    Class used to cache the result of lookups with a time to live by lookup name, the entries can also be invalidated
+    explicitly (Exemple : when the Application saves a form)
+    The cache is shared by all streamlit sessions, so it is protected by a lock
+    The number of entries is bounded : when the cache is full, the expired entries are removed, then the least
+    recently used ones
+
+    Parameters :
+        - ttls : time to live (in seconds) of the entries of each lookup (Exemple : {"all_ais": 3600.0})
+        - default_ttl : time to live of the entries of the lookups not in ttls
+        - clock : function returning the current time in seconds
+        - max_size : maximal number of entries
+
+    Methods :
+        - get : return the cached value of a key, or load and cache it
+        - peek : return the cached value of a key if it is cached (without loading it)
+        - invalidate : remove one key, or all keys of a lookup
+        - clear
+        - stats : counters (hits, misses, invalidations) of each lookup, a copy
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[dict[str, float]] = None,
+        default_ttl: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        max_size: int = 1024,
+    ) -> None:
+        self.ttls = {} if ttls is None else ttls
+        self.default_ttl = default_ttl
+        self.max_size = max_size
+        self._clock = clock
+        # key -> (expiration time, value), from the least to the most recently used
+        self._entries: OrderedDict[CacheKey, Tuple[float, Any]] = OrderedDict()
+        self._stats: dict[str, CacheStats] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: CacheKey, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value of key, or call loader and cache its result if the key is missing or expired
+
+        Parameters :
+            - key : tuple whose first element is the name of the lookup (Exemple : ("forms_names", "bob"))
+            - loader : function returning the value (Exemple : lambda: database.get_all_forms_names("bob"))
+        """
+        name = str(key[0])
+        with self._lock:
+            stats = self._stats.setdefault(name, CacheStats())
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                stats.nb_hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            stats.nb_misses += 1
+        # The loader runs outside of the lock, so a slow query does not block the other sessions
+        value = loader()
+        with self._lock:
+            self._entries.pop(key, None)
+            if len(self._entries) >= self.max_size:
+                self._evict()
+            self._entries[key] = (self._clock() + self.ttls.get(name, self.default_ttl), value)
+        return value
+
+    def _evict(self) -> None:
+        """Remove the expired entries, then the least recently used ones until there is room for a new entry"""
+        now = self._clock()
+        for expired_key in [key for key, (expiration, _) in self._entries.items() if expiration <= now]:
+            del self._entries[expired_key]
+        while len(self._entries) >= self.max_size:
+            self._entries.popitem(last=False)
+
+    def peek(self, key: CacheKey) -> Optional[Any]:
+        """
+        Return the cached value of key, None if the key is missing or expired (the counters are not changed), used to
+        update a cached value in place (Exemple : the statistics of the AIs when a form is saved)
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None and entry[0] > self._clock() else None
+
+    def invalidate(self, key: CacheKey) -> None:
+        """
+        Remove a key from the cache, a key with only the name of the lookup (Exemple : ("forms_names",)) removes
+        all keys of this lookup
+        """
+        name = str(key[0])
+        with self._lock:
+            keys = [cached_key for cached_key in self._entries if cached_key[: len(key)] == key]
+            for cached_key in keys:
+                del self._entries[cached_key]
+            self._stats.setdefault(name, CacheStats()).nb_invalidations += len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = OrderedDict()
+
+    @property
+    def stats(self) -> dict[str, CacheStats]:
+        with self._lock:
+            return {name: replace(stats) for name, stats in self._stats.items()}
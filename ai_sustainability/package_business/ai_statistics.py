@@ -0,0 +1,122 @@
+"""
+NO DB/NO STREAMLIT
+
+File with the class AiStatistics, the statistics of the AIs recommended to all stored forms (how often each AI is
+recommended and at which rank), built once from the best AIs of all forms and then updated form by form
+"""
+
+import threading
+from typing import Mapping, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+FormKey = Tuple[str, str]  # (username, form name)
+
+
+class AiStatistics:
+    """
+    Class with the number of forms recommending each AI at each rank (the best AIs of a form are ranked)
+    The statistics are shared by all streamlit sessions, so the updates are protected by a lock
+
+    Parameters :
+        - list_ai : the names of the AIs (the AIs of a form which are not in list_ai are ignored)
+        - nb_ranks : number of ranks counted (Exemple : int(config("NBEST_AI")))
+
+    Methods :
+        - from_forms : build the statistics of many forms at once
+        - set_form : add (or replace) the best AIs of one form
+        - remove_form : remove one form
+        - nb_forms
+        - rank_histogram : (AIs x ranks) number of forms recommending each AI at each rank
+        - summary : one row by AI (number of recommendations, share of the forms, mean rank, count by rank)
+    """
+
+    def __init__(self, list_ai: Sequence[str], nb_ranks: int) -> None:
+        self.list_ai = list(list_ai)
+        self.nb_ranks = nb_ranks
+        self._ai_index = {name: index for index, name in enumerate(self.list_ai)}
+        self._rank_histogram = np.zeros((len(self.list_ai), nb_ranks), dtype=np.int64)
+        self._forms: dict[FormKey, Tuple[str, ...]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_forms(
+        cls, list_ai: Sequence[str], nb_ranks: int, forms_best_ais: Mapping[FormKey, Sequence[str]]
+    ) -> "AiStatistics":
+        """
+        Build the statistics of many forms with one vectorized count
+
+        Parameters :
+            - list_ai : the names of the AIs
+            - nb_ranks : number of ranks counted
+            - forms_best_ais : the names of the best AIs of each form, by (username, form name)
+        """
+        statistics = cls(list_ai, nb_ranks)
+        statistics._forms = {form_key: tuple(best_ais) for form_key, best_ais in forms_best_ais.items()}
+        statistics._count(statistics._forms.values(), 1)
+        return statistics
+
+    def _count(self, forms_best_ais: Sequence[Tuple[str, ...]], sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) the best AIs of some forms to the rank histogram"""
+        positions = [
+            (self._ai_index[name], rank)
+            for best_ais in forms_best_ais
+            for rank, name in enumerate(best_ais[: self.nb_ranks])
+            if name in self._ai_index
+        ]
+        if positions:
+            ai_indexes, ranks = np.array(positions).T
+            np.add.at(self._rank_histogram, (ai_indexes, ranks), sign)
+
+    def set_form(self, form_key: FormKey, best_ais: Sequence[str]) -> None:
+        """
+        Add the best AIs of a form (Exemple : a form just saved), the previous best AIs of the form are replaced
+        """
+        with self._lock:
+            if form_key in self._forms:
+                self._count([self._forms[form_key]], -1)
+            self._forms[form_key] = tuple(best_ais)
+            self._count([self._forms[form_key]], 1)
+
+    def remove_form(self, form_key: FormKey) -> None:
+        with self._lock:
+            if form_key in self._forms:
+                self._count([self._forms.pop(form_key)], -1)
+
+    @property
+    def nb_forms(self) -> int:
+        with self._lock:
+            return len(self._forms)
+
+    @property
+    def rank_histogram(self) -> np.ndarray:
+        return self._snapshot()[0]
+
+    def _snapshot(self) -> Tuple[np.ndarray, int]:
+        """Copy the rank histogram and the number of forms together, so a concurrent update is never half seen"""
+        with self._lock:
+            return self._rank_histogram.copy(), len(self._forms)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        Return :
+            - a DataFrame with one row by AI, sorted by number of recommendations, with the columns :
+                ai, nb_recommendations, share_of_forms, mean_rank (the best AI has the rank 1), rank_1 ... rank_n
+        """
+        histogram, nb_forms = self._snapshot()
+        nb_recommendations = histogram.sum(axis=1)
+        rank_sums = histogram @ np.arange(1, self.nb_ranks + 1)
+        summary = pd.DataFrame(
+            {
+                "ai": self.list_ai,
+                "nb_recommendations": nb_recommendations,
+                "share_of_forms": nb_recommendations / nb_forms if nb_forms else 0.0,
+                "mean_rank": np.divide(
+                    rank_sums, nb_recommendations, out=np.full(len(self.list_ai), np.nan), where=nb_recommendations > 0
+                ),
+            }
+        )
+        for rank in range(self.nb_ranks):
+            summary[f"rank_{rank + 1}"] = histogram[:, rank]
+        return summary.sort_values("nb_recommendations", ascending=False, kind="stable").reset_index(drop=True)
@@ -27,7 +27,7 @@ class Business:
         raw_coef_ai = np.array([1.0] * len(list_ai))
         for answer_list in form_answers:
             for answer in answer_list:
-                if answer.list_coef:
+                if len(answer.list_coef):
                     raw_coef_ai = np.multiply(raw_coef_ai, np.array(answer.list_coef))
         # we put all NaN value to -1
         coef_ai = [-1 if math.isnan(coef) else coef for coef in raw_coef_ai]
@@ -47,7 +47,7 @@ class Business:
         raw_coef_ai = np.array([1.0] * len(list_ai))
         for question in form.question_list:
             for answer in question.choosen_answers:
-                if answer.list_coef:
+                if len(answer.list_coef):
                     raw_coef_ai = np.multiply(raw_coef_ai, np.array(answer.list_coef))
         # we put all NaN value to -1
         coef_ai = [-1 if math.isnan(coef) else coef for coef in raw_coef_ai]
@@ -15,29 +15,36 @@ New models :
     - Form
 """
 
-import math
 from dataclasses import dataclass, field
-from typing import NewType, Optional, Tuple
+from typing import Mapping, NewType, Optional, Sequence, Tuple
 
 import numpy as np
 
-from ai_sustainability.utils import get_n_best
+from ai_sustainability.package_business.scoring import (
+    answers_log_scores,
+    best_ais_from_log_scores,
+)
 
 Username = NewType("Username", str)
 Query = NewType("Query", str)
 Feedback = NewType("Feedback", str)
 
 
-@dataclass(kw_only=True)
+@dataclass(frozen=True, slots=True, kw_only=True, eq=False)
 class Answer:
-    """Dataclass corresponding to one proposition for a question (an edge in the database)"""
+    """
+    Immutable dataclass corresponding to one proposition for a question (an edge in the database)
+    The Answers of the question graph are shared by all Forms (Exemple : list_coef is a row of the coefficient matrix of
+    the QuestionGraph), use dataclasses.replace to change an Answer (Exemple : the text of an open question)
+    Two Answers are equal (and have the same hash) if they are the same proposition, whatever their text
+    """
 
     answer_id: str
     text: str
     help_text: str = ""
     modif_crypted: bool = False
     metric: Optional[str] = None
-    list_coef: list[float] = field(default_factory=list)
+    list_coef: Sequence[float] = field(default=(), compare=False)
 
     @property
     def _question_in_id(self) -> str:
@@ -51,29 +58,33 @@ class Answer:
         return f"Q{self._question_in_id} to Q{self._question_out_id}"
 
     def __eq__(self, other: object) -> bool:
-        if isinstance(other, Answer):
-            if self.answer_id == other.answer_id or self.text == other.text:
-                return True
-        return False
+        return isinstance(other, Answer) and self.answer_id == other.answer_id
+
+    def __hash__(self) -> int:
+        return hash(self.answer_id)
 
     @classmethod
     def create_end_answer(cls) -> "Answer":
-        return Answer(answer_id="end", text="end", help_text="", modif_crypted=False, metric=None, list_coef=[])
+        return Answer(answer_id="end", text="end", help_text="", modif_crypted=False, metric=None, list_coef=())
 
 
 AnswersList = list[Answer]  # List of answers selected by the user in QuestionAnswer propositions
 AnswersStats = tuple[Answer, int]  # Answer and number of time it has been selected
 
 
-@dataclass
+@dataclass(slots=True)
 class Question:
-    """Dataclass corresponding to one question stored in the database (a vertice/node in the database)"""
+    """
+    Dataclass corresponding to one question stored in the database (a vertice/node in the database)
+    The possible answers are shared with the question graph, only the choosen answers belong to the Form
+    """
 
     question_id: str
     text: str
     type: str
-    _possible_answers: list[Answer] = field(default_factory=AnswersList)
+    _possible_answers: Sequence[Answer] = ()
     choosen_answers: AnswersList = field(default_factory=AnswersList)
+    _help_text: str = ""
 
     @property
     def help_text(self) -> str:
@@ -88,25 +99,21 @@ class Question:
         self._help_text = value
 
     @property
-    def possible_answers(self) -> list[Answer]:
+    def possible_answers(self) -> Sequence[Answer]:
         return self._possible_answers
 
     @possible_answers.setter
-    def possible_answers(self, answers_list: list[Answer]) -> None:
+    def possible_answers(self, answers_list: Sequence[Answer]) -> None:
         """Check that 2 Answer does not have the same text and set self.answers"""
         for i, answer_i in enumerate(answers_list):
             for j in range(i + 1, len(answers_list)):
-                if answer_i == answers_list[j]:
+                if answer_i.text == answers_list[j].text:
                     raise ValueError("A Question can not have 2 Answer with the same text")
         self._possible_answers = answers_list
 
     def maj_answers_crypted(self) -> None:
         """Only keep answers with modif_crypted == false"""
-        new_answers_list: list[Answer] = []
-        for answer in self.possible_answers:
-            if not answer.modif_crypted:
-                new_answers_list.append(answer)
-        self.possible_answers = new_answers_list
+        self._possible_answers = tuple(answer for answer in self.possible_answers if not answer.modif_crypted)
 
 
 @dataclass
@@ -119,13 +126,22 @@ class UserFeedback:
 
 @dataclass
 class Form:
-    """Dataclass corresponding to a Form completed by a user"""
+    """
+    Dataclass corresponding to a Form completed by a user
+    The log-scores of the AIs are kept up to date with the choosen answers : only the questions whose answers changed
+    since the last computation are added (and the answers of the dropped or changed questions are removed)
+    """
 
     username: Optional[Username] = None
     question_list: list[Question] = field(default_factory=list)
     form_name: str = ""
     already_completed: bool = False
     experiment_id: Optional[str] = None
+    _log_scores: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    # For each question : the ids of the answers counted in _log_scores and their contribution
+    _scored_answers: list[Tuple[Tuple[str, ...], np.ndarray]] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
 
     @property
     def last_question(self) -> Question:
@@ -162,15 +178,53 @@ class Form:
                 return True
         return False
 
-    def calcul_best_ais(self, nb_ai: int, list_ai: list[str]) -> list[Tuple[str, float]]:
-        raw_coef_ai = np.array([1.0] * len(list_ai))
-        for question in self.question_list:
-            for answer in question.choosen_answers:
-                if answer.list_coef:
-                    raw_coef_ai = np.multiply(raw_coef_ai, np.array(answer.list_coef))
-        # we put all NaN value to -1
-        coef_ai = [-1 if math.isnan(coef) else coef for coef in raw_coef_ai]
-        list_bests_ais = []
-        for index, ai_name in enumerate(list_ai):
-            list_bests_ais.append((ai_name, coef_ai[index]))
-        return get_n_best(nb_ai, list_bests_ais)
+    def calcul_best_ais(
+        self, nb_ai: int, list_ai: list[str], coefficients: Optional[Mapping[str, Sequence[float]]] = None
+    ) -> list[Tuple[str, float]]:
+        """
+        Get the nb_ai best AIs (with a positive score) according to the choosen answers, the score of an AI is the
+        product of its coefficients in all choosen answers (-1 if one of them is NaN)
+
+        Parameters :
+            - nb_ai : number of AIs returned
+            - list_ai : the names of the AIs
+            - coefficients : the coefficients by answer id, when the answers were loaded without them (see
+                DBInterface.get_coefficients), the list_coef of the answers are used by default
+        """
+        return best_ais_from_log_scores(self.update_log_scores(len(list_ai), coefficients), list_ai, nb_ai)
+
+    def update_log_scores(self, nb_ai: int, coefficients: Optional[Mapping[str, Sequence[float]]] = None) -> np.ndarray:
+        """
+        Update the log-scores with the answers changed since the last update, O(nb_ai) by changed question
+        The contribution of an unchanged question is not computed again, so the same coefficients have to be given at
+        each update
+
+        Parameters :
+            - nb_ai : number of AIs
+            - coefficients : the coefficients by answer id (the list_coef of the answers by default)
+
+        Return:
+            - the (3 x AIs) log-scores (see answers_log_scores)
+        """
+        if self._log_scores is None or self._log_scores.shape[1] != nb_ai:
+            self._log_scores = np.zeros((3, nb_ai))
+            self._scored_answers = []
+        scored_answers = []
+        for index, question in enumerate(self.question_list):
+            answers_id = tuple(answer.answer_id for answer in question.choosen_answers)
+            if index < len(self._scored_answers):
+                if self._scored_answers[index][0] == answers_id:
+                    scored_answers.append(self._scored_answers[index])
+                    continue
+                self._log_scores -= self._scored_answers[index][1]  # The answers of this question changed
+            answers_coefs = [
+                answer.list_coef if coefficients is None else coefficients.get(answer.answer_id, answer.list_coef)
+                for answer in question.choosen_answers
+            ]
+            contribution = answers_log_scores(answers_coefs, nb_ai)
+            self._log_scores += contribution
+            scored_answers.append((answers_id, contribution))
+        for _, contribution in self._scored_answers[len(self.question_list) :]:  # The dropped questions
+            self._log_scores -= contribution
+        self._scored_answers = scored_answers
+        return self._log_scores
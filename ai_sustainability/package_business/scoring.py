@@ -0,0 +1,145 @@
+"""
+NO DB/NO STREAMLIT
+
+Functions used to compute the scores of the AIs in log-space, incrementally for one form (Form.calcul_best_ais) or for
+many forms at once (Exemple : to refresh the best AIs of all stored forms after an update of the weight matrix) :
+the score of an AI is the product of its coefficients in all choosen answers (-1 if one of them is NaN)
+
+method:
+    - answers_log_scores
+    - scores_from_log_scores
+    - top_k
+    - best_ais_from_log_scores
+    - build_incidence_matrix
+    - batch_scores
+    - batch_best_ais
+"""
+
+from typing import Sequence, Tuple
+
+import numpy as np
+
+LOG_SCORE_DECIMALS = 12  # The log-scores are rounded before ranking, so equal products stay equal
+
+
+def answers_log_scores(list_coefs: Sequence[Sequence[float]], nb_ai: int) -> np.ndarray:
+    """
+    Compute the contribution of some choosen answers to the log-scores of a form
+
+    Parameters:
+        - list_coefs : the coefficients of the answers (the empty ones are ignored), they must be >= 0
+        - nb_ai : number of AIs
+
+    Return:
+        - a (3 x AIs) array : the sum of the log of the positive coefficients, the number of 0 and the number of NaN
+    """
+    log_scores = np.zeros((3, nb_ai))
+    coefficients = np.array([list_coef for list_coef in list_coefs if len(list_coef)], dtype=float).reshape(-1, nb_ai)
+    nan_coefficients = np.isnan(coefficients)
+    zero_coefficients = coefficients == 0
+    log_scores[0] = np.log(np.where(nan_coefficients | zero_coefficients, 1.0, coefficients)).sum(axis=0)
+    log_scores[1] = zero_coefficients.sum(axis=0)
+    log_scores[2] = nan_coefficients.sum(axis=0)
+    return log_scores
+
+
+def scores_from_log_scores(log_scores: np.ndarray) -> np.ndarray:
+    """
+    Compute the scores from the (3 x AIs) log-scores created by answers_log_scores :
+    0 if a coefficient is 0, -1 if a coefficient is NaN, the product of the coefficients otherwise
+    """
+    scores = np.exp(log_scores[0])
+    scores[log_scores[1] > 0] = 0.0
+    scores[log_scores[2] > 0] = -1.0
+    return scores
+
+
+def top_k(scores: np.ndarray, nb_best: int) -> np.ndarray:
+    """
+    Get the indexes of the nb_best higher scores (the ties are kept in the order of the indexes)
+    with a partial sort (argpartition) of the scores
+
+    Parameters:
+        - scores : the scores of the AIs
+        - nb_best : number of indexes to keep
+    """
+    if nb_best <= 0:
+        return np.array([], dtype=int)
+    if nb_best < len(scores):
+        threshold = scores[np.argpartition(-scores, nb_best - 1)[nb_best - 1]]
+        candidates = np.flatnonzero(scores >= threshold)  # all ties with the last kept score are candidates
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")][:nb_best]
+
+
+def best_ais_from_log_scores(log_scores: np.ndarray, list_ai: Sequence[str], nb_ai: int) -> list[Tuple[str, float]]:
+    """
+    Get the nb_ai best AIs (with a positive score) from the (3 x AIs) log-scores created by answers_log_scores
+
+    Return:
+        - list of (name of the AI, score), by decreasing score (the ties in the order of list_ai)
+    """
+    scores = scores_from_log_scores(log_scores)
+    ranking_scores = np.where(scores > 0, np.round(log_scores[0], LOG_SCORE_DECIMALS), -np.inf)
+    return [(list_ai[index], scores[index]) for index in top_k(ranking_scores, nb_ai) if scores[index] > 0]
+
+
+def build_incidence_matrix(forms_propositions: Sequence[Sequence[str]], propositions_id: Sequence[str]) -> np.ndarray:
+    """
+    Build the (forms x propositions) matrix with the number of times each form has choosen each proposition
+
+    Parameters:
+        - forms_propositions : the ids of the choosen propositions of each form
+        - propositions_id : the ids of the rows of the coefficient matrix (the ids not in it are ignored)
+
+    Return:
+        - the incidence matrix (float, to be multiplied with the coefficient matrix)
+    """
+    index = {proposition_id: row for row, proposition_id in enumerate(propositions_id)}
+    incidence = np.zeros((len(forms_propositions), len(propositions_id)))
+    for form_row, propositions in enumerate(forms_propositions):
+        columns = [index[proposition_id] for proposition_id in propositions if proposition_id in index]
+        np.add.at(incidence[form_row], columns, 1.0)
+    return incidence
+
+
+def batch_scores(incidence: np.ndarray, coefficients: np.ndarray) -> np.ndarray:
+    """
+    Compute the scores of all AIs for all forms with one matrix product in log-space (the coefficients must be >= 0)
+    The zero and NaN coefficients are counted apart : a score is 0 if a choosen coefficient is 0,
+    and -1 if a choosen coefficient is NaN
+
+    Parameters:
+        - incidence : the (forms x propositions) matrix created by build_incidence_matrix
+        - coefficients : the (propositions x AIs) coefficient matrix
+
+    Return:
+        - the (forms x AIs) matrix of the scores
+    """
+    nan_coefficients = np.isnan(coefficients)
+    zero_coefficients = coefficients == 0
+    log_coefficients = np.log(np.where(nan_coefficients | zero_coefficients, 1.0, coefficients))
+    scores = np.exp(incidence @ log_coefficients)
+    scores[incidence @ zero_coefficients > 0] = 0.0
+    scores[incidence @ nan_coefficients > 0] = -1.0
+    return scores
+
+
+def batch_best_ais(scores: np.ndarray, list_ai: Sequence[str], nb_ai: int) -> list[list[str]]:
+    """
+    Get the nb_ai best AIs of each form (only the AIs with a positive score, by decreasing score)
+
+    Parameters:
+        - scores : the (forms x AIs) matrix created by batch_scores
+        - list_ai : the names of the AIs (columns of scores)
+        - nb_ai : number of AIs to keep
+
+    Return:
+        - the names of the best AIs of each form
+    """
+    order = np.argsort(-scores, axis=1, kind="stable")  # stable : the ties are kept in the order of list_ai
+    best_ais = []
+    for form_scores, form_order in zip(scores, order):
+        best_ais.append([list_ai[column] for column in form_order[:nb_ai] if form_scores[column] > 0])
+    return best_ais
@@ -0,0 +1,99 @@
+"""
+This file contains the class AsyncDbConnection, the asynchronous counterpart of DbConnection used to run independent
+queries concurrently (with asyncio.gather), with a limit on the number of queries in flight
+"""
+import asyncio
+import threading
+import weakref
+from typing import Optional
+
+from ai_sustainability.package_business.models import Form, Query, Username
+from ai_sustainability.package_data_access.db_connection import (
+    ALL_USERS_QUERY,
+    BEST_AIS_QUERY,
+    FORM_CHAIN_QUERY,
+    FORMS_ID_QUERY,
+    NODE_EXIST_QUERY,
+    DbConnection,
+    build_form_from_chain,
+    forms_names_from_ids,
+    order_form_chain,
+)
+from ai_sustainability.package_data_access.db_interface import AsyncDBInterface
+from ai_sustainability.package_data_access.question_graph import FIRST_NODE_ID
+
+MAX_IN_FLIGHT = 4  # Default maximal number of queries in flight (the default pool size of a gremlin client)
+
+
+class AsyncDbConnection(AsyncDBInterface):
+    """
+    Class to run queries on the database Gremlin CosmosDB without blocking, it uses the client (and the question graph
+    snapshot) of a DbConnection
+    The connection is shared by all streamlit sessions, each session running its queries in its own event loop (one
+    asyncio.run by call), so the limit applies to each event loop and the pool of the client bounds the whole process
+
+    Parameters :
+        - database : the DbConnection whose client is used
+        - max_in_flight : maximal number of queries running at the same time in one event loop
+    """
+
+    def __init__(self, database: DbConnection, max_in_flight: int = MAX_IN_FLIGHT) -> None:
+        self.database = database
+        self.max_in_flight = max_in_flight
+        # A semaphore can only be used in one event loop : one semaphore by loop, removed with its loop
+        self._semaphores: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_in_flight)
+        return semaphore
+
+    async def run_gremlin_query(self, query: Query, bindings: Optional[dict] = None) -> list:
+        """
+        Run a gremlin query, waiting if max_in_flight queries are already running
+
+        Parameters :
+            - query : the gremlin script template to run (Exemple : Query("g.V(node_id)"))
+            - bindings : the values of the variables of the template (Exemple : {"node_id": "1"})
+
+        Return :
+            - list of all result that correspond to the query
+        """
+        async with self._get_semaphore():
+            return await self.database.query_builder.submit_async(query, bindings)
+
+    async def check_node_exist(self, node_id: Optional[str]) -> bool:
+        if node_id is None or not node_id:
+            return False
+        return bool(await self.run_gremlin_query(NODE_EXIST_QUERY, {"node_id": node_id}))
+
+    async def check_nodes_exist(self, nodes_id: list[str]) -> list[bool]:
+        return list(await asyncio.gather(*(self.check_node_exist(node_id) for node_id in nodes_id)))
+
+    async def get_all_users(self) -> list[Username]:
+        return await self.run_gremlin_query(ALL_USERS_QUERY)
+
+    async def get_all_forms_names(self, username: Username) -> list[str]:
+        return forms_names_from_ids(await self.run_gremlin_query(FORMS_ID_QUERY, {"username": username}))
+
+    async def retrieve_previous_form(self, username: Username, selected_form_name: str) -> Form:
+        # get_question_graph may send blocking queries (version check, reload), so it runs in a thread
+        first_node_id = f"{username}-answer{FIRST_NODE_ID}-{selected_form_name}"
+        question_graph, nodes = await asyncio.gather(
+            asyncio.to_thread(self.database.get_question_graph),
+            self.run_gremlin_query(FORM_CHAIN_QUERY, {"node_id": first_node_id}),
+        )
+        return build_form_from_chain(
+            username, selected_form_name, order_form_chain(first_node_id, nodes), question_graph
+        )
+
+    async def get_best_ais(self, username: Username, form_name: str) -> list[str]:
+        form_id = f"{username}-answer{FIRST_NODE_ID}-{form_name}"
+        result = await self.run_gremlin_query(BEST_AIS_QUERY, {"node_id": form_id})
+        return result[0].split(", ") if result and result[0] else []
@@ -0,0 +1,290 @@
+"""
+This file contains the class BestAisTable, a lookup table of the best AIs of every path through the question graph,
+precomputed offline from a graph file created by DbGestion.save_graph (the question graph is a DAG from the node 1 to
+the end node, and the score of an AI is a product of coefficients along the choosen path)
+"""
+import json
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import numpy as np
+from decouple import config
+
+from ai_sustainability.package_business.models import Form
+from ai_sustainability.package_business.scoring import (
+    LOG_SCORE_DECIMALS,
+    answers_log_scores,
+    best_ais_from_log_scores,
+)
+from ai_sustainability.package_data_access.graph_file import read_graph_file
+from ai_sustainability.package_data_access.question_graph import (
+    FIRST_NODE_ID,
+    PropositionEdge,
+    QuestionGraph,
+)
+
+SINGLE_CHOICE_TYPES = ("Q_Open", "Q_QCM", "Q_QCM_Bool")
+MULTIPLE_CHOICE_TYPE = "Q_QRM"
+Signature = Tuple[str, ...]  # The ids of the choosen propositions of the single choice questions of a path
+
+
+@dataclass
+class PathSuffix:
+    """Dataclass with the part of a path from a question to the end node"""
+
+    signature: Signature
+    log_scores: np.ndarray  # (3 x AIs) log-scores of the single choice answers (see answers_log_scores)
+    qrm_questions: Tuple[str, ...]  # The multiple choice questions of the path
+
+
+def encode_log_scores(log_scores: np.ndarray) -> dict:
+    """
+    Encode (3 x AIs) log-scores in a compact dict for a json file : the log-scores of the AIs with a 0 or a NaN
+    coefficient are useless, only the indexes of these AIs are kept
+    """
+    zero_indexes = np.flatnonzero(log_scores[1] > 0)
+    nan_indexes = np.flatnonzero(log_scores[2] > 0)
+    logs = np.round(log_scores[0], LOG_SCORE_DECIMALS)
+    logs[zero_indexes] = 0.0
+    logs[nan_indexes] = 0.0
+    return {"logs": logs.tolist(), "zeros": zero_indexes.tolist(), "nans": nan_indexes.tolist()}
+
+
+def decode_log_scores(content: dict) -> np.ndarray:
+    """Decode the log-scores encoded by encode_log_scores"""
+    log_scores = np.zeros((3, len(content["logs"])))
+    log_scores[0] = content["logs"]
+    log_scores[1, content["zeros"]] = 1.0
+    log_scores[2, content["nans"]] = 1.0
+    return log_scores
+
+
+class BestAisTable:
+    """
+    Lookup table from the signature of a path (the choosen propositions of its single choice questions) to the best
+    AIs of the path, the answers of the multiple choice questions (QRM) are added with a factor table by question
+    Only the log-scores of the paths with a QRM are kept, the other paths only keep the names of their best AIs
+
+    Parameters :
+        - list_ai : the names of the AIs
+        - nb_ai : number of best AIs of a path
+        - best_ais : the best AIs of the paths without QRM
+        - qrm_paths : the log-scores (single choice answers only) and the QRM questions of the paths with a QRM
+        - qrm_factors : the log-scores of each proposition of each QRM question
+        - version : the version of the question graph used to build the table
+
+    Methods :
+        - build : precompute the table from a question graph (walk of the DAG with a memoized dynamic programming)
+        - from_json_file / save : read and write the table in a json file
+        - lookup : get the best AIs of a Form
+        - possibly_empty_paths : the paths which can have no recommended AI
+    """
+
+    def __init__(
+        self,
+        list_ai: list[str],
+        nb_ai: int,
+        best_ais: dict[Signature, list[Tuple[str, float]]],
+        qrm_paths: dict[Signature, Tuple[np.ndarray, Tuple[str, ...]]],
+        qrm_factors: dict[str, dict[str, np.ndarray]],
+        version: str = "",
+    ) -> None:
+        self.list_ai = list_ai
+        self.nb_ai = nb_ai
+        self.best_ais = best_ais
+        self.qrm_paths = qrm_paths
+        self.qrm_factors = qrm_factors
+        self.version = version
+
+    @classmethod
+    def build(cls, question_graph: QuestionGraph, list_ai: list[str], nb_ai: int) -> "BestAisTable":
+        """
+        Precompute the best AIs of every path from the node 1 to the end node, the suffixes of the paths are computed
+        once by question (and by modif_crypted state) and shared by all paths going through this question
+
+        Parameters :
+            - question_graph : the snapshot of the question graph (Exemple : QuestionGraph.from_json_file(path))
+            - list_ai : the names of the AIs (the list_AI property of the node 1)
+            - nb_ai : number of best AIs of a path (Exemple : int(config("NBEST_AI")))
+        """
+        nb_scores = len(list_ai)
+        memo: dict[Tuple[str, bool, int], list[PathSuffix]] = {}
+
+        def propositions(question_id: str, modif_crypted: bool) -> list[PropositionEdge]:
+            edges = [
+                question_graph.propositions[answer.answer_id] for answer in question_graph.get_propositions(question_id)
+            ]
+            return [edge for edge in edges if not (modif_crypted and edge.modif_crypted)]
+
+        def suffixes(question_id: str, modif_crypted: bool, depth: int) -> list[PathSuffix]:
+            # Like Form.modif_crypted, the filter depends on the answer of the second question of the Form
+            key = (question_id, modif_crypted, min(depth, 2))
+            if key in memo:
+                return memo[key]
+            node = question_graph.nodes[question_id]
+            result: list[PathSuffix] = []
+            if node.type == MULTIPLE_CHOICE_TYPE:
+                next_question_id = question_graph.get_next_question_id(question_id)
+                for suffix in suffixes(next_question_id, modif_crypted, depth + 1):
+                    result.append(
+                        PathSuffix(suffix.signature, suffix.log_scores, (question_id,) + suffix.qrm_questions)
+                    )
+            elif node.type in SINGLE_CHOICE_TYPES:
+                for edge in propositions(question_id, modif_crypted):
+                    next_modif_crypted = edge.text == "Yes" if depth == 1 else modif_crypted
+                    contribution = answers_log_scores([edge.list_coef], nb_scores)
+                    for suffix in suffixes(edge.target_id, next_modif_crypted, depth + 1):
+                        result.append(
+                            PathSuffix(
+                                (edge.answer_id,) + suffix.signature,
+                                contribution + suffix.log_scores,
+                                suffix.qrm_questions,
+                            )
+                        )
+            else:  # The end node
+                result.append(PathSuffix((), np.zeros((3, nb_scores)), ()))
+            memo[key] = result
+            return result
+
+        best_ais: dict[Signature, list[Tuple[str, float]]] = {}
+        qrm_paths: dict[Signature, Tuple[np.ndarray, Tuple[str, ...]]] = {}
+        for path in suffixes(FIRST_NODE_ID, False, 0):
+            if path.qrm_questions:
+                qrm_paths[path.signature] = (path.log_scores, path.qrm_questions)
+            else:
+                best_ais[path.signature] = best_ais_from_log_scores(path.log_scores, list_ai, nb_ai)
+        qrm_factors = {
+            question_id: {
+                proposition.answer_id: answers_log_scores([proposition.list_coef], nb_scores)
+                for proposition in question_graph.get_propositions(question_id)
+            }
+            for question_id, node in question_graph.nodes.items()
+            if node.type == MULTIPLE_CHOICE_TYPE
+        }
+        return cls(list_ai, nb_ai, best_ais, qrm_paths, qrm_factors, question_graph.version)
+
+    def lookup(self, form: Form) -> Optional[list[Tuple[str, float]]]:
+        """
+        Get the best AIs of a completed Form with a lookup (and the factors of its QRM answers)
+
+        Return :
+            - the best AIs (name, score), None if the path of the Form is not in the table (Exemple : the graph changed)
+        """
+        signature = tuple(
+            answer.answer_id
+            for question in form.question_list
+            if question.type in SINGLE_CHOICE_TYPES
+            for answer in question.choosen_answers
+        )
+        if signature in self.best_ais:
+            return self.best_ais[signature]
+        if signature not in self.qrm_paths:
+            return None
+        log_scores, qrm_questions = self.qrm_paths[signature]
+        log_scores = log_scores.copy()
+        for question in form.question_list:
+            if question.question_id not in qrm_questions:
+                continue
+            for answer in question.choosen_answers:
+                if answer.answer_id not in self.qrm_factors[question.question_id]:
+                    return None
+                log_scores += self.qrm_factors[question.question_id][answer.answer_id]
+        return best_ais_from_log_scores(log_scores, self.list_ai, self.nb_ai)
+
+    def possibly_empty_paths(self) -> list[Signature]:
+        """
+        Get the paths which can have no recommended AI : an AI is recommended if all its choosen coefficients are
+        positive, so choosing more answers to a QRM can only remove AIs, and the worst case of a path is to choose all
+        answers of its QRM (the modif_crypted filter is ignored here, so a path found can be a false alarm)
+
+        Return :
+            - the signatures of the paths with no AI in their worst case, an empty list proves that a Form can never
+                have an empty list of best AIs
+        """
+        empty_paths = [signature for signature, best_ais in self.best_ais.items() if not best_ais]
+        for signature, (log_scores, qrm_questions) in self.qrm_paths.items():
+            worst_case = log_scores + sum(
+                (factor for question_id in qrm_questions for factor in self.qrm_factors[question_id].values()),
+                np.zeros_like(log_scores),
+            )
+            if not best_ais_from_log_scores(worst_case, self.list_ai, self.nb_ai):
+                empty_paths.append(signature)
+        return empty_paths
+
+    @classmethod
+    def from_json_file(cls, path: str) -> "BestAisTable":
+        """
+        Read a table saved by BestAisTable.save
+
+        Parameters :
+            - path : the path of the json file (string) (Exemple : "ai_sustainability/datas/best_ais_table.json")
+        """
+        with open(path, "r", encoding="utf-8") as file:
+            content = json.load(file)
+        return cls(
+            list_ai=content["list_ai"],
+            nb_ai=content["nb_ai"],
+            best_ais={
+                tuple(path["signature"]): list(map(tuple, path["best_ais"]))  # The json arrays back to tuples
+                for path in content["best_ais"]
+            },
+            qrm_paths={
+                tuple(path["signature"]): (decode_log_scores(path["log_scores"]), tuple(path["qrm_questions"]))
+                for path in content["qrm_paths"]
+            },
+            qrm_factors={
+                question_id: {proposition_id: decode_log_scores(factor) for proposition_id, factor in factors.items()}
+                for question_id, factors in content["qrm_factors"].items()
+            },
+            version=content["version"],
+        )
+
+    def save(self, path: str) -> None:
+        """
+        Write the table in a json file
+
+        Parameters :
+            - path : the path of the json file (string) (Exemple : "ai_sustainability/datas/best_ais_table.json")
+        """
+        content = {
+            "version": self.version,
+            "list_ai": self.list_ai,
+            "nb_ai": self.nb_ai,
+            "best_ais": [
+                {"signature": list(signature), "best_ais": [[name, float(score)] for name, score in best_ais]}
+                for signature, best_ais in self.best_ais.items()
+            ],
+            "qrm_paths": [
+                {
+                    "signature": list(signature),
+                    "log_scores": encode_log_scores(log_scores),
+                    "qrm_questions": list(qrm_questions),
+                }
+                for signature, (log_scores, qrm_questions) in self.qrm_paths.items()
+            ],
+            "qrm_factors": {
+                question_id: {proposition_id: encode_log_scores(factor) for proposition_id, factor in factors.items()}
+                for question_id, factors in self.qrm_factors.items()
+            },
+        }
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(content, file, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    # Exemple of use : precompute the table of the graph saved in data_weight.json and check that a Form can never have
+    # an empty list of best AIs
+
+    GRAPH_PATH = "ai_sustainability/datas/data_weight.json"
+    vertices, _ = read_graph_file(GRAPH_PATH)
+    first_node = next(vertex for vertex in vertices if vertex["id"] == FIRST_NODE_ID)
+    graph_list_ai = first_node["properties"]["list_AI"][0]["value"].split(", ")
+
+    table = BestAisTable.build(QuestionGraph.from_json_file(GRAPH_PATH), graph_list_ai, int(config("NBEST_AI")))
+    print(f"{len(table.best_ais)} paths without QRM, {len(table.qrm_paths)} paths with QRM")
+    possibly_empty = table.possibly_empty_paths()
+    if possibly_empty:
+        print(f"{len(possibly_empty)} paths can have no recommended AI, for example : {possibly_empty[0]}")
+    else:
+        print("No path can have an empty list of best AIs")
+    table.save("ai_sustainability/datas/best_ais_table.json")
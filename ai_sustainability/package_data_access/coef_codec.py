@@ -0,0 +1,108 @@
+"""
+This file contains the functions used to encode and decode the list_coef property of the edges (the coefficient of
+each AI for a proposition), stored in one of two formats :
+    - text : the coefficients separated by ", " (Exemple : "1.0, 0.5, 0.0"), the only format of the first versions
+    - compact : a version tag then the base64 of the coefficients as little-endian float32
+        (Exemple : "f32le-b64:1:AACAPwAAAD8AAAAA"), 5.3 characters by coefficient whatever its value (a coefficient
+        with all its decimals takes about 20 characters in the text format) and decoded without parsing
+The format written is chosen with the COMPACT_LIST_COEF setting, both formats are always read (see
+DbGestion.migrate_list_coef to convert the stored edges)
+
+method:
+    - is_compact
+    - encode_coefs
+    - decode_coefs
+    - decode_coefs_matrix
+    - same_coefs
+"""
+import base64
+from typing import Sequence
+
+import numpy as np
+from decouple import config
+
+COMPACT_FORMAT = "f32le-b64"
+COMPACT_VERSION = 1
+COMPACT_TAG = f"{COMPACT_FORMAT}:{COMPACT_VERSION}:"
+COMPACT_DTYPE = np.dtype("<f4")
+COMPACT_RTOL = 2.0**-23  # Relative distance of two successive float32 (their machine epsilon)
+TEXT_SEPARATOR = ", "
+COMPACT_LIST_COEF = config("COMPACT_LIST_COEF", default=False, cast=bool)  # Format written for the new edges
+
+
+def is_compact(value: str) -> bool:
+    return value.startswith(COMPACT_FORMAT + ":")
+
+
+def encode_coefs(coefs: Sequence[float], compact: bool = COMPACT_LIST_COEF) -> str:
+    """
+    Encode the coefficients of a proposition for the list_coef property ("" if there is no coefficient)
+
+    Parameters :
+        - coefs : the coefficients (Exemple : a row of the coefficient matrix)
+        - compact : True for the compact format, False for the text format
+    """
+    coefs_array = np.asarray(coefs)
+    if not coefs_array.size:
+        return ""
+    if compact:
+        return COMPACT_TAG + base64.b64encode(coefs_array.astype(COMPACT_DTYPE).tobytes()).decode("ascii")
+    # The shortest text of each coefficient in its own precision (Exemple : a row of a float32 matrix stays short)
+    return TEXT_SEPARATOR.join(str(coef) for coef in coefs_array)
+
+
+def _compact_payload(value: str) -> bytes:
+    """Return the float32 bytes of a value in the compact format, checking its version"""
+    _, version, payload = value.split(":", 2)
+    if int(version) != COMPACT_VERSION:
+        raise ValueError(f"Unknown version {version} of the {COMPACT_FORMAT} format of list_coef")
+    return base64.b64decode(payload)
+
+
+def decode_coefs(value: str) -> np.ndarray:
+    """
+    Decode a list_coef property in any format (an empty array for "")
+
+    Return :
+        - the coefficients (float32 for the compact format, float64 for the text format)
+    """
+    if not value:
+        return np.zeros(0)
+    if is_compact(value):
+        return np.frombuffer(_compact_payload(value), dtype=COMPACT_DTYPE)
+    return np.array(value.split(","), dtype=np.float64)
+
+
+def decode_coefs_matrix(values: Sequence[str], nb_ai: int) -> np.ndarray:
+    """
+    Decode the list_coef properties of many propositions in one (propositions x AIs) matrix, the compact values are
+    decoded with one np.frombuffer on their concatenated bytes
+
+    Parameters :
+        - values : the list_coef properties, each one with nb_ai coefficients
+        - nb_ai : number of AIs
+
+    Return :
+        - the float64 coefficient matrix
+    """
+    matrix = np.zeros((len(values), nb_ai))
+    compact_rows = [row for row, value in enumerate(values) if is_compact(value)]
+    if compact_rows:
+        payload = b"".join(_compact_payload(values[row]) for row in compact_rows)
+        matrix[compact_rows] = np.frombuffer(payload, dtype=COMPACT_DTYPE).reshape(len(compact_rows), nb_ai)
+    for row, value in enumerate(values):
+        if not is_compact(value):
+            matrix[row] = decode_coefs(value)
+    return matrix
+
+
+def same_coefs(left: str, right: str) -> bool:
+    """
+    Compare two list_coef properties in any format : True if they have the same coefficients once rounded to float32
+    (Exemple : "0.1, 1.0" and the compact encoding of the same coefficients)
+    """
+    left_coefs = decode_coefs(left).astype(COMPACT_DTYPE)
+    right_coefs = decode_coefs(right).astype(COMPACT_DTYPE)
+    return left_coefs.shape == right_coefs.shape and bool(
+        np.allclose(left_coefs, right_coefs, rtol=COMPACT_RTOL, atol=0.0)
+    )
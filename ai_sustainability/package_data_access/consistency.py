@@ -0,0 +1,89 @@
+"""
+This file contains the class WriteConfirmation, used by the data access classes to confirm that a write is visible
+in the database (read-your-write) instead of waiting a fixed time after each write
+"""
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Callable
+
+
+@dataclass
+class ConsistencyStats:
+    """Dataclass with the counters of WriteConfirmation"""
+
+    nb_writes: int = 0  # Number of writes run with a confirmation
+    nb_confirmed_first_try: int = 0  # Number of writes confirmed without any retry
+    nb_retried_writes: int = 0  # Number of writes that needed at least one retry
+    nb_retries: int = 0  # Total number of retries
+    nb_failures: int = 0  # Number of writes still not confirmed after all retries
+
+    @property
+    def retry_rate(self) -> float:
+        return self.nb_retried_writes / self.nb_writes if self.nb_writes else 0.0
+
+
+class WriteConfirmation:
+    """
+    Class used to confirm that a write is done by checking the returned element (an addV/addE query return the
+    created element), and to retry a write with a bounded exponential backoff only when it returns nothing
+    (Exemple : an addE query whose source or target node is not visible yet)
+    The counters are shared by all streamlit sessions (like the DbConnection), so their updates are protected by a lock
+
+    Parameters :
+        - max_retries : maximal number of retries before giving up
+        - base_delay : delay (in seconds) before the first retry, doubled at each retry
+        - max_delay : maximal delay (in seconds) between two retries
+
+    Methods :
+        - run_confirmed : run a write and retry it (with backoff) until it returns something
+        - stats : copy of the counters of the confirmations and of the retries actually needed
+        - reset_stats
+    """
+
+    def __init__(self, max_retries: int = 5, base_delay: float = 0.01, max_delay: float = 0.5) -> None:
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._stats = ConsistencyStats()
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self) -> ConsistencyStats:
+        with self._lock:
+            return replace(self._stats)
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = ConsistencyStats()
+
+    def delays(self) -> list[float]:
+        """Return the list of delays used between two retries"""
+        return [min(self.base_delay * 2**retry, self.max_delay) for retry in range(self.max_retries)]
+
+    def run_confirmed(self, write: Callable[[], list]) -> list:
+        """
+        Run a write query and confirm it with its result, the write is retried (with backoff) only if it returns
+        nothing
+
+        Parameters :
+            - write : function running the write query and returning its result
+
+        Return :
+            - the result of the write (empty if the write could not be confirmed after all retries)
+        """
+        result = write()
+        nb_retries = 0
+        for delay in self.delays():
+            if result:
+                break
+            time.sleep(delay)
+            nb_retries += 1
+            result = write()
+        with self._lock:
+            self._stats.nb_writes += 1
+            self._stats.nb_confirmed_first_try += int(nb_retries == 0 and bool(result))
+            self._stats.nb_retried_writes += int(nb_retries > 0)
+            self._stats.nb_retries += nb_retries
+            self._stats.nb_failures += int(not result)
+        return result
@@ -1,12 +1,16 @@
 """
 This file contains the class DbConnection, used to connect to the database and to run the queries
 """
+import dataclasses
 import time
-from typing import Optional, Tuple
+from functools import partial
+from typing import Mapping, Optional, Sequence, Tuple
 
+import numpy as np
 from decouple import config
 from gremlin_python import statics
 from gremlin_python.driver import client, serializer
+from gremlin_python.driver.protocol import GremlinServerError
 
 from ai_sustainability.package_business.models import (
     Answer,
@@ -19,12 +23,70 @@ from ai_sustainability.package_business.models import (
     UserFeedback,
     Username,
 )
+from ai_sustainability.package_data_access.coef_codec import decode_coefs, encode_coefs
+from ai_sustainability.package_data_access.consistency import (
+    ConsistencyStats,
+    WriteConfirmation,
+)
 from ai_sustainability.package_data_access.db_interface import DBInterface
+from ai_sustainability.package_data_access.query_builder import QueryBuilder, bind_list
+from ai_sustainability.package_data_access.query_metrics import QueryMetrics
+from ai_sustainability.package_data_access.question_graph import (
+    FIRST_NODE_ID,
+    QUESTION_EDGE_LABELS,
+    QUESTION_PARTITION_KEY,
+    VERSION_PROPERTY,
+    QuestionGraph,
+)
 
-FIRST_NODE_ID = "1"
 END_TYPE = config("END_TYPE")
+GRAPH_VERSION_CHECK_DELAY = 60.0  # Minimal delay (in seconds) between two checks of the question graph version
+EDGES_PER_TRAVERSAL = 25  # Maximal number of answer edges created by one traversal (to keep the script size bounded)
+COUNTERS_PER_TRAVERSAL = 50  # Maximal number of answer counters written by one traversal
+ANSWER_STATS_ID = "answer_stats"  # Id of the vertex with the number of times each proposition was selected
+COUNTER_PREFIX = "nb_"  # The counter of a proposition is the property COUNTER_PREFIX + proposition id
+COUNTERS_MAX_ATTEMPTS = 10  # Maximal number of compare-and-set of some counters before giving up
+PRECONDITION_FAILED_STATUS_CODE = 412  # Cosmos DB refused a write because the element was changed concurrently
 _map = map
-statics.load_statics(globals())
+statics.load_statics(globals())  # Shadows some names of this module (map, min, id, replace, ...)
+
+
+FORM_CHAIN_QUERY = Query(
+    f"g.V(node_id).emit().repeat(out('Answer').dedup()).until(hasLabel('{END_TYPE}')).dedup()"
+    ".project('id', 'label', 'question_id', 'mlflow_id', 'answers')"
+    ".by(id).by(label)"
+    ".by(coalesce(values('question_id'), constant('')))"
+    ".by(coalesce(values('mlflow_id'), constant('')))"
+    ".by(outE('Answer').project('proposition_id', 'answer', 'metric', 'list_coef', 'next')"
+    ".by(values('proposition_id'))"
+    ".by(coalesce(values('answer'), constant('')))"
+    ".by(coalesce(values('metric'), constant('')))"
+    ".by(coalesce(values('list_coef'), constant('')))"
+    ".by(inV().id()).fold())"
+)
+NODE_EXIST_QUERY = Query("g.V(node_id).id()")
+# The proposition-edges without their coefficients (list_coef, the largest property, is loaded by get_coefficients)
+QUESTION_EDGES_PROJECTION = (
+    ".project('id', 'label', 'outV', 'inV', 'properties').by(id).by(label).by(outV().id()).by(inV().id())"
+    ".by(valueMap('text', 'help text', 'modif_crypted', 'metric'))"
+)
+ALL_USERS_QUERY = Query("g.V().hasLabel('user').id()")
+FORMS_ID_QUERY = Query("g.V(username).outE().hasLabel('Answer').inV().id()")
+BEST_AIS_QUERY = Query("g.V(node_id).properties('best_ais').value()")
+ALL_BEST_AIS_QUERY = Query(
+    "g.V().hasLabel('user').as('user').out('Answer')"
+    ".project('username', 'form_id', 'best_ais').by(select('user').id()).by(id)"
+    ".by(coalesce(values('best_ais'), constant('')))"
+)
+ANSWER_STATS_QUERY = Query("g.V(stats_id).valueMap()")
+ANSWER_COUNTS_QUERY = Query("g.E().hasLabel('Answer').has('proposition_id').groupCount().by('proposition_id')")
+DROP_FORM_QUERY = Query(
+    f"g.V(node_id).emit().repeat(out('Answer').dedup()).until(hasLabel('{END_TYPE}')).dedup()"
+    ".fold()"  # The whole chain is found before dropping it
+    ".project('propositions', 'nb_nodes')"
+    ".by(unfold().outE('Answer').has('proposition_id').values('proposition_id').fold())"
+    ".by(unfold().sideEffect(drop()).count())"
+)
 
 
 def connect(endpoint: str, database_name: str, container_name: str, primary_key: str) -> client.Client:
@@ -37,18 +99,181 @@ def connect(endpoint: str, database_name: str, container_name: str, primary_key:
     )
 
 
+def order_form_chain(first_node_id: str, nodes_list: list[dict]) -> list[dict]:
+    """
+    Put the nodes returned by FORM_CHAIN_QUERY back in the order of the Form (starting from first_node_id)
+    """
+    nodes = {node["id"]: node for node in nodes_list}
+    chain: list[dict] = []
+    node_id: Optional[str] = first_node_id
+    while node_id in nodes:
+        node = nodes.pop(node_id)
+        if not node["question_id"]:  # Id of an answer node : {username}-answer{question_id}-{form_name}
+            node["question_id"] = node["id"].split("-")[1][len("answer") :]
+        chain.append(node)
+        node_id = node["answers"][0]["next"] if node["answers"] else None
+    return chain
+
+
+def answer_from_properties(properties: dict, question_graph: Optional[QuestionGraph] = None) -> Answer:
+    """
+    Create the Answer stored in the properties of an Answer edge, the shared Answer of question_graph is used if the
+    proposition is in question_graph (with the text stored in the edge for an open question)
+    """
+    text = properties["answer"] if "answer" in properties else ""
+    if question_graph is not None and properties["proposition_id"] in question_graph.answers:
+        shared_answer = question_graph.answers[properties["proposition_id"]]
+        return shared_answer if shared_answer.text == text else dataclasses.replace(shared_answer, text=text)
+    return Answer(
+        answer_id=properties["proposition_id"],
+        text=text,
+        help_text="",
+        modif_crypted=False,
+        metric=properties["metric"] if properties.get("metric") else None,
+        list_coef=tuple(decode_coefs(properties.get("list_coef", "")).tolist()),
+    )
+
+
+def answer_edge_properties(
+    proposition: Answer, coefficients: Optional[Mapping[str, Sequence[float]]] = None, suffix: str = ""
+) -> Tuple[str, dict]:
+    """
+    Return the property steps of an Answer edge and their bindings (variables names end with suffix), the Answers of
+    a snapshot loaded without coefficients take their coefficients in coefficients (see DbConnection.get_coefficients)
+    """
+    properties = (
+        f".property('answer', answer{suffix})"
+        f".property('proposition_id', proposition_id{suffix})"
+        f".property('list_coef', list_coef{suffix})"
+    )
+    list_coef = proposition.list_coef
+    if len(list_coef) == 0 and coefficients is not None:
+        list_coef = coefficients.get(proposition.answer_id, list_coef)
+    bindings = {
+        f"answer{suffix}": proposition.text,
+        f"proposition_id{suffix}": proposition.answer_id,
+        f"list_coef{suffix}": encode_coefs(list_coef),
+    }
+    if proposition.metric is not None:
+        if isinstance(proposition.metric, str):
+            bindings[f"metric{suffix}"] = proposition.metric
+        elif isinstance(proposition.metric, list):
+            bindings[f"metric{suffix}"] = ",".join(proposition.metric)
+        else:
+            raise RuntimeError("Unknow problem with metrics in Answer")
+        properties += f".property('metric', metric{suffix})"
+    return properties, bindings
+
+
+def build_form_from_chain(username: Username, form_name: str, chain: list[dict], question_graph: QuestionGraph) -> Form:
+    """
+    Rebuild a Form from its answer chain (returned by order_form_chain) and a snapshot of the question graph
+    """
+    if not chain:
+        raise ValueError(f"The form {form_name} of {username} does not exist")
+    form = Form()
+    form.username = username
+    form.form_name = form_name
+    form.already_completed = True
+    form.experiment_id = chain[0]["mlflow_id"] or None
+    for node in chain:
+        form.add_question(question_graph.get_question(node["question_id"]))
+        if node["label"] == END_TYPE:
+            break
+        form.last_question.choosen_answers = [answer_from_properties(edge, question_graph) for edge in node["answers"]]
+    return form
+
+
+def form_answers_counts(form: Form) -> dict[str, int]:
+    """Count the Answer edges of a saved Form by proposition (the choosen answers of the questions before the end)"""
+    counts: dict[str, int] = {}
+    for question in form.question_list:
+        if question.type == END_TYPE:
+            break
+        for answer in question.choosen_answers:
+            counts[answer.answer_id] = counts.get(answer.answer_id, 0) + 1
+    return counts
+
+
+def counters_from_value_map(value_map: dict) -> dict[str, int]:
+    """Get the counters (proposition id -> number of times selected) from the valueMap of the stats vertex"""
+    counters = {}
+    for key, value in value_map.items():
+        if key.startswith(COUNTER_PREFIX):
+            counters[key[len(COUNTER_PREFIX) :]] = int(value[0] if isinstance(value, list) else value)
+    return counters
+
+
+def answer_counters_queries(
+    counters: dict[str, int], expected: Optional[dict[str, int]] = None
+) -> list[Tuple[Query, dict]]:
+    """
+    Build the traversals (and their bindings) writing counters in the stats vertex, the vertex is created by the
+    first traversal if it does not exist yet (so there is always at least one traversal)
+    With expected (the counters read before the update, a missing counter is 0), a traversal only writes its counters
+    if they still have their expected values (compare-and-set) : it returns the stats vertex if it wrote them, and
+    nothing if one of them was changed meanwhile
+    """
+    queries = []
+    items = list(counters.items())
+    for chunk_start in range(0, max(len(items), 1), COUNTERS_PER_TRAVERSAL):
+        chunk = items[chunk_start : chunk_start + COUNTERS_PER_TRAVERSAL]
+        query = (
+            "g.V(stats_id).fold()"
+            ".coalesce(unfold(), addV('stats').property('partitionKey', 'Stats').property('id', stats_id))"
+        )
+        bindings: dict = {"stats_id": ANSWER_STATS_ID}
+        for index, (proposition_id, count) in enumerate(chunk):
+            bindings.update({f"k{index}": COUNTER_PREFIX + proposition_id, f"c{index}": count})
+            if expected is not None:
+                query += f".where(coalesce(values(k{index}), constant(0)).is(e{index}))"
+                bindings[f"e{index}"] = expected.get(proposition_id, 0)
+        query += "".join(f".property(single, k{index}, c{index})" for index in range(len(chunk)))
+        queries.append((Query(query), bindings))
+    return queries
+
+
+def error_status_code(error: Exception) -> Optional[int]:
+    """
+    Return the status code of an error sent back by the database (Cosmos DB puts its own status code, Exemple : 429,
+    in the status attributes of the gremlin error), None for the other errors
+    """
+    status_attributes = getattr(error, "status_attributes", None) or {}
+    if "x-ms-status-code" in status_attributes:
+        return int(status_attributes["x-ms-status-code"])
+    return getattr(error, "status_code", None)
+
+
+def forms_names_from_ids(forms_id: list[str]) -> list[str]:
+    """Get the names of the Forms from the ids of their first node ({username}-answer1-{form_name})"""
+    return list(_map(lambda x: x.split("-")[-1], forms_id))
+
+
 class DbConnection(DBInterface):
     """
     Class to manage the database Gremlin CosmosDB
     """
 
-    def __init__(self) -> None:
+    def __init__(self, question_graph: Optional[QuestionGraph] = None, batched_writes: bool = True) -> None:
+        """
+        Parameters :
+            - question_graph : a fixed snapshot of the question graph (Exemple : built from data_weight.json),
+                if None the snapshot is loaded from the database and rebuilt when the graph is re-imported
+            - batched_writes : if True, a Form is saved with a few chained traversals instead of one query per node
+                and per edge
+        """
         self.gremlin_client: client.Client = connect(
             endpoint="questions-db.gremlin.cosmos.azure.com",
             database_name="graphdb",
             container_name=config("DATABASENAME"),
             primary_key=config("PRIMARYKEY"),
         )
+        self._fixed_question_graph = question_graph is not None
+        self._question_graph = question_graph
+        self._last_version_check = 0.0
+        self.batched_writes = batched_writes
+        self.consistency = WriteConfirmation()
+        self.query_builder = QueryBuilder(self.gremlin_client)
 
     def close(self) -> None:
         """
@@ -56,106 +281,176 @@ class DbConnection(DBInterface):
         """
         self.gremlin_client.close()
 
-    def run_gremlin_query(self, query: Query) -> list:
+    def run_gremlin_query(self, query: Query, bindings: Optional[dict] = None) -> list:
         """
         Run a gremlin query
 
         Parameters :
-            - query : the gremlin query to run (Exemple : Query("g.V()"))
+            - query : the gremlin script template to run (Exemple : Query("g.V(node_id)"))
+            - bindings : the values of the variables of the template (Exemple : {"node_id": "1"})
 
         Return :
             - list of all result that correspond to the query
         """
-        run = self.gremlin_client.submit(query).all()
-        return run.result()
+        return self.query_builder.submit(query, bindings)
+
+    def run_confirmed_query(self, query: Query, bindings: dict, error_message: str) -> list:
+        """
+        Run a write query confirmed by its result (see WriteConfirmation.run_confirmed)
+
+        Parameters :
+            - query : the gremlin script template of the write, returning the written element
+            - bindings : the values of the variables of the template
+            - error_message : message of the RuntimeError raised if the write is still not confirmed after all retries
+
+        Return :
+            - the result of the write
+        """
+        result = self.consistency.run_confirmed(partial(self.run_gremlin_query, query, bindings))
+        if not result:
+            raise RuntimeError(error_message)
+        return result
+
+    def get_query_metrics(self) -> QueryMetrics:
+        """
+        Return the wall time, result size and request charge of the queries, by tag
+        """
+        return self.query_builder.metrics
+
+    def get_consistency_stats(self) -> ConsistencyStats:
+        """
+        Return the counters of the write confirmations (how often a write needed a retry to be visible)
+        """
+        return self.consistency.stats
+
+    def get_question_graph(self) -> QuestionGraph:
+        """
+        Return the snapshot of the question graph, the version of the graph stored in the database is checked at most
+        once every GRAPH_VERSION_CHECK_DELAY seconds and the snapshot is rebuilt only if the graph was re-imported
+        """
+        if self._fixed_question_graph and self._question_graph is not None:
+            return self._question_graph
+        now = time.monotonic()
+        if self._question_graph is not None and now - self._last_version_check < GRAPH_VERSION_CHECK_DELAY:
+            return self._question_graph
+        self._last_version_check = now
+        version = self.get_graph_version()
+        if self._question_graph is None or self._question_graph.version != version:
+            self._question_graph = self.load_question_graph(version)
+        return self._question_graph
+
+    def get_graph_version(self) -> str:
+        """
+        Get the version stamp of the question graph (written by DbGestion.import_graph)
+        """
+        version = self.run_gremlin_query(
+            Query(f"g.V(first_node_id).values('{VERSION_PROPERTY}')"), {"first_node_id": FIRST_NODE_ID}
+        )
+        return str(version[0]) if version else ""
+
+    def load_question_graph(self, version: str) -> QuestionGraph:
+        """
+        Load all question-nodes and proposition-edges from the database and build a new snapshot
+        The propositions are loaded without their coefficients, only needed to score a Form (see get_coefficients)
+        """
+        labels, bindings = bind_list("edge_label", QUESTION_EDGE_LABELS)
+        vertices = self.run_gremlin_query(
+            Query("g.V().has('partitionKey', partition_key)"), {"partition_key": QUESTION_PARTITION_KEY}
+        )
+        edges = self.run_gremlin_query(Query(f"g.E().hasLabel({labels})" + QUESTION_EDGES_PROJECTION), bindings)
+        return QuestionGraph.from_graphson(vertices, edges, version)
+
+    def get_coefficients(self, proposition_ids: Sequence[str]) -> dict[str, Sequence[float]]:
+        """
+        Get the coefficients of some propositions from the snapshot of the question graph : the coefficients of a
+        snapshot loaded without them are all loaded with one query the first time, then shared until the question
+        graph is re-imported
+
+        Parameters :
+            - proposition_ids : the ids of the propositions (Exemple : the ids of the choosen answers of a Form)
+
+        Return :
+            - the coefficients by proposition id (the ids which are not propositions of the graph are ignored)
+        """
+        question_graph = self.get_question_graph()
+        question_graph.load_coefficients(self.load_coefficients)
+        return question_graph.get_coefficients(proposition_ids)
+
+    def load_coefficients(self) -> dict[str, Sequence[float]]:
+        """
+        Load the coefficients of all proposition-edges (in float32, like the coefficient matrix of a snapshot loaded
+        with the coefficients)
+        """
+        labels, bindings = bind_list("edge_label", QUESTION_EDGE_LABELS)
+        query = Query(
+            f"g.E().hasLabel({labels}).has('list_coef').project('id', 'list_coef').by(id).by(values('list_coef'))"
+        )
+        return {
+            row["id"]: decode_coefs(row["list_coef"]).astype(np.float32)
+            for row in self.run_gremlin_query(query, bindings)
+        }
 
     def get_next_question(self, form: Form, question_number: int) -> Question:
         """
-        get the next question according the form
+        get the next question according the form (only in-memory lookups in the question graph snapshot)
         """
         if form.already_completed and len(form.question_list) > question_number:
             return form.question_list[question_number]
         actual_question = None if not form.question_list else form.question_list[question_number - 1]
-        if actual_question is None:
-            query = Query(f"g.V('{FIRST_NODE_ID}')")
-        elif actual_question.type in ("Q_Open", "Q_QRM"):
-            query = Query(f"g.V('{actual_question.question_id}').out()")
-        elif actual_question.type in ("Q_QCM", "Q_QCM_Bool"):
-            query = Query(
-                f"g.V('{actual_question.question_id}').outE().has('text','{actual_question.choosen_answers[0].text}').inV()"
-            )
-        elif actual_question.type == END_TYPE:
+        if actual_question is not None and actual_question.type == END_TYPE:
             return form.question_list[-1]
-        else:
-            raise ValueError(f"Question type {actual_question.type} not supported")
-        next_question = self.run_gremlin_query(query)[0]
-        new_question = Question(
-            question_id=next_question["id"],
-            text=next_question["properties"]["text"][0]["value"] if "text" in next_question["properties"] else "",
-            type=next_question["label"],
-        )
-        new_question.help_text = (
-            next_question["properties"]["help text"][0]["value"] if "help text" in next_question["properties"] else ""
-        )
-        new_question.possible_answers = self.get_propositions(new_question)
+        new_question = self.get_question_graph().get_next_question(actual_question)
         form.add_question(new_question)
         return form.question_list[-1]
 
-    def get_propositions(self, question: Question) -> list[Answer]:
-        """
-        Get all possibles Answers for a Question from the database
-        """
-        query = Query(f"g.V('{question.question_id}').outE()")
-        existing_answers = self.run_gremlin_query(query)
-        answers_list: list[Answer] = []
-        for answer in existing_answers:
-            answers_list.append(
-                Answer(
-                    answer_id=answer["id"],
-                    text=answer["properties"]["text"] if "text" in answer["properties"] else "Q_Next",
-                    help_text=answer["properties"]["help text"] if "help text" in answer["properties"] else "",
-                    modif_crypted=answer["properties"]["modif_crypted"] == "true"
-                    if "modif_crypted" in answer["properties"]
-                    else False,
-                    metric=None if "metric" not in answer["properties"] else answer["properties"]["metric"].split(","),
-                    list_coef=[float(coef) for coef in (answer["properties"]["list_coef"].split(", "))]
-                    if "list_coef" in answer["properties"]
-                    else [],
-                )
-            )
-        return answers_list
-
     def create_user_node(self, username: Optional[Username]) -> None:
         """
         Create a User node in the database
         """
         if username is None:
             return
-        query = Query(f"g.addV('user').property('partitionKey', 'Answer').property('id', '{username}')")
-        self.run_gremlin_query(query)
+        query = Query("g.addV('user').property('partitionKey', 'Answer').property('id', username)")
+        self.run_gremlin_query(query, {"username": username})
 
     def get_all_users(self) -> list[Username]:
         """
         Return all Username in the database
         """
-        return self.run_gremlin_query(Query("g.V().hasLabel('user').id()"))
+        return self.run_gremlin_query(ALL_USERS_QUERY)
 
     def get_all_feedbacks(self) -> list[UserFeedback]:
         """
-        Return all Feedbacks in the database
+        Return all Feedbacks in the database (grouped by User with a single traversal)
+        """
+        return self.get_feedbacks_page()
+
+    def get_feedbacks_page(self, offset: int = 0, limit: Optional[int] = None) -> list[UserFeedback]:
+        """
+        Return the Feedbacks of the Users number offset to offset+limit (ordered by username), with a single traversal
         """
-        all_users = self.get_all_users()
-        all_feedbacks = []
-        for user in all_users:
-            all_feedbacks.append(self.get_user_feedbacks(user))
-        return all_feedbacks
+        page = "" if limit is None else ".range(low, high)"
+        query = Query(
+            f"g.V().hasLabel('user').order().by(id){page}"
+            ".project('user', 'feedbacks').by(id).by(outE('Feedback').values('text').fold())"
+        )
+        bindings = {} if limit is None else {"low": offset, "high": offset + limit}
+        return [
+            UserFeedback(Username(result["user"]), result["feedbacks"])
+            for result in self.run_gremlin_query(query, bindings)
+        ]
+
+    def get_nb_users(self) -> int:
+        """
+        Return the number of Users in the database
+        """
+        return self.run_gremlin_query(Query("g.V().hasLabel('user').count()"))[0]
 
     def get_user_feedbacks(self, username: Username) -> UserFeedback:
         """
         Return all feedbacks from a user in the database
         """
-        query = Query(f"g.V('{username}').outE().hasLabel('Feedback').values('text')")
-        return UserFeedback(username, self.run_gremlin_query(query))
+        query = Query("g.V(username).outE().hasLabel('Feedback').values('text')")
+        return UserFeedback(username, self.run_gremlin_query(query, {"username": username}))
 
     def save_feedback(self, username: Username, feedback: Feedback) -> None:
         """
@@ -177,16 +472,16 @@ class DbConnection(DBInterface):
         """
         if node_id is None or not node_id:
             return False
-        query = Query(f"g.V('{node_id}')")
-        return bool(self.run_gremlin_query(query))
+        return bool(self.run_gremlin_query(NODE_EXIST_QUERY, {"node_id": node_id}))
 
     def create_feedback_node(self, username: Username) -> None:
         """
         Create a Feedback node in the database
         """
-        query = Query(f"g.addV('Feedback').property('partitionKey', 'Feedback').property('id', 'feedback{username}')")
-        self.run_gremlin_query(query)
-        time.sleep(0.2)  # used to wait the node creation before calling the edge creation
+        query = Query("g.addV('Feedback').property('partitionKey', 'Feedback').property('id', feedback_node_id)")
+        self.run_confirmed_query(
+            query, {"feedback_node_id": f"feedback{username}"}, f"The feedback node of {username} could not be created"
+        )
 
     def create_feedback_edge(self, username: Username, feedback: Feedback) -> None:
         """
@@ -194,24 +489,32 @@ class DbConnection(DBInterface):
         """
         nb_feedback = self.get_nb_feedback_from_user(username)
         feedback_edge_id = f"Feedback-{username}-{nb_feedback+1}"
-        self.run_gremlin_query(
-            Query(
-                f"g.V('{username}').addE('Feedback').to(g.V('feedback{username}')).property('id', '{feedback_edge_id}').property('text', '{feedback}')"
-            )
+        query = Query(
+            "g.V(username).as('user').V(feedback_node_id).addE('Feedback').from('user')"
+            ".property('id', feedback_edge_id).property('text', feedback_text)"
         )
+        bindings = {
+            "username": username,
+            "feedback_node_id": f"feedback{username}",
+            "feedback_edge_id": feedback_edge_id,
+            "feedback_text": feedback,
+        }
+        # The query returns nothing (and is retried) while the Feedback node is not visible yet
+        self.run_confirmed_query(query, bindings, f"The feedback {feedback_edge_id} could not be created")
 
     def get_nb_feedback_from_user(self, username: Username) -> int:
         """
         Return the number of Feedbacks a User has give
         """
-        query = Query(f"g.V('{username}').outE().hasLabel('Feedback').count()")
-        return self.run_gremlin_query(query)[0]
+        query = Query("g.V(username).outE().hasLabel('Feedback').count()")
+        return self.run_gremlin_query(query, {"username": username})[0]
 
     def save_answers(
         self, form: Form, best_ais: list[Tuple[str, float]], mlflow_id: Optional[str] = "", new_form_name: str = ""
     ) -> bool:
         """
         Save a Form completed by a User in the database, and drop the previous version of the Form if it's exist
+        The counters of the choosen propositions are incremented once the Form is saved
 
         Return:
             - True if the answers are saved, False if the form already exist
@@ -219,34 +522,209 @@ class DbConnection(DBInterface):
         if new_form_name:
             self.drop_form(form)
             form.form_name = new_form_name
+        # The coefficients are stored in the Answer edges (already loaded if the Form was scored)
+        coefficients = self.get_coefficients(list(form_answers_counts(form)))
+        if self.batched_writes:
+            is_saved = self.save_answers_batched(form, best_ais, mlflow_id, coefficients)
+        else:
+            is_saved = self.save_answers_sequential(form, best_ais, mlflow_id, coefficients)
+        if is_saved:
+            self.update_answer_counters(form_answers_counts(form))
+        return is_saved
+
+    def save_answers_sequential(
+        self,
+        form: Form,
+        best_ais: list[Tuple[str, float]],
+        mlflow_id: Optional[str] = "",
+        coefficients: Optional[Mapping[str, Sequence[float]]] = None,
+    ) -> bool:
+        """
+        Save a Form in the database with one query per node and per edge (about 4N+5 queries for N questions)
+        (coefficients : the coefficients of the choosen answers, see get_coefficients, loaded if not given)
+
+        Return:
+            - True if the answers are saved, False if the form already exist
+        """
         if not self.check_node_exist(form.username):
             self.create_user_node(form.username)
         if self.check_form_exist(form.username, form.form_name):
             return False
+        if coefficients is None:
+            coefficients = self.get_coefficients(list(form_answers_counts(form)))
         i = 0
         while form.question_list[i].type != END_TYPE:
-            new_node_name = f"{form.username}-answer{form.question_list[i].question_id}-{form.form_name}"
+            new_node_name = self.get_answer_node_id(form, form.question_list[i])
             if not self.check_node_exist(new_node_name):
                 self.create_answer_node(form.question_list[i], new_node_name)
-            next_new_node_name = f"{form.username}-answer{form.question_list[i+1].question_id}-{form.form_name}"
+            next_new_node_name = self.get_answer_node_id(form, form.question_list[i + 1])
             if not self.check_node_exist(next_new_node_name):
                 self.create_answer_node(form.question_list[i + 1], next_new_node_name)
-            self.create_answer_edges(new_node_name, next_new_node_name, form.question_list[i].choosen_answers)
+            self.create_answer_edges(
+                new_node_name, next_new_node_name, form.question_list[i].choosen_answers, coefficients
+            )
             i += 1
         # link between the User node and the first answer node
         first_node_id = f"{form.username}-answer{FIRST_NODE_ID}-{form.form_name}"
         string_best_ais = ", ".join([ai[0] for ai in best_ais])
-        self.run_gremlin_query(Query(f"g.V('{first_node_id}').property('best_ais', '{str(string_best_ais)}')"))
-        if mlflow_id is not None:
-            self.run_gremlin_query(Query(f"g.V('{first_node_id}').property('mlflow_id', '{mlflow_id}')"))
-        time.sleep(0.05)  # we wait to be sure that the previous nodes are well created
         self.run_gremlin_query(
-            Query(
-                f"g.V('{form.username}').addE('Answer').to(g.V('{first_node_id}')).property('partitionKey', 'Answer')"
+            Query("g.V(node_id).property('best_ais', best_ais)"),
+            {"node_id": first_node_id, "best_ais": string_best_ais},
+        )
+        if mlflow_id is not None:
+            self.run_gremlin_query(
+                Query("g.V(node_id).property('mlflow_id', mlflow_id)"),
+                {"node_id": first_node_id, "mlflow_id": mlflow_id},
             )
+        query = Query(
+            "g.V(username).as('user').V(node_id).addE('Answer').from('user').property('partitionKey', 'Answer')"
         )
+        bindings = {"username": form.username, "node_id": first_node_id}
+        self.run_confirmed_query(query, bindings, f"The form {form.form_name} could not be linked to {form.username}")
         return True
 
+    def save_answers_batched(
+        self,
+        form: Form,
+        best_ais: list[Tuple[str, float]],
+        mlflow_id: Optional[str] = "",
+        coefficients: Optional[Mapping[str, Sequence[float]]] = None,
+    ) -> bool:
+        """
+        Save a Form in the database with a constant number of chained traversals :
+            - 1 query to check if the Form already exist
+            - 1 traversal to upsert the User node and all answer nodes (with the best_ais and mlflow_id properties)
+            - 1 traversal per EDGES_PER_TRAVERSAL answer edges, the last one also links the User to the Form
+        If some edges can not be created, the answer nodes of the Form are removed (so it can be saved again) and a
+        RuntimeError is raised
+        (coefficients : the coefficients of the choosen answers, see get_coefficients, loaded if not given)
+
+        Return:
+            - True if the answers are saved, False if the form already exist
+        """
+        if form.username is None:
+            return False
+        if self.check_form_exist(form.username, form.form_name):
+            return False
+        if coefficients is None:
+            coefficients = self.get_coefficients(list(form_answers_counts(form)))
+        (nodes_query, nodes_bindings), *edges_queries = self.build_save_answers_queries(
+            form, best_ais, mlflow_id, coefficients
+        )
+        # The nodes traversal returns the last upserted node, which confirms that all nodes are written
+        self.run_confirmed_query(
+            nodes_query, nodes_bindings, f"The answer nodes of the form {form.form_name} could not be created"
+        )
+        for query, bindings in edges_queries:
+            # An edges traversal returns its last edge only if it created all its edges (see _add_answer_edges_query)
+            if not self.consistency.run_confirmed(partial(self.run_gremlin_query, query, bindings)):
+                self.drop_nodes(self.get_form_nodes_id(form))
+                raise RuntimeError(f"The answer edges of the form {form.form_name} could not be created")
+        return True
+
+    def build_save_answers_queries(
+        self,
+        form: Form,
+        best_ais: list[Tuple[str, float]],
+        mlflow_id: Optional[str] = "",
+        coefficients: Optional[Mapping[str, Sequence[float]]] = None,
+    ) -> list[Tuple[Query, dict]]:
+        """
+        Build the chained traversals (and their bindings) used by save_answers_batched : one traversal upserting the
+        User node (which may already exist) and creating the answer nodes, then the traversals creating the edges
+        The templates only depend on the shape of the Form, so they are reused by all Forms with the same shape
+        """
+        nodes_id = self.get_form_nodes_id(form)
+        questions = form.question_list[: len(nodes_id)]
+
+        nodes_query = (
+            "g.V(username).fold()"
+            ".coalesce(unfold(), addV('user').property('partitionKey', 'Answer').property('id', username))"
+        )
+        nodes_bindings: dict = {"username": form.username, "best_ais": ", ".join([ai[0] for ai in best_ais])}
+        for index, (question, node_id) in enumerate(zip(questions, nodes_id)):
+            nodes_query += f".V(n{index}).fold().coalesce(unfold(), {self._add_answer_node_step(question, index)})"
+            nodes_bindings.update({f"n{index}": node_id, f"qid{index}": question.question_id})
+            if question.type != END_TYPE:
+                nodes_bindings[f"qtext{index}"] = question.text
+            if question.question_id == FIRST_NODE_ID:
+                nodes_query += ".property('best_ais', best_ais)"
+                if mlflow_id is not None:
+                    nodes_query += ".property('mlflow_id', mlflow_id)"
+                    nodes_bindings["mlflow_id"] = mlflow_id
+        queries = [(Query(nodes_query), nodes_bindings)]
+
+        edges: list[Tuple[str, str, Optional[Answer]]] = [
+            (nodes_id[index], nodes_id[index + 1], proposition)
+            for index, question in enumerate(questions[:-1])
+            for proposition in question.choosen_answers
+        ]
+        edges.append((str(form.username), nodes_id[0], None))  # The edge linking the User to the Form
+        for chunk_start in range(0, len(edges), EDGES_PER_TRAVERSAL):
+            queries.append(
+                self._add_answer_edges_query(edges[chunk_start : chunk_start + EDGES_PER_TRAVERSAL], coefficients)
+            )
+        return queries
+
+    def _add_answer_edges_query(
+        self,
+        edges: list[Tuple[str, str, Optional[Answer]]],
+        coefficients: Optional[Mapping[str, Sequence[float]]] = None,
+    ) -> Tuple[Query, dict]:
+        """
+        Build one traversal creating Answer edges (source id, target id, proposition or None for the edge of the User)
+        All the nodes are found before the first edge is added : the traversal creates all its edges and returns the
+        last one, or creates nothing and returns nothing if a node is not visible yet (so it can be retried)
+        """
+        query = "g"
+        bindings: dict = {}
+        steps: dict[str, str] = {}  # The step label of each node
+        for node_id in (node_id for source_id, target_id, _ in edges for node_id in (source_id, target_id)):
+            if node_id not in steps:
+                steps[node_id] = f"v{len(steps)}"
+                query += f".V({steps[node_id]}).as('{steps[node_id]}')"
+                bindings[steps[node_id]] = node_id
+        for index, (source_id, target_id, proposition) in enumerate(edges):
+            query += f".addE('Answer').from('{steps[source_id]}').to('{steps[target_id]}')"
+            if proposition is None:
+                query += ".property('partitionKey', 'Answer')"
+                continue
+            properties, edge_bindings = answer_edge_properties(proposition, coefficients, suffix=str(index))
+            query += properties
+            bindings.update(edge_bindings)
+        return Query(query), bindings
+
+    def _add_answer_node_step(self, question: Question, index: int) -> str:
+        if question.type == END_TYPE:
+            return (
+                f"addV('end').property('partitionKey', 'Answer').property('id', n{index})"
+                f".property('question_id', qid{index})"
+            )
+        return (
+            f"addV('Answer').property('partitionKey', 'Answer').property('id', n{index})"
+            f".property('question', qtext{index}).property('question_id', qid{index})"
+        )
+
+    def get_answer_node_id(self, form: Form, question: Question) -> str:
+        """
+        Get the id of the node storing the answers of a Question in a Form
+        """
+        return f"{form.username}-answer{question.question_id}-{form.form_name}"
+
+    def get_form_nodes_id(self, form: Form) -> list[str]:
+        """
+        Get the ids of the nodes storing the answers of a Form (from the first question to the end)
+        """
+        end_index = next(index for index, question in enumerate(form.question_list) if question.type == END_TYPE)
+        return [self.get_answer_node_id(form, question) for question in form.question_list[: end_index + 1]]
+
+    def drop_nodes(self, nodes_id: list[str]) -> None:
+        """
+        Drop some nodes (and their edges) from the database
+        """
+        ids, bindings = bind_list("node_id", nodes_id)
+        self.run_gremlin_query(Query(f"g.V({ids}).drop()"), bindings)
+
     def check_form_exist(self, username: Optional[Username], form_name: str) -> bool:
         """
         Check if a Form exist in the database
@@ -259,24 +737,26 @@ class DbConnection(DBInterface):
         """
         Create a answered Question node in the database
         """
+        bindings = {"node_id": new_node_id, "question_id": question.question_id}
         if question.type == END_TYPE:
-            self.run_gremlin_query(
-                Query(
-                    f"g.addV('end').property('partitionKey', 'Answer').property('id', '{new_node_id}').property('question_id', '{question.question_id}')"
-                )
+            query = Query(
+                "g.addV('end').property('partitionKey', 'Answer').property('id', node_id)"
+                ".property('question_id', question_id)"
             )
         else:
-            self.run_gremlin_query(
-                Query(
-                    f"g.addV('Answer').property('partitionKey', 'Answer').property('id', '{new_node_id}').property('question', '{question.text}').property('question_id', '{question.question_id}')"
-                )
+            query = Query(
+                "g.addV('Answer').property('partitionKey', 'Answer').property('id', node_id)"
+                ".property('question', question_text).property('question_id', question_id)"
             )
+            bindings["question_text"] = question.text
+        self.run_confirmed_query(query, bindings, f"The answer node {new_node_id} could not be created")
 
     def create_answer_edges(
         self,
         source_node_id: str,
         target_node_id: str,
         answers: AnswersList,
+        coefficients: Optional[Mapping[str, Sequence[float]]] = None,
     ) -> None:
         """
         Create an edge between two nodes
@@ -285,140 +765,195 @@ class DbConnection(DBInterface):
             - source_node_id : id of the source node
             - target_node_id : id of the target node
             - answers : list of the answers of the user
+            - coefficients : the coefficients of the answers loaded without them (see get_coefficients)
         """
-        time.sleep(0.05)  # we wait to be sure that the previous nodes are well created
         for proposition in answers:
-            query = f"""
-                        g.V('{source_node_id}')
-                            .addE('Answer')
-                            .to(g.V('{target_node_id}'))
-                            .property('answer', '{proposition.text}')
-                            .property('proposition_id', '{proposition.answer_id}')
-                            .property('list_coef', '{str(proposition.list_coef)[1:-1]}')
-                    """
-            if proposition.metric is not None:
-                if isinstance(proposition.metric, str):
-                    query += f""".property('metric', "{proposition.metric}")"""
-                elif isinstance(proposition.metric, list):
-                    query += f""".property('metric', "{','.join(proposition.metric)}")"""
-                else:
-                    raise RuntimeError("Unknow problem with metrics in Answer")
-            self.run_gremlin_query(Query(query))
-
-    def drop_form(self, form: Form) -> None:
-        """
-        drop a Form in the database
+            properties, bindings = answer_edge_properties(proposition, coefficients)
+            query = Query("g.V(source_id).as('source').V(target_id).addE('Answer').from('source')" + properties)
+            bindings.update({"source_id": source_node_id, "target_id": target_node_id})
+            # The query returns nothing (and is retried) while one of the two nodes is not visible yet
+            self.run_confirmed_query(
+                query, bindings, f"The answer edge from {source_node_id} to {target_node_id} could not be created"
+            )
+
+    def drop_form(self, form: Form) -> int:
+        """
+        drop a Form in the database : the whole answer chain (from the first node to the end node) is removed with a
+        single traversal (the edges of the chain are removed with their nodes), which also returns the propositions
+        of the removed edges to decrement their counters
+
+        Return:
+            - the number of removed nodes
         """
         node_id = f"{form.username}-answer{FIRST_NODE_ID}-{form.form_name}"
-        keep_going = True
-        while keep_going:
-            next_node_id = self.run_gremlin_query(Query(f"g.V('{node_id}').out().properties('id')"))
-            self.run_gremlin_query(Query(f"g.V('{node_id}').drop()"))
-            if not next_node_id:
-                return
-            node_id = next_node_id[0]["value"]
+        result = self.run_gremlin_query(DROP_FORM_QUERY, {"node_id": node_id})
+        if not result:
+            return 0
+        deltas: dict[str, int] = {}
+        for proposition_id in result[0]["propositions"]:
+            deltas[proposition_id] = deltas.get(proposition_id, 0) - 1
+        self.update_answer_counters(deltas)
+        return result[0]["nb_nodes"]
+
+    def get_answer_counters(self) -> dict[str, int]:
+        """
+        Get the number of times each proposition was selected, stored in the stats vertex (1 query), the stats vertex
+        is first created from a count of the Answer edges if it does not exist yet (see initialize_answer_counters)
+        """
+        counters = self.read_answer_counters()
+        return self.initialize_answer_counters() if counters is None else counters
+
+    def read_answer_counters(self) -> Optional[dict[str, int]]:
+        """
+        Read the counters of the stats vertex (None if the stats vertex does not exist)
+        """
+        result = self.run_gremlin_query(ANSWER_STATS_QUERY, {"stats_id": ANSWER_STATS_ID})
+        return counters_from_value_map(result[0]) if result else None
+
+    def initialize_answer_counters(self) -> dict[str, int]:
+        """
+        Create the stats vertex with the counters built from a count of all Answer edges (Exemple : on a database whose
+        forms were saved before the counters), the counters written meanwhile by another session are kept
+
+        Return :
+            - the counters of the stats vertex
+        """
+        result = self.run_gremlin_query(ANSWER_COUNTS_QUERY)
+        counts = {proposition_id: int(count) for proposition_id, count in (result[0] if result else {}).items()}
+        for query, bindings in answer_counters_queries(counts, expected={}):
+            if not self._run_compare_and_set(query, bindings):
+                break
+        counters = self.read_answer_counters()
+        return counts if counters is None else counters
+
+    def update_answer_counters(self, deltas: dict[str, int]) -> None:
+        """
+        Add deltas to the counters of the stats vertex (Exemple : {"1-2": 1} when a Form with this proposition is
+        saved), usually with 1 query to read the counters and 1 traversal to write them
+        Cosmos DB has no transaction over several queries (and no math() step to increment a property), so the
+        counters are written with a compare-and-set (see answer_counters_queries) : the counters changed meanwhile by
+        a concurrent update are read again and the write is retried, so no update is lost
+        If the stats vertex does not exist yet, it is created from a count of the Answer edges, which already includes
+        the saved or dropped Form
+        """
+        deltas = {proposition_id: delta for proposition_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        counters = self.read_answer_counters()
+        if counters is None:
+            self.initialize_answer_counters()
+            return
+        items = list(deltas.items())
+        for chunk_start in range(0, len(items), COUNTERS_PER_TRAVERSAL):
+            counters = self._add_to_counters(dict(items[chunk_start : chunk_start + COUNTERS_PER_TRAVERSAL]), counters)
+
+    def _add_to_counters(self, deltas: dict[str, int], counters: dict[str, int]) -> dict[str, int]:
+        """
+        Add at most COUNTERS_PER_TRAVERSAL deltas to the counters with a compare-and-set, retried with the counters
+        read again while a concurrent update changed them
+
+        Return :
+            - the counters after the update
+        """
+        for _ in range(COUNTERS_MAX_ATTEMPTS):
+            new_counters = {
+                proposition_id: counters.get(proposition_id, 0) + delta for proposition_id, delta in deltas.items()
+            }
+            query, bindings = answer_counters_queries(new_counters, expected=counters)[0]
+            if self._run_compare_and_set(query, bindings):
+                return {**counters, **new_counters}
+            counters = self.read_answer_counters() or {}
+        raise RuntimeError(f"The answer counters could not be updated after {COUNTERS_MAX_ATTEMPTS} concurrent updates")
+
+    def _run_compare_and_set(self, query: Query, bindings: dict) -> bool:
+        """Run a compare-and-set traversal, return False if the element was changed meanwhile"""
+        try:
+            return bool(self.run_gremlin_query(query, bindings))
+        except GremlinServerError as error:
+            if error_status_code(error) == PRECONDITION_FAILED_STATUS_CODE:
+                return False
+            raise
 
     def get_all_forms_names(self, username: Username) -> list[str]:
         """
         Get all names of the forms of a User
         """
-        forms_id = self.run_gremlin_query(Query(f"g.V('{username}').outE().hasLabel('Answer').inV().id()"))
-        return list(_map(lambda x: x.split("-")[-1], forms_id))
+        return forms_names_from_ids(self.run_gremlin_query(FORMS_ID_QUERY, {"username": username}))
 
     def retrieve_previous_form(self, username: Username, selected_form_name: str) -> Form:
         """
-        Retrieve a already answered Form from the database
-        """
-        form = Form()
-        form.username = username
-        form.form_name = selected_form_name
-        form.already_completed = True
-        node = f"{username}-answer{FIRST_NODE_ID}-{selected_form_name}"
-        form.experiment_id = self.get_experiment(node)
-        question_number = 0
-        while self.get_node_label(node) != END_TYPE:
-            self.get_next_question(form, question_number)
-            answers = self.get_answers(node)
-            form.last_question.choosen_answers = answers
-            node = self.run_gremlin_query(Query(f"g.V('{node}').outE().inV().id()"))[0]
-            question_number += 1
-        self.get_next_question(form, question_number)
-        return form
-
-    def get_experiment(self, first_node: str) -> Optional[str]:
-        """Retrieve the mlflow's experiment id of a previous completed form"""
-        query = Query(f"g.V('{first_node}')")
-        node = self.run_gremlin_query(query)[0]
-        return node["properties"]["mlflow_id"][0]["value"] if "mlflow_id" in node["properties"] else None
-
-    def get_answers(self, node_id: str) -> list[Answer]:
-        """
-        Get all Answers of a Question in a previous Form stord in the database
-        """
-        query = Query(f"g.V('{node_id}').outE()")
-        props = self.run_gremlin_query(query)
-        answers = []
-        for prop in props:
-            answers.append(
-                Answer(
-                    answer_id=prop["properties"]["proposition_id"],
-                    text=prop["properties"]["answer"] if "answer" in prop["properties"] else "",
-                    help_text="",
-                    modif_crypted=False,
-                    metric=prop["properties"]["metric"] if "metric" in prop["properties"] else None,
-                    list_coef=[]
-                    if "list_coef" not in prop["properties"] or not prop["properties"]["list_coef"]
-                    else [float(coef) for coef in (prop["properties"]["list_coef"].split(", "))],
-                )
-            )
-        return answers
+        Retrieve a already answered Form from the database in one round trip : the whole answer chain is fetched
+        with a single traversal and the Form is rebuilt locally against the question graph snapshot
+        """
+        first_node_id = f"{username}-answer{FIRST_NODE_ID}-{selected_form_name}"
+        return self.build_previous_form(username, selected_form_name, self.get_form_chain(first_node_id))
 
-    def get_node_label(self, node_id: str) -> str:
+    def build_previous_form(self, username: Username, form_name: str, chain: list[dict]) -> Form:
         """
-        Get the label of a node
+        Rebuild a Form from its answer chain (returned by get_form_chain) and the question graph snapshot
         """
-        return self.run_gremlin_query(Query(f"g.V('{node_id}').label()"))[0]
+        return build_form_from_chain(username, form_name, chain, self.get_question_graph())
 
-    def get_nb_selected_edge(self) -> list[AnswersStats]:
+    def get_form_chain(self, first_node_id: str) -> list[dict]:
         """
-        Return a list of AnswersStats (Answer, nb_time_selected)
+        Get all nodes of a saved Form (from its first node to its end node) with a single traversal
+
+        Return :
+            - list of the nodes in the order of the Form, each node is a dict with the keys
+                id, label, question_id, mlflow_id and answers (list of the properties of its out Answer edges)
         """
-        query = Query("g.E().hasLabel('Answer').valueMap()")
-        result = self.run_gremlin_query(query)
+        return order_form_chain(first_node_id, self.run_gremlin_query(FORM_CHAIN_QUERY, {"node_id": first_node_id}))
 
-        nb_selected_edge: dict = {}  # key : proposition_id, value : [Answer dataclass, nb_selected]
-        for edge in result:
-            if "proposition_id" in edge:
-                if edge["proposition_id"] not in nb_selected_edge:
-                    query = Query(f"g.E('{edge['proposition_id']}')")
-                    answer_dict = self.run_gremlin_query(query)[0]
-                    text = "Q_Next" if "text" not in answer_dict["properties"] else answer_dict["properties"]["text"]
-                    answer = Answer(answer_id=answer_dict["id"], text=text)
-                    nb_selected_edge[edge["proposition_id"]] = [answer, 0]
-                nb_selected_edge[edge["proposition_id"]][1] += 1
+    def get_experiment(self, first_node: str) -> Optional[str]:
+        """Retrieve the mlflow's experiment id of a previous completed form"""
+        query = Query("g.V(node_id)")
+        node = self.run_gremlin_query(query, {"node_id": first_node})[0]
+        return node["properties"]["mlflow_id"][0]["value"] if "mlflow_id" in node["properties"] else None
 
+    def get_nb_selected_edge(self) -> list[AnswersStats]:
+        """
+        Return a list of AnswersStats (Answer, nb_time_selected) of the propositions selected at least once
+        The counters maintained by save_answers and drop_form are read in one query (O(#propositions)) and joined with
+        the propositions of the question graph (the counters are first built from the Answer edges if they do not
+        exist yet)
+        """
+        propositions = self.get_question_graph().propositions
         selected_edges = []
-        for _, val in nb_selected_edge.items():
-            selected_edges.append((val[0], val[1]))
+        for proposition_id, nb_selected in self.get_answer_counters().items():
+            if nb_selected <= 0:
+                continue
+            text = propositions[proposition_id].text if proposition_id in propositions else ""
+            selected_edges.append((Answer(answer_id=proposition_id, text=text), nb_selected))
         return selected_edges
 
     def get_all_ais(self) -> list[str]:
         """
         Get all the ais existing in the db
         """
-        return self.run_gremlin_query(Query(f"g.V('{FIRST_NODE_ID}').properties('list_AI').value()"))[0].split(", ")
+        query = Query("g.V(first_node_id).properties('list_AI').value()")
+        return self.run_gremlin_query(query, {"first_node_id": FIRST_NODE_ID})[0].split(", ")
 
     def get_best_ais(self, username: Username, form_name: str) -> list[str]:
         """
         Return the best ais for a form which was saved in the db
         """
         form_id = f"{username}-answer{FIRST_NODE_ID}-{form_name}"
-        query = Query(f"g.V('{form_id}').properties('best_ais').value()")
-        result = self.run_gremlin_query(query)
+        result = self.run_gremlin_query(BEST_AIS_QUERY, {"node_id": form_id})
         return result[0].split(", ") if result[0] else []
 
+    def get_all_best_ais(self) -> dict[Tuple[Username, str], list[str]]:
+        """
+        Return the best ais of all forms saved in the db, with a single query on the first nodes of the forms
+        """
+        forms = self.run_gremlin_query(ALL_BEST_AIS_QUERY)
+        forms_names = forms_names_from_ids([form["form_id"] for form in forms])
+        return {
+            (Username(form["username"]), form_name): form["best_ais"].split(", ") if form["best_ais"] else []
+            for form, form_name in zip(forms, forms_names)
+        }
+
     def get_experiment_id(self, username: Username, form_name: str) -> list[str]:
         """Method used to get an experiment ID stored in the form"""
         node_name = f"{username}-answer1-{form_name}"
-        query = Query(f"g.V('{node_name}').properties('mlflow_id').value()")
-        return self.run_gremlin_query(query)
+        query = Query("g.V(node_id).properties('mlflow_id').value()")
+        return self.run_gremlin_query(query, {"node_id": node_name})
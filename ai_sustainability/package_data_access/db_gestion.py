@@ -1,14 +1,410 @@
 """ File used to manage the online database """
+import asyncio
+import hashlib
 import json
 import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Iterator, Optional, Union
 
-import pandas as pd
+import aiohttp
+import numpy as np
 from decouple import config
 from gremlin_python import statics
 from gremlin_python.driver import client, serializer
+from gremlin_python.driver.protocol import GremlinServerError
+
+from ai_sustainability.package_business.scoring import (
+    batch_best_ais,
+    batch_scores,
+    build_incidence_matrix,
+)
+from ai_sustainability.package_data_access.coef_codec import (
+    decode_coefs,
+    decode_coefs_matrix,
+    encode_coefs,
+    is_compact,
+    same_coefs,
+)
+from ai_sustainability.package_data_access.db_connection import (
+    ANSWER_COUNTS_QUERY,
+    ANSWER_STATS_ID,
+    ANSWER_STATS_QUERY,
+    answer_counters_queries,
+    counters_from_value_map,
+    error_status_code,
+)
+from ai_sustainability.package_data_access.graph_file import (
+    open_graph_file,
+    read_graph_file,
+    write_graph_elements,
+)
+from ai_sustainability.package_data_access.query_builder import QueryBuilder, bind_list
+from ai_sustainability.package_data_access.query_metrics import tag_queries
+from ai_sustainability.package_data_access.question_graph import (
+    QUESTION_EDGE_LABELS,
+    QUESTION_PARTITION_KEY,
+    VERSION_PROPERTY,
+)
+from ai_sustainability.package_data_access.weight_matrix import WeightMatrix
 
 statics.load_statics(globals())
 
+FORMS_PER_PAGE = 100  # Number of stored forms loaded by one traversal in rescore_forms
+FORMS_PER_TRAVERSAL = 50  # Maximal number of forms whose best AIs are written by one traversal in rescore_forms
+EXPORT_PAGE_SIZE = 500  # Number of vertices or edges loaded by one traversal in save_graph
+EXPORT_SCOPES = ("all", "questions", "answers")  # The parts of the graph saved by save_graph
+IMPORT_MAX_IN_FLIGHT = 8  # Default number of queries of import_graph running at the same time
+IMPORT_MAX_RETRIES = 8  # Maximal number of retries of one query of import_graph before the import stops
+CHECKPOINT_EVERY = 100  # Number of imported queries between two writes of the checkpoint file of import_graph
+RETRYABLE_STATUS_CODES = (408, 429, 449, 503)  # Timeout, throttling (request rate too large), retry with, unavailable
+RETRYABLE_ERRORS = (ConnectionError, TimeoutError, asyncio.TimeoutError, aiohttp.ClientError)  # Network errors
+QUERY_ERRORS = (GremlinServerError, *RETRYABLE_ERRORS)  # Errors sent back by the database, and network errors
+CONFLICT_STATUS_CODE = 409  # The element already exists
+ScriptQuery = Union[str, dict]  # A query of a script : a gremlin query, or a dict with "query" and "bindings"
+SYNC_IGNORED_PROPERTIES = (VERSION_PROPERTY,)  # Properties written by the database tools, not compared by sync_graph
+
+
+@dataclass
+class ImportStats:
+    """Dataclass with the counters of one run of import_graph"""
+
+    nb_queries: int = 0  # Number of queries in the script
+    nb_sent: int = 0  # Number of queries run (the others were imported by a previous interrupted run)
+    nb_retries: int = 0  # Number of retries after a throttling or a network error
+    duration: float = 0.0  # in seconds
+
+    def queries_per_second(self) -> float:  # Not a property : property is a gremlin step in this module
+        return self.nb_sent / self.duration if self.duration else 0.0
+
+
+def script_query(query: ScriptQuery) -> tuple[str, Optional[dict]]:
+    """Return the script template and the bindings of a query of a script"""
+    if isinstance(query, str):
+        return query, None
+    return query["query"], query["bindings"]
+
+
+def is_retryable(error: Exception) -> bool:
+    return isinstance(error, RETRYABLE_ERRORS) or error_status_code(error) in RETRYABLE_STATUS_CODES
+
+
+def retry_delay(error: Exception, retry: int, base_delay: float = 0.1, max_delay: float = 5.0) -> float:
+    """
+    Return the delay (in seconds) before a retry : the delay asked by Cosmos DB (x-ms-retry-after-ms) if there is one,
+    otherwise a bounded exponential backoff
+    """
+    status_attributes = getattr(error, "status_attributes", None) or {}
+    if "x-ms-retry-after-ms" in status_attributes:
+        return float(status_attributes["x-ms-retry-after-ms"]) / 1000
+    return float(np.minimum(base_delay * 2**retry, max_delay))  # min is a gremlin step in this module
+
+
+@dataclass
+class GraphDiff:
+    """
+    Dataclass with the queries making the question graph of the database equal to a local graph, by phase : the
+    queries of a phase can run at the same time, the phases run one after the other
+    """
+
+    drop_queries: list[ScriptQuery] = field(default_factory=list)  # The removed elements and the recreated ones
+    vertex_queries: list[ScriptQuery] = field(default_factory=list)  # The added vertices and the changed properties
+    edge_queries: list[ScriptQuery] = field(default_factory=list)  # The added edges and the changed properties
+
+    def phases(self) -> list[list[ScriptQuery]]:
+        return [self.drop_queries, self.vertex_queries, self.edge_queries]
+
+    def nb_queries(self) -> int:
+        return sum(len(phase) for phase in self.phases())
+
+
+class ImportCheckpoint:
+    """
+    Class with the indexes of the queries of a script already imported by import_graph, written in a checkpoint file
+    every CHECKPOINT_EVERY queries so an interrupted import can be resumed
+
+    Parameters :
+        - path : the path of the checkpoint file (Exemple : "data/script.json.checkpoint")
+        - script_path : the path of the script
+        - nb_queries : number of queries in the script
+        - script_sha256 : the sha256 of the content of the script, so a checkpoint of a changed script is ignored
+
+    Methods :
+        - load : read the checkpoint file (ignored if it was written for another script or another content)
+        - is_complete : True if all queries of the script are imported
+        - mark_done : add the index of an imported query
+        - save : write the checkpoint file (replaced in one step)
+        - remove : remove the checkpoint file (at the end of the import)
+    """
+
+    def __init__(self, path: str, script_path: str, nb_queries: int, script_sha256: str) -> None:
+        self.path = path
+        self.script_path = script_path
+        self.nb_queries = nb_queries
+        self.script_sha256 = script_sha256
+        self.done: set[int] = set()
+
+    @classmethod
+    def load(cls, path: str, script_path: str, nb_queries: int, script_sha256: str) -> "ImportCheckpoint":
+        checkpoint = cls(path, script_path, nb_queries, script_sha256)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                content = json.load(file)
+            if (content["script_path"], content["nb_queries"], content.get("script_sha256")) == (
+                script_path,
+                nb_queries,
+                script_sha256,
+            ):
+                checkpoint.done = set(content["done"])
+        return checkpoint
+
+    def is_complete(self) -> bool:
+        return len(self.done) == self.nb_queries
+
+    def mark_done(self, index: int) -> None:
+        self.done.add(index)
+        if len(self.done) % CHECKPOINT_EVERY == 0:
+            self.save()
+
+    def save(self) -> None:
+        with open(self.path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "script_path": self.script_path,
+                    "nb_queries": self.nb_queries,
+                    "script_sha256": self.script_sha256,
+                    "done": sorted(self.done),
+                },
+                file,
+            )
+        os.replace(self.path + ".tmp", self.path)
+
+    def remove(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def best_ais_queries(forms_best_ais: list[tuple[str, str]]) -> list[tuple[str, dict]]:
+    """
+    Create the traversals (and their bindings) writing the best AIs of some forms (node id of their first node, best
+    AIs), FORMS_PER_TRAVERSAL forms by traversal
+    """
+    queries = []
+    for chunk_start in range(0, len(forms_best_ais), FORMS_PER_TRAVERSAL):
+        chunk = forms_best_ais[chunk_start : chunk_start + FORMS_PER_TRAVERSAL]
+        query = "g" + "".join(f".V(n{index}).property(single, 'best_ais', b{index})" for index in range(len(chunk)))
+        bindings: dict = {}
+        for index, (node_id, best_ais) in enumerate(chunk):
+            bindings.update({f"n{index}": node_id, f"b{index}": best_ais})
+        queries.append((query, bindings))
+    return queries
+
+
+def export_filters(scope: str) -> tuple[str, str, dict]:
+    """
+    Return the filter steps of the vertices and of the edges saved by save_graph, and their bindings :
+    "questions" is the question graph (the question-nodes and the proposition-edges), "answers" is everything else
+    (the users, the saved forms, the feedbacks and the stats vertex), "all" is the whole graph
+    """
+    if scope not in EXPORT_SCOPES:
+        raise ValueError(f"Unknown export scope {scope}, expected one of {EXPORT_SCOPES}")
+    if scope == "all":
+        return "", "", {}
+    labels, bindings = bind_list("edge_label", QUESTION_EDGE_LABELS)
+    bindings["partition_key"] = QUESTION_PARTITION_KEY
+    if scope == "questions":
+        return ".has('partitionKey', partition_key)", f".hasLabel({labels})", bindings
+    return ".not(has('partitionKey', partition_key))", f".not(hasLabel({labels}))", bindings
+
+
+def graph_element(element: dict) -> dict:
+    """
+    Return the label, the properties (as {name: value}, the properties of a GraphSON vertex are lists of values) and
+    the ends (edges only) of a GraphSON element
+    """
+    properties = {
+        prop: values[0]["value"] if isinstance(values, list) else values
+        for prop, values in element.get("properties", {}).items()
+    }
+    if "outV" not in element:
+        return {"label": element["label"], "properties": properties}
+    return {"label": element["label"], "outV": element["outV"], "inV": element["inV"], "properties": properties}
+
+
+def local_graph(data_path: str, matrix_path: Optional[str] = None) -> tuple[dict[str, dict], dict[str, dict]]:
+    """
+    Read the graph of a graph file, and update all weight from a local weight_matrix excel file if matrix_path is
+    given (with the list of all AI's name in the node with id=1), the excel file is compiled once (see WeightMatrix)
+
+    Parameters :
+        - data_path : the path of the graph file (string) (Exemple : "data/graph.ndjson.gz")
+        - matrix_path : the path of the excel file where the weight matrix is stored (Exemple : Weight_matrix.xlsx)
+
+    Return :
+        - the vertices and the edges by id (see graph_element)
+    """
+    vertices, edges = read_graph_file(data_path)
+    print(f"File {data_path} loaded")
+    local_vertices = {vertex["id"]: graph_element(vertex) for vertex in vertices}
+    local_edges = {edge["id"]: graph_element(edge) for edge in edges}
+    if matrix_path is None:
+        return local_vertices, local_edges
+
+    weight_matrix = WeightMatrix.load(matrix_path)
+    if "1" in local_vertices:
+        local_vertices["1"]["properties"].pop("list_AI", None)
+        local_vertices["1"]["properties"]["list_AI"] = weight_matrix.list_ai_string()
+    for edge_id, edge in local_edges.items():
+        edge["properties"].pop("list_coef", None)
+        edge["properties"]["list_coef"] = weight_matrix.coef_string(edge_id)
+        metric = weight_matrix.metric(edge_id)
+        if metric is not None:  # To now which metric use for each choice in then form
+            edge["properties"]["metric"] = metric
+    return local_vertices, local_edges
+
+
+def graph_script(vertices: dict[str, dict], edges: dict[str, dict]) -> list[dict]:
+    """Create the queries of a script creating a graph (the vertices then the edges, see local_graph)"""
+    querys = [vertex_query(vertex_id, vertex["label"], vertex["properties"]) for vertex_id, vertex in vertices.items()]
+    for edge_id, edge in edges.items():
+        querys.append(edge_query(edge_id, edge["label"], edge["outV"], edge["inV"], edge["properties"]))
+    return querys
+
+
+def question_elements(vertices: dict[str, dict], edges: dict[str, dict]) -> tuple[dict[str, dict], dict[str, dict]]:
+    """Keep only the question-nodes and the proposition-edges of a graph (see local_graph)"""
+    return (
+        {
+            vertex_id: vertex
+            for vertex_id, vertex in vertices.items()
+            if vertex["properties"].get("partitionKey") == QUESTION_PARTITION_KEY
+        },
+        {edge_id: edge for edge_id, edge in edges.items() if edge["label"] in QUESTION_EDGE_LABELS},
+    )
+
+
+def same_property(prop: str, local_value: Any, live_value: Any) -> bool:
+    """Compare a property of a local and of a live element, the coefficients are compared in any format"""
+    if prop == "list_coef" and isinstance(local_value, str) and isinstance(live_value, str):
+        return same_coefs(local_value, live_value)
+    return local_value == live_value
+
+
+def property_queries(element: str, element_id: str, local: dict[str, Any], live: dict[str, Any]) -> list[dict]:
+    """
+    Create the queries writing the changed properties of a vertex (element="V") or of an edge (element="E") and
+    dropping its removed properties (a property of a vertex is replaced, not added to its list of values)
+
+    Parameters :
+        - element_id : the id of the vertex or of the edge
+        - local : the properties wanted
+        - live : the properties in the database
+    """
+    queries = []
+    changed = {
+        prop: value
+        for prop, value in local.items()
+        if prop not in SYNC_IGNORED_PROPERTIES and (prop not in live or not same_property(prop, value, live[prop]))
+    }
+    removed = [prop for prop in live if prop not in local and prop not in SYNC_IGNORED_PROPERTIES]
+    if changed:
+        query = f"g.{element}(element_id)"
+        bindings = {"element_id": element_id}
+        cardinality = "single, " if element == "V" else ""
+        for index, (prop, value) in enumerate(changed.items()):
+            query += f".property({cardinality}'{prop}', value{index})"
+            bindings[f"value{index}"] = value
+        queries.append({"query": query, "bindings": bindings})
+    if removed:
+        names = ", ".join(f"'{prop}'" for prop in removed)
+        queries.append(
+            {"query": f"g.{element}(element_id).properties({names}).drop()", "bindings": {"element_id": element_id}}
+        )
+    return queries
+
+
+def diff_graph(
+    local: tuple[dict[str, dict], dict[str, dict]], live: tuple[dict[str, dict], dict[str, dict]]
+) -> GraphDiff:
+    """
+    Compute the queries making a live graph equal to a local graph : the elements missing in the local graph are
+    dropped, the ones missing in the live graph are created, the changed properties are written, and an element whose
+    label, ends or partition key changed is dropped and created again (they can not be updated)
+
+    Parameters :
+        - local : the vertices and the edges wanted (see local_graph)
+        - live : the vertices and the edges in the database
+
+    Return :
+        - the queries by phase (see GraphDiff)
+    """
+    (local_vertices, local_edges), (live_vertices, live_edges) = local, live
+
+    def identity(element: dict) -> tuple:
+        return element["label"], element.get("outV"), element.get("inV"), element["properties"].get("partitionKey")
+
+    dropped_vertices = {
+        vertex_id
+        for vertex_id, vertex in live_vertices.items()
+        if vertex_id not in local_vertices or identity(local_vertices[vertex_id]) != identity(vertex)
+    }
+    # The edges of a dropped vertex are dropped with it
+    kept_edges = {
+        edge_id: edge
+        for edge_id, edge in live_edges.items()
+        if edge["outV"] not in dropped_vertices and edge["inV"] not in dropped_vertices
+    }
+    dropped_edges = {
+        edge_id
+        for edge_id, edge in kept_edges.items()
+        if edge_id not in local_edges or identity(local_edges[edge_id]) != identity(edge)
+    }
+    diff = GraphDiff()
+    for vertex_id in sorted(dropped_vertices):
+        diff.drop_queries.append({"query": "g.V(vertex_id).drop()", "bindings": {"vertex_id": vertex_id}})
+    for edge_id in sorted(dropped_edges):
+        diff.drop_queries.append({"query": "g.E(edge_id).drop()", "bindings": {"edge_id": edge_id}})
+    for vertex_id, vertex in local_vertices.items():
+        if vertex_id not in live_vertices or vertex_id in dropped_vertices:
+            diff.vertex_queries.append(vertex_query(vertex_id, vertex["label"], vertex["properties"]))
+        else:
+            diff.vertex_queries.extend(
+                property_queries("V", vertex_id, vertex["properties"], live_vertices[vertex_id]["properties"])
+            )
+    for edge_id, edge in local_edges.items():
+        if edge_id not in kept_edges or edge_id in dropped_edges:
+            diff.edge_queries.append(edge_query(edge_id, edge["label"], edge["outV"], edge["inV"], edge["properties"]))
+        else:
+            diff.edge_queries.extend(
+                property_queries("E", edge_id, edge["properties"], kept_edges[edge_id]["properties"])
+            )
+    return diff
+
+
+def vertex_query(vertex_id: str, label: str, properties: dict[str, Any]) -> dict:
+    """
+    Create the query (script template and bindings) adding a vertex, used in the scripts created by DbGestion
+    """
+    query = "g.addV(vertex_label).property('id', vertex_id)"
+    bindings = {"vertex_label": label, "vertex_id": vertex_id}
+    for index, (prop, value) in enumerate(properties.items()):
+        query += f".property('{prop}', value{index})"
+        bindings[f"value{index}"] = value
+    return {"query": query, "bindings": bindings}
+
+
+def edge_query(edge_id: str, label: str, out_id: str, in_id: str, properties: dict[str, Any]) -> dict:
+    """
+    Create the query (script template and bindings) adding an edge, used in the scripts created by DbGestion
+    """
+    query = "g.V(out_id).addE(edge_label).to(g.V(in_id)).property('id', edge_id)"
+    bindings = {"edge_label": label, "edge_id": edge_id, "out_id": out_id, "in_id": in_id}
+    for index, (prop, value) in enumerate(properties.items()):
+        query += f".property('{prop}', value{index})"
+        bindings[f"value{index}"] = value
+    return {"query": query, "bindings": bindings}
+
 
 class DbGestion:
     """
@@ -24,11 +420,16 @@ class DbGestion:
         - __init__
         - run_gremlin_query : run a gremlin query
         - close : close the connection to the database
-        - save_graph : save the graph in a json file
-        - create_script : create a script to create the graph from the json file created by save_graph
-        - create_script_with_weight : create a script to create the graph from the json file created by save_graph and
+        - save_graph : save the graph (or only the question graph, or only the answers) in a graph file, page by page
+        - create_script : create a script to create the graph from the graph file created by save_graph
+        - create_script_with_weight : create a script to create the graph from the graph file created by save_graph and
                 the weight matrix.xlsx file (used to update the coefficient of the AIs for each edges)
-        - import_graph : import a graph from a script created by create_script
+        - import_graph : import a graph from a script created by create_script (concurrent, retried and resumable)
+        - sync_graph : make the question graph equal to a local graph file by running only the differences
+        - stamp_graph_version : write a new version stamp of the question graph in the node with id=1
+        - rescore_forms : compute again the best AIs of all stored forms with the actual coefficients
+        - reconcile_answer_counters : rebuild the number of times each proposition was selected from the Answer edges
+        - migrate_list_coef : encode again the list_coef property of all edges in the compact or in the text format
     """
 
     def __init__(self, endpoint: str, database_name: str, container_name: str, primary_key: str) -> None:
@@ -43,16 +444,17 @@ class DbGestion:
             password=primary_key,
             message_serializer=serializer.GraphSONSerializersV2d0(),
         )
+        self.query_builder = QueryBuilder(self.gremlin_client)
 
-    def run_gremlin_query(self, query: str) -> list:
+    def run_gremlin_query(self, query: str, bindings: Optional[dict] = None) -> list:
         """
         Run a gremlin query
 
         Parameters :
-            - query : the gremlin query to run (string) (Exemple : "g.V()")
+            - query : the gremlin script template to run (string) (Exemple : "g.V(node_id)")
+            - bindings : the values of the variables of the template (Exemple : {"node_id": "1"})
         """
-        run = self.gremlin_client.submit(query).all()
-        return run.result()
+        return self.query_builder.submit(query, bindings)
 
     def close(self) -> None:
         """
@@ -60,51 +462,61 @@ class DbGestion:
         """
         self.gremlin_client.close()
 
-    def save_graph(self, path: str) -> None:
+    @tag_queries
+    def save_graph(self, path: str, scope: str = "all", page_size: int = EXPORT_PAGE_SIZE) -> tuple[int, int]:
         """
-        Save the graph in a json file
+        Save the graph in a graph file (one GraphSON element by line, compressed with gzip if the path ends with ".gz")
+        The vertices then the edges are loaded page by page, ordered by id, each page starting after the last id of
+        the previous one, and written at once, so the memory used does not grow with the graph
+        The file is written in a temporary file first, so an interrupted export keeps the previous file
 
         Parameters :
-            - path : the path of the json file (string) (Exemple : "data/graph.json")
+            - path : the path of the graph file (string) (Exemple : "data/graph.ndjson.gz")
+            - scope : "all", "questions" (only the question graph) or "answers" (only the users, forms and feedbacks)
+            - page_size : number of vertices or edges loaded by one query
+
+        Return :
+            - the number of vertices and the number of edges saved
         """
-        all_vertices = self.run_gremlin_query("g.V()")
-        all_edges = self.run_gremlin_query("g.E()")
-        if os.path.exists(path):
-            os.remove(path)
-        all_graph = [all_vertices, all_edges]
-        with open(path, "w", encoding="utf-8") as file:
-            json.dump(all_graph, file, ensure_ascii=False, indent=4)
-            file.close()
-        print(f"File {path} created")
+        vertex_filter, edge_filter, bindings = export_filters(scope)
+        root, extension = os.path.splitext(path)
+        temporary_path = f"{root}.tmp{extension}"  # Same extension, so the temporary file is compressed like the file
+        with open_graph_file(temporary_path, "w") as file:
+            nb_vertices = sum(
+                write_graph_elements(file, page)
+                for page in self._iter_pages(f"g.V(){vertex_filter}", bindings, page_size)
+            )
+            nb_edges = sum(
+                write_graph_elements(file, page)
+                for page in self._iter_pages(f"g.E(){edge_filter}", bindings, page_size)
+            )
+        os.replace(temporary_path, path)
+        print(f"File {path} created ({nb_vertices} vertices, {nb_edges} edges)")
+        return nb_vertices, nb_edges
+
+    def _iter_pages(self, traversal: str, bindings: dict, page_size: int, projection: str = "") -> Iterator[list[dict]]:
+        """
+        Load the elements of a traversal page by page, ordered by id, each page starting after the previous one
+        (projection : steps applied to the elements of a page, they must keep the id, Exemple : ".project('id')...")
+        """
+        query = traversal + ".has(id, gt(cursor)).order().by(id).limit(page_size)" + projection
+        cursor = ""
+        while True:
+            page = self.run_gremlin_query(query, {**bindings, "cursor": cursor, "page_size": page_size})
+            yield page
+            if len(page) < page_size:
+                return
+            cursor = page[-1]["id"]
 
     def create_script(self, data_path: str, script_path: str) -> None:
         """
-        Create a script to create the graph from a json file
+        Create a script to create the graph from a graph file
 
         Parameters :
-            - data_path : the path of the json file (string) (Exemple : "data/graph.json")
+            - data_path : the path of the graph file (string) (Exemple : "data/graph.ndjson.gz")
             - script_path : the path of the script file (string) (Exemple : "data/script.json")
         """
-        with open(data_path, "r", encoding="utf-8") as file:
-            json_data = json.load(file)
-            file.close()
-        print(f"File {data_path} loaded")
-
-        querys = []
-        for vertex in json_data[0]:
-            query = "g.addV('" + vertex["label"] + "').property('id', '" + vertex["id"] + "')"
-            if "properties" in vertex:
-                for prop in vertex["properties"]:
-                    query += f".property('{prop}', '{vertex['properties'][prop][0]['value']}')"
-            querys.append(query)
-        for edge in json_data[1]:
-            query = (
-                f"g.V('{edge['outV']}').addE('{edge['label']}').to(g.V('{edge['inV']}')).property('id', '{edge['id']}')"
-            )
-            if "properties" in edge:
-                for prop in edge["properties"]:
-                    query += f".property('{prop}', '{edge['properties'][prop]}')"
-            querys.append(query)
+        querys = graph_script(*local_graph(data_path))
         with open(script_path, "w", encoding="utf-8") as file:
             json.dump(querys, file, ensure_ascii=False, indent=4)
             file.close()
@@ -112,87 +524,320 @@ class DbGestion:
 
     def create_script_with_weight(self, data_path: str, script_path: str, matrix_path: str) -> None:
         """
-        Create a script to create the graph from a json file and update all weight from a local weight_matrix excel file
-        and put the list of all AI's name in the node with id=1
+        Create a script to create the graph from a graph file and update all weight from a local weight_matrix excel
+        file and put the list of all AI's name in the node with id=1
 
         Parameters :
-            - data_path : the path of the json file (string) (Exemple : "data/graph.json")
+            - data_path : the path of the graph file (string) (Exemple : "data/graph.ndjson.gz")
             - script_path : the path of the script file (string) (Exemple : "data/script.json")
             - matrix_path : the path of the excel file where the weight matrix is stored (Exemple : Weight_matrix.xlsx)
         """
-        with open(data_path, "r", encoding="utf-8") as file:
-            json_data = json.load(file)
-            file.close()
-        print(f"File {data_path} loaded")
-
-        data = pd.read_excel(matrix_path)
-        ids = list(data["id_edges"])
-        metrics = list(data["metric"])
-        list_ai = list(data.drop(["id_edges", "text", "metric"], axis=1).keys())
-        ais = str(list_ai[0])
-        i = 1
-        while i < len(list_ai):
-            ais += ", " + str(list_ai[i])
-            i += 1
-        data = data.drop(["id_edges", "text", "metric"], axis=1)
-        matrix = data.to_numpy()
-        dico_matrix = {}
-
-        i = 0
-        while i < len(ids):
-            dico_matrix[ids[i]] = list(matrix[i])
-            i += 1
-
-        querys = []
-        for vertex in json_data[0]:
-            query = f"g.addV('{vertex['label']}').property('id', '{vertex['id']}')"
-            if "properties" in vertex:
-                for prop in vertex["properties"]:
-                    if prop != "list_AI":
-                        query += f".property('{prop}', '{vertex['properties'][prop][0]['value']}')"
-            if vertex["id"] == "1":
-                query += f".property('list_AI', '{ais}')"
-            querys.append(query)
-        for edge in json_data[1]:
-            query = (
-                f"g.V('{edge['outV']}').addE('{edge['label']}').to(g.V('{edge['inV']}')).property('id', '{edge['id']}')"
-            )
-            if "properties" in edge:
-                for prop in edge["properties"]:
-                    if prop != "list_coef":
-                        query += f".property('{prop}', '{edge['properties'][prop]}')"
-            query += f".property('list_coef', '{str(dico_matrix[edge['id']])[1:-1]}')"
-            if isinstance(metrics[ids.index(edge["id"])], str):  # To now which metric use for each choice in then form
-                query += f""".property('metric', '{metrics[ids.index(edge["id"])]}')"""
-            querys.append(query)
+        querys = graph_script(*local_graph(data_path, matrix_path))
         with open(script_path, "w", encoding="utf-8") as file:
             json.dump(querys, file, ensure_ascii=False, indent=4)
             file.close()
         print(f"Script {script_path} created")
 
-    def import_graph(self, script_path: str) -> None:
+    @tag_queries
+    def import_graph(
+        self, script_path: str, max_in_flight: int = IMPORT_MAX_IN_FLIGHT, checkpoint_path: Optional[str] = None
+    ) -> ImportStats:
         """
-        Import a graph from a script
+        Import a graph from a script, each query of the script is either a gremlin query (string) or a parameterized
+        query (dict with the script template in "query" and its "bindings")
+        All vertices are imported before the edges, with max_in_flight queries running at the same time, and a query
+        throttled by the database (429) or stopped by a network error is retried with backoff
+        The indexes of the imported queries are written in a checkpoint file, so an interrupted import starts again
+        where it stopped (the file is removed at the end of the import)
 
         Parameters :
             - script_path : the path of the script file (string) (Exemple : "data/script.json")
+            - max_in_flight : maximal number of queries running at the same time (1 to import one query at a time)
+            - checkpoint_path : the path of the checkpoint file (Exemple : "data/script.json.checkpoint" by default)
+
+        Return :
+            - the counters of the import (number of queries sent, retries, duration and throughput)
         """
-        with open(script_path, "r", encoding="utf-8") as file:
-            querys = json.load(file)
-            file.close()
+        with open(script_path, "rb") as file:
+            script = file.read()
+        querys = json.loads(script)
         print(f"Script {script_path} loaded")
 
-        for query in querys:
-            self.run_gremlin_query(query)
+        checkpoint_path = f"{script_path}.checkpoint" if checkpoint_path is None else checkpoint_path
+        checkpoint = ImportCheckpoint.load(
+            checkpoint_path, script_path, len(querys), hashlib.sha256(script).hexdigest()
+        )
+        if checkpoint.done:
+            nb_done = len(checkpoint.done)
+            print(f"Import resumed from {checkpoint_path} : {nb_done}/{len(querys)} queries already imported")
+        stats = ImportStats(nb_queries=len(querys))
+        start = time.perf_counter()
+        try:
+            asyncio.run(self._import_queries(querys, checkpoint, stats, max_in_flight))
+        finally:
+            stats.duration = time.perf_counter() - start
+            print(
+                f"{stats.nb_sent} queries imported in {stats.duration:.1f}s "
+                f"({stats.queries_per_second():.1f} queries/s, {stats.nb_retries} retries)"
+            )
+            if not checkpoint.is_complete():
+                checkpoint.save()
+                print(f"Import interrupted, run it again to resume from {checkpoint_path}")
+        checkpoint.remove()
+        self.stamp_graph_version()
         print("Graph imported")
+        return stats
+
+    async def _import_queries(
+        self, querys: list[ScriptQuery], checkpoint: ImportCheckpoint, stats: ImportStats, max_in_flight: int
+    ) -> None:
+        """Run the queries not done yet (the vertices first, then the edges) and mark them done in the checkpoint"""
+        semaphore = asyncio.Semaphore(max_in_flight)
+        is_resumed = bool(checkpoint.done)
+
+        async def import_query(index: int) -> None:
+            async with semaphore:  # The slot is kept during the backoff, so a throttled import slows down
+                await self._submit_with_retries(querys[index], stats, is_resumed)
+            checkpoint.mark_done(index)
+            stats.nb_sent += 1
+
+        is_vertex = [script_query(query)[0].startswith("g.addV") for query in querys]
+        vertices = [index for index in range(len(querys)) if is_vertex[index]]
+        edges = [index for index in range(len(querys)) if not is_vertex[index]]
+        for indexes in (vertices, edges):
+            await asyncio.gather(*(import_query(index) for index in indexes if index not in checkpoint.done))
+
+    async def _submit_with_retries(self, query: ScriptQuery, stats: ImportStats, is_resumed: bool) -> None:
+        """
+        Run a query of a script, retried with backoff after a throttling or a network error
+        A conflict means the query was already run : by a try whose response was lost, or just before the
+        interruption of the previous run (is_resumed : the run continues an interrupted one)
+        """
+        template, bindings = script_query(query)
+        for retry in range(IMPORT_MAX_RETRIES + 1):
+            try:
+                await self.query_builder.submit_async(template, bindings)
+                return
+            except QUERY_ERRORS as error:
+                if (is_resumed or retry > 0) and error_status_code(error) == CONFLICT_STATUS_CODE:
+                    return
+                if retry == IMPORT_MAX_RETRIES or not is_retryable(error):
+                    raise
+                stats.nb_retries += 1
+                await asyncio.sleep(retry_delay(error, retry))
+
+    @tag_queries
+    def sync_graph(
+        self,
+        data_path: str,
+        matrix_path: Optional[str] = None,
+        dry_run: bool = False,
+        max_in_flight: int = IMPORT_MAX_IN_FLIGHT,
+    ) -> GraphDiff:
+        """
+        Make the question graph of the database equal to a local graph file (and weight matrix) by running only the
+        differences with a snapshot of the database (see diff_graph), instead of a drop of the graph and an import of
+        the whole script : the graph stays online, and a change of one coefficient is one query
+        Only the question-nodes and the proposition-edges are compared, the users and their forms are never changed
+
+        Parameters :
+            - data_path : the path of the graph file (string) (Exemple : "ai_sustainability/datas/data.json")
+            - matrix_path : the path of the excel file where the weight matrix is stored (Exemple : Weight_matrix.xlsx)
+            - dry_run : if True, the differences are computed but nothing is written in the database
+            - max_in_flight : maximal number of queries running at the same time
+
+        Return :
+            - the queries run (or to run if dry_run) by phase
+        """
+        diff = diff_graph(question_elements(*local_graph(data_path, matrix_path)), self._load_question_elements())
+        print(
+            f"{len(diff.drop_queries)} drops, {len(diff.vertex_queries)} vertex writes and {len(diff.edge_queries)} "
+            f"edge writes to sync the graph{' (dry run)' if dry_run else ''}"
+        )
+        if dry_run or not diff.nb_queries():
+            return diff
+        stats = ImportStats(nb_queries=diff.nb_queries())
+        start = time.perf_counter()
+        try:
+            asyncio.run(self._run_phases(diff.phases(), stats, max_in_flight))
+        finally:
+            stats.duration = time.perf_counter() - start
+            print(
+                f"{stats.nb_sent}/{stats.nb_queries} queries run in {stats.duration:.1f}s ({stats.nb_retries} retries)"
+            )
+        self.stamp_graph_version()
+        print("Graph synced")
+        return diff
+
+    def _load_question_elements(self) -> tuple[dict[str, dict], dict[str, dict]]:
+        """Load the question-nodes and the proposition-edges of the database, by id (see graph_element)"""
+        vertex_filter, edge_filter, bindings = export_filters("questions")
+        vertices = {
+            vertex["id"]: graph_element(vertex)
+            for page in self._iter_pages(f"g.V(){vertex_filter}", bindings, EXPORT_PAGE_SIZE)
+            for vertex in page
+        }
+        edges = {
+            edge["id"]: graph_element(edge)
+            for page in self._iter_pages(f"g.E(){edge_filter}", bindings, EXPORT_PAGE_SIZE)
+            for edge in page
+        }
+        return vertices, edges
+
+    async def _run_phases(self, phases: list[list[ScriptQuery]], stats: ImportStats, max_in_flight: int) -> None:
+        """Run the phases one after the other, with max_in_flight queries of a phase running at the same time"""
+        semaphore = asyncio.Semaphore(max_in_flight)
+
+        async def run_query(query: ScriptQuery) -> None:
+            async with semaphore:
+                await self._submit_with_retries(query, stats, False)
+            stats.nb_sent += 1
+
+        for phase in phases:
+            await asyncio.gather(*(run_query(query) for query in phase))
+
+    @tag_queries
+    def stamp_graph_version(self) -> str:
+        """
+        Write a new version stamp in the node with id=1, used by DbConnection to know when its snapshot of the
+        question graph has to be rebuilt
+
+        Return :
+            - the new version stamp (string)
+        """
+        version = datetime.now().isoformat()
+        self.run_gremlin_query("g.V('1').property(single, 'graph_version', version)", {"version": version})
+        return version
+
+    @tag_queries
+    def rescore_forms(self, nb_ai: int, dry_run: bool = False) -> int:
+        """
+        Compute again the best AIs of all stored forms with the actual coefficients of the propositions (Exemple :
+        after an import of the graph with a new weight matrix) : the scores of all forms are computed with one
+        matrix product and only the forms whose best AIs changed are written back, FORMS_PER_TRAVERSAL forms by
+        traversal
+
+        Parameters :
+            - nb_ai : number of best AIs stored in a form (Exemple : int(config("NBEST_AI")))
+            - dry_run : if True, nothing is written in the database
+
+        Return :
+            - the number of forms whose best AIs changed
+        """
+        list_ai = self.run_gremlin_query("g.V('1').values('list_AI')")[0].split(", ")
+        propositions = self.run_gremlin_query(
+            "g.E().hasLabel('Proposition', 'Q_Next').has('list_coef')"
+            ".project('id', 'list_coef').by(id).by(values('list_coef'))"
+        )
+        propositions_id = [proposition["id"] for proposition in propositions]
+        coefficients = decode_coefs_matrix([proposition["list_coef"] for proposition in propositions], len(list_ai))
+
+        forms: list[dict] = []
+        # The forms are loaded page by page (after the last id of the previous page) to keep each response bounded
+        for page in self._iter_pages(
+            "g.V().hasLabel('user').out('Answer')",
+            {"end_label": config("END_TYPE")},
+            FORMS_PER_PAGE,
+            ".project('id', 'best_ais', 'propositions').by(id).by(coalesce(values('best_ais'), constant('')))"
+            ".by(emit().repeat(out('Answer').dedup()).until(hasLabel(end_label)).dedup()"
+            ".outE('Answer').values('proposition_id').fold())",
+        ):
+            forms.extend(page)
+        print(f"{len(forms)} forms and {len(propositions)} propositions loaded")
+        if not forms:
+            return 0
+
+        incidence = build_incidence_matrix([form["propositions"] for form in forms], propositions_id)
+        forms_best_ais = batch_best_ais(batch_scores(incidence, coefficients), list_ai, nb_ai)
+        changed_forms = [
+            (form["id"], ", ".join(best_ais))
+            for form, best_ais in zip(forms, forms_best_ais)
+            if ", ".join(best_ais) != form["best_ais"]
+        ]
+        if not dry_run:
+            for query, bindings in best_ais_queries(changed_forms):
+                self.run_gremlin_query(query, bindings)
+        print(f"{len(changed_forms)} forms with new best AIs{' (dry run)' if dry_run else ''}")
+        return len(changed_forms)
+
+    @tag_queries
+    def reconcile_answer_counters(self, dry_run: bool = False) -> int:
+        """
+        Rebuild the counters of the stats vertex (number of times each proposition was selected, maintained by
+        DbConnection.save_answers and DbConnection.drop_form) from a count of all Answer edges, to repair the updates
+        lost by concurrent saves (Exemple : after an import of the graph, or periodically)
+
+        Parameters :
+            - dry_run : if True, nothing is written in the database
+
+        Return :
+            - the number of counters which were wrong
+        """
+        result = self.run_gremlin_query(ANSWER_COUNTS_QUERY)
+        counts: dict[str, int] = result[0] if result else {}
+        stats = self.run_gremlin_query(ANSWER_STATS_QUERY, {"stats_id": ANSWER_STATS_ID})
+        counters = counters_from_value_map(stats[0]) if stats else {}
+        wrong_counters = {
+            proposition_id: counts.get(proposition_id, 0)
+            for proposition_id in set(counts) | set(counters)
+            if counts.get(proposition_id, 0) != counters.get(proposition_id, 0)
+        }
+        if not dry_run:
+            for query, bindings in answer_counters_queries(wrong_counters):
+                self.run_gremlin_query(query, bindings)
+        print(f"{len(wrong_counters)} wrong answer counters{' (dry run)' if dry_run else ''}")
+        return len(wrong_counters)
+
+    @tag_queries
+    def migrate_list_coef(
+        self, compact: bool = True, dry_run: bool = False, max_in_flight: int = IMPORT_MAX_IN_FLIGHT
+    ) -> int:
+        """
+        Encode again the list_coef property of all edges (the proposition-edges and the Answer edges of the forms) in
+        one format (see coef_codec), page by page : the edges already in this format are not written, so an
+        interrupted migration can be run again, and the readers decode both formats during the migration
+        Set COMPACT_LIST_COEF like compact before, so the new edges are written in the same format
+
+        Parameters :
+            - compact : True to migrate to the compact format, False to go back to the text format
+            - dry_run : if True, nothing is written in the database
+            - max_in_flight : maximal number of queries running at the same time
+
+        Return :
+            - the number of edges encoded again
+        """
+        stats = ImportStats()
+        for page in self._iter_pages(
+            "g.E().has('list_coef')",
+            {},
+            EXPORT_PAGE_SIZE,
+            ".project('id', 'list_coef').by(id).by(values('list_coef'))",
+        ):
+            queries = [
+                {
+                    "query": "g.E(edge_id).property('list_coef', list_coef)",
+                    "bindings": {
+                        "edge_id": edge["id"],
+                        "list_coef": encode_coefs(decode_coefs(edge["list_coef"]), compact),
+                    },
+                }
+                for edge in page
+                if edge["list_coef"] and is_compact(edge["list_coef"]) != compact
+            ]
+            stats.nb_queries += len(queries)
+            if queries and not dry_run:
+                asyncio.run(self._run_phases([queries], stats, max_in_flight))
+        print(f"{stats.nb_queries} list_coef encoded again{' (dry run)' if dry_run else ''}")
+        if stats.nb_queries and not dry_run:
+            self.stamp_graph_version()  # The snapshots of the question graph are loaded again
+        return stats.nb_queries
 
 
 if __name__ == "__main__":
     # Exemple of use:
-    #   - create a test_node, save the graph in data.json,
-    #       delete the graph, create a script from data.json,
-    #       import the graph from the script, close the connection.
-    #   - You will have a new node saved in the database and in the script (test_node)
+    #   - save the graph in data.json, edit data.json or the weight matrix,
+    #       sync the graph with them (only the differences are written), close the connection.
+    #   - A full reload (drop of the graph, script, import) is still possible, the graph is offline during the import
 
     ENDPOINT = "questions-db.gremlin.cosmos.azure.com"
     DATABASE = "graphdb"
@@ -202,13 +847,16 @@ if __name__ == "__main__":
     db_gestion = DbGestion(ENDPOINT, DATABASE, COLLECTION, PRIMARYKEY)
     # db_gestion.save_graph("ai_sustainability/datas/data.json")
     # db_gestion.save_graph("ai_sustainability/datas/data_weight.json")
-    db_gestion.run_gremlin_query("g.V().drop()")
-    db_gestion.run_gremlin_query("g.E().drop()")
+    # db_gestion.run_gremlin_query("g.V().drop()")
+    # db_gestion.run_gremlin_query("g.E().drop()")
     # db_gestion.create_script("ai_sustainability/datas/data.json", "ai_sustainability/datas/script.json")
-    db_gestion.create_script_with_weight(
-        "ai_sustainability/datas/data.json",
-        "ai_sustainability/datas/script_weight_bis.json",
-        "ai_sustainability/datas/Weight_matrix.xlsx",
-    )
-    db_gestion.import_graph("ai_sustainability/datas/script_weight_bis.json")
+    # db_gestion.create_script_with_weight(
+    #     "ai_sustainability/datas/data.json",
+    #     "ai_sustainability/datas/script_weight_bis.json",
+    #     "ai_sustainability/datas/Weight_matrix.xlsx",
+    # )
+    # db_gestion.import_graph("ai_sustainability/datas/script_weight_bis.json")
+    db_gestion.sync_graph("ai_sustainability/datas/data.json", "ai_sustainability/datas/Weight_matrix.xlsx")
+    db_gestion.rescore_forms(int(config("NBEST_AI")))
+    db_gestion.reconcile_answer_counters()
     db_gestion.close()
@@ -3,7 +3,7 @@ This file contains the interface for all database connection classes,
 used to connect to the database and to run the queries
 """
 from abc import ABC, abstractmethod
-from typing import Optional, Tuple
+from typing import Optional, Sequence, Tuple
 
 from ai_sustainability.package_business.models import (
     AnswersStats,
@@ -13,6 +13,9 @@ from ai_sustainability.package_business.models import (
     UserFeedback,
     Username,
 )
+from ai_sustainability.package_data_access.consistency import ConsistencyStats
+from ai_sustainability.package_data_access.query_metrics import QueryMetrics
+from ai_sustainability.package_data_access.question_graph import QuestionGraph
 
 
 class DBInterface(ABC):
@@ -55,6 +58,25 @@ class DBInterface(ABC):
             - result : list of all feedbacks (list of UserFeedback)
         """
 
+    @abstractmethod
+    def get_feedbacks_page(self, offset: int = 0, limit: Optional[int] = None) -> list[UserFeedback]:
+        """
+        Return the feedbacks of a page of users (ordered by username)
+
+        Parameters :
+            - offset : index of the first user of the page (int)
+            - limit : maximal number of users in the page (int), all users if None
+
+        Return :
+            - result : list of feedbacks (list of UserFeedback)
+        """
+
+    @abstractmethod
+    def get_nb_users(self) -> int:
+        """
+        Return the number of users in the database
+        """
+
     @abstractmethod
     def save_feedback(self, username: Username, feedback: Feedback) -> None:
         """
@@ -106,12 +128,15 @@ class DBInterface(ABC):
         """
 
     @abstractmethod
-    def drop_form(self, form: Form) -> None:
+    def drop_form(self, form: Form) -> int:
         """
         Drop a form present in db
 
         Parameters:
             - form : the we want to delete in the db
+
+        Return:
+            - the number of removed nodes
         """
 
     @abstractmethod
@@ -169,3 +194,131 @@ class DBInterface(ABC):
         Return:
             - list of the best ais (list[str])
         """
+
+    @abstractmethod
+    def get_all_best_ais(self) -> dict[Tuple[Username, str], list[str]]:
+        """
+        Return the best ais of all forms saved in the db (with a single query)
+
+        Return:
+            - the list of the best ais of each form, by (username, form name)
+        """
+
+    @abstractmethod
+    def get_experiment_id(self, username: Username, form_name: str) -> list[str]:
+        """
+        Return the mlflow's experiment id stored in a form which was saved in the db
+
+        Parameters:
+            - username (User): username of the user
+            - form_name (str): name of the form
+
+        Return:
+            - list with the experiment id (empty if the form has no experiment)
+        """
+
+    @abstractmethod
+    def get_question_graph(self) -> QuestionGraph:
+        """
+        Return the snapshot of the question graph (the question-nodes and their proposition-edges)
+        """
+
+    @abstractmethod
+    def get_coefficients(self, proposition_ids: Sequence[str]) -> dict[str, Sequence[float]]:
+        """
+        Return the coefficients of some propositions (the snapshot of the question graph may be loaded without them)
+
+        Parameters :
+            - proposition_ids : the ids of the propositions (Exemple : the ids of the choosen answers of a Form)
+
+        Return :
+            - the coefficients by proposition id (the ids which are not propositions of the graph are ignored)
+        """
+
+    @abstractmethod
+    def get_query_metrics(self) -> QueryMetrics:
+        """
+        Return the cost of the queries sent to the database, by tag (the method which sent the queries)
+        """
+
+    @abstractmethod
+    def get_consistency_stats(self) -> ConsistencyStats:
+        """
+        Return the counters of the write confirmations (how often a write needed a retry to be visible)
+        """
+
+
+class AsyncDBInterface(ABC):
+    """
+    Asynchronous counterpart of DBInterface, used to run independent queries concurrently
+    """
+
+    @abstractmethod
+    async def check_node_exist(self, node_id: str) -> bool:
+        """
+        Check if a node exists in the database
+
+        Parameters :
+            - node_id : the id of the node (str)
+
+        Return :
+            - bool : True if the node exists, False otherwise
+        """
+
+    @abstractmethod
+    async def check_nodes_exist(self, nodes_id: list[str]) -> list[bool]:
+        """
+        Check if several nodes exist in the database (the queries run concurrently)
+
+        Parameters :
+            - nodes_id : the ids of the nodes (list[str])
+
+        Return :
+            - list[bool] : for each node, True if the node exists, False otherwise
+        """
+
+    @abstractmethod
+    async def get_all_users(self) -> list[Username]:
+        """
+        Return all users in the database
+            Return :
+                - result : list of all users (list of User)
+        """
+
+    @abstractmethod
+    async def get_all_forms_names(self, username: Username) -> list[str]:
+        """
+        Get all names of the forms of a user
+
+        Parameters:
+            - username (User): username of the user
+
+        Return:
+            - list of the forms names
+        """
+
+    @abstractmethod
+    async def retrieve_previous_form(self, username: Username, selected_form_name: str) -> Form:
+        """
+        Get a Form
+
+        Parameters:
+            - username (Username): username of the user
+            - selected_form_name (str): name of the form
+
+        Return:
+            - the Form saved in the database
+        """
+
+    @abstractmethod
+    async def get_best_ais(self, username: Username, form_name: str) -> list[str]:
+        """
+        Return the best ais for a form which was saved in the db
+
+        Parameters:
+            - username (User): username of the user
+            - form_name (str): name of the form
+
+        Return:
+            - list of the best ais (list[str])
+        """
@@ -0,0 +1,80 @@
+"""
+This file contains the functions used to read and write the graph files created by DbGestion.save_graph : one
+GraphSON element (vertex or edge) by line (newline-delimited json), compressed with gzip if the path ends with ".gz"
+The files of the previous format (one json document [vertices, edges]) can still be read
+
+method:
+    - open_graph_file
+    - write_graph_elements
+    - iter_graph_elements
+    - read_graph_file
+"""
+import gzip
+import itertools
+import json
+from typing import IO, Iterable, Iterator, Tuple
+
+GZIP_SUFFIX = ".gz"
+
+
+def open_graph_file(path: str, mode: str = "r") -> IO[str]:
+    """
+    Open a graph file in text mode, with gzip if the path ends with ".gz"
+
+    Parameters :
+        - path : the path of the graph file (Exemple : "ai_sustainability/datas/data.ndjson.gz")
+        - mode : "r" to read, "w" to write
+    """
+    if path.endswith(GZIP_SUFFIX):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def write_graph_elements(file: IO[str], elements: Iterable[dict]) -> int:
+    """
+    Write GraphSON elements in an open graph file, one by line
+
+    Return :
+        - the number of elements written
+    """
+    nb_elements = 0
+    for element in elements:
+        file.write(json.dumps(element, ensure_ascii=False) + "\n")
+        nb_elements += 1
+    return nb_elements
+
+
+def iter_graph_elements(path: str) -> Iterator[dict]:
+    """
+    Read the GraphSON elements of a graph file one by one (only the files of the previous format are loaded at once)
+
+    Parameters :
+        - path : the path of the graph file (Exemple : "ai_sustainability/datas/data_weight.json")
+    """
+    with open_graph_file(path) as file:
+        first_line = file.readline()
+        if first_line.lstrip().startswith("["):  # A json document [vertices, edges]
+            vertices, edges = json.loads(first_line + file.read())
+            yield from vertices
+            yield from edges
+            return
+        for line in itertools.chain([first_line], file):
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_graph_file(path: str) -> Tuple[list[dict], list[dict]]:
+    """
+    Read all elements of a graph file
+
+    Parameters :
+        - path : the path of the graph file (Exemple : "ai_sustainability/datas/data_weight.json")
+
+    Return :
+        - the vertices and the edges (GraphSON, like the results of g.V() and g.E() queries)
+    """
+    vertices: list[dict] = []
+    edges: list[dict] = []
+    for element in iter_graph_elements(path):
+        (edges if element.get("type") == "edge" else vertices).append(element)
+    return vertices, edges
@@ -0,0 +1,468 @@
+"""
+This file contains the class InMemoryDbConnection, a database kept in memory (seeded from a graph file created by
+DbGestion.save_graph) with a simulated latency for each query, used to run and benchmark the Form app offline
+"""
+import math
+import random
+import time
+from typing import Callable, Optional, Sequence, Tuple
+
+from ai_sustainability.package_business.models import (
+    Answer,
+    AnswersStats,
+    Feedback,
+    Form,
+    Question,
+    UserFeedback,
+    Username,
+)
+from ai_sustainability.package_data_access.coef_codec import encode_coefs
+from ai_sustainability.package_data_access.consistency import ConsistencyStats
+from ai_sustainability.package_data_access.db_connection import (
+    ANSWER_STATS_ID,
+    COUNTER_PREFIX,
+    COUNTERS_PER_TRAVERSAL,
+    EDGES_PER_TRAVERSAL,
+    END_TYPE,
+    build_form_from_chain,
+    counters_from_value_map,
+    form_answers_counts,
+    order_form_chain,
+)
+from ai_sustainability.package_data_access.db_interface import DBInterface
+from ai_sustainability.package_data_access.graph_file import read_graph_file
+from ai_sustainability.package_data_access.query_metrics import QueryMetrics, current_tag
+from ai_sustainability.package_data_access.question_graph import (
+    FIRST_NODE_ID,
+    QuestionGraph,
+)
+
+DEFAULT_GRAPH_PATH = "ai_sustainability/datas/data_weight.json"
+
+
+class InMemoryDbConnection(DBInterface):
+    """
+    Class to manage a database kept in memory, with the same operations (and the same number of queries) as
+    DbConnection : each query waits latency +/- jitter seconds to simulate the round trip to Cosmos DB
+
+    Parameters :
+        - graph_path : the graph file used to seed the database (Exemple : "ai_sustainability/datas/data_weight.json")
+        - latency : mean simulated duration of a query (in seconds)
+        - jitter : maximal deviation of the simulated duration of a query (in seconds)
+        - seed : seed of the random generator of the jitter (to have repeatable benchmarks)
+        - sleep : function used to wait the simulated duration (Exemple : lambda _: None to only count the time)
+
+    Methods :
+        - nb_queries : number of simulated queries since the creation (or the last reset_stats)
+        - simulated_time : total simulated duration of the queries (in seconds)
+        - reset_stats
+        - get_query_metrics : simulated duration of the queries by tag
+        - get_question_graph
+        - reconcile_answer_counters : rebuild the counters of the stats vertex like DbGestion.reconcile_answer_counters
+        - all methods of DBInterface
+    """
+
+    def __init__(
+        self,
+        graph_path: str = DEFAULT_GRAPH_PATH,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        seed: Optional[int] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        vertices, edges = read_graph_file(graph_path)
+        self._question_graph = QuestionGraph.from_json_file(graph_path)
+        # The graph is stored like in the database : properties of the vertices and of the edges, out edges by vertex
+        self._vertices: dict[str, dict] = {
+            vertex["id"]: {
+                "label": vertex["label"],
+                "properties": {name: values[0]["value"] for name, values in vertex.get("properties", {}).items()},
+            }
+            for vertex in vertices
+        }
+        self._out_edges: dict[str, list[dict]] = {vertex_id: [] for vertex_id in self._vertices}
+        for edge in edges:
+            self._out_edges[edge["outV"]].append(
+                {"id": edge["id"], "label": edge["label"], "inV": edge["inV"], "properties": edge.get("properties", {})}
+            )
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._sleep = sleep
+        self.nb_queries = 0
+        self.simulated_time = 0.0
+        self.metrics = QueryMetrics()
+
+    def reset_stats(self) -> None:
+        self.nb_queries = 0
+        self.simulated_time = 0.0
+        self.metrics.reset()
+
+    def get_query_metrics(self) -> QueryMetrics:
+        """
+        Return the simulated duration of the queries, by tag (the result size and the request charge are not simulated)
+        """
+        return self.metrics
+
+    def get_consistency_stats(self) -> ConsistencyStats:
+        """
+        Return empty counters : a write in memory is always visible, so it is never confirmed nor retried
+        """
+        return ConsistencyStats()
+
+    def _round_trip(self, nb_queries: int = 1) -> None:
+        """Simulate the duration of nb_queries queries"""
+        for _ in range(nb_queries):
+            duration = max(self.latency + self._random.uniform(-self.jitter, self.jitter), 0.0)
+            self.nb_queries += 1
+            self.simulated_time += duration
+            self.metrics.record(current_tag(), duration, 0, 0.0)
+            self._sleep(duration)
+
+    def _add_vertex(self, vertex_id: str, label: str, properties: dict) -> None:
+        if vertex_id not in self._vertices:
+            self._vertices[vertex_id] = {"label": label, "properties": properties}
+            self._out_edges[vertex_id] = []
+
+    def _add_edge(self, source_id: str, target_id: str, label: str, properties: dict) -> None:
+        edge_id = f"{label}-{source_id}-{len(self._out_edges[source_id])}"
+        self._out_edges[source_id].append({"id": edge_id, "label": label, "inV": target_id, "properties": properties})
+
+    def get_question_graph(self) -> QuestionGraph:
+        return self._question_graph
+
+    def get_coefficients(self, proposition_ids: Sequence[str]) -> dict[str, Sequence[float]]:
+        """
+        Return the coefficients of the snapshot (always loaded with the propositions, so without any query)
+        """
+        return self._question_graph.get_coefficients(proposition_ids)
+
+    def _count_answer_edges(self) -> dict[str, int]:
+        counts: dict[str, int] = {}
+        for edges in self._out_edges.values():
+            for edge in edges:
+                if edge["label"] == "Answer" and "proposition_id" in edge["properties"]:
+                    proposition_id = edge["properties"]["proposition_id"]
+                    counts[proposition_id] = counts.get(proposition_id, 0) + 1
+        return counts
+
+    def _write_answer_counters(self, counters: dict[str, int]) -> None:
+        self._add_vertex(ANSWER_STATS_ID, "stats", {"partitionKey": "Stats"})
+        properties = self._vertices[ANSWER_STATS_ID]["properties"]
+        for proposition_id, count in counters.items():
+            properties[COUNTER_PREFIX + proposition_id] = count
+
+    def _read_answer_counters(self) -> Optional[dict[str, int]]:
+        self._round_trip()
+        if ANSWER_STATS_ID not in self._vertices:
+            return None
+        return counters_from_value_map(self._vertices[ANSWER_STATS_ID]["properties"])
+
+    def _initialize_answer_counters(self) -> dict[str, int]:
+        """Create the stats vertex from a count of the Answer edges like DbConnection.initialize_answer_counters"""
+        counts = self._count_answer_edges()
+        self._round_trip(1 + max(math.ceil(len(counts) / COUNTERS_PER_TRAVERSAL), 1) + 1)
+        self._write_answer_counters(counts)
+        return counts
+
+    def get_answer_counters(self) -> dict[str, int]:
+        counters = self._read_answer_counters()
+        return self._initialize_answer_counters() if counters is None else counters
+
+    def update_answer_counters(self, deltas: dict[str, int]) -> None:
+        """
+        Add deltas to the counters like DbConnection.update_answer_counters (1 read, then the writes, a compare-and-set
+        never fails in memory)
+        """
+        deltas = {proposition_id: delta for proposition_id, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        counters = self._read_answer_counters()
+        if counters is None:
+            self._initialize_answer_counters()
+            return
+        self._round_trip(math.ceil(len(deltas) / COUNTERS_PER_TRAVERSAL))
+        self._write_answer_counters(
+            {proposition_id: counters.get(proposition_id, 0) + delta for proposition_id, delta in deltas.items()}
+        )
+
+    def reconcile_answer_counters(self) -> int:
+        """
+        Rebuild the counters from a count of all Answer edges
+
+        Return :
+            - the number of counters which were wrong
+        """
+        self._round_trip()
+        counts = self._count_answer_edges()
+        counters = self._read_answer_counters() or {}
+        wrong_counters = {
+            proposition_id: counts.get(proposition_id, 0)
+            for proposition_id in set(counts) | set(counters)
+            if counts.get(proposition_id, 0) != counters.get(proposition_id, 0)
+        }
+        self._round_trip(max(math.ceil(len(wrong_counters) / COUNTERS_PER_TRAVERSAL), 1))
+        self._write_answer_counters(wrong_counters)
+        return len(wrong_counters)
+
+    def get_next_question(self, form: Form, question_number: int) -> Question:
+        """
+        get the next question according the form (only in-memory lookups in the question graph snapshot)
+        """
+        if form.already_completed and len(form.question_list) > question_number:
+            return form.question_list[question_number]
+        actual_question = None if not form.question_list else form.question_list[question_number - 1]
+        if actual_question is not None and actual_question.type == END_TYPE:
+            return form.question_list[-1]
+        form.add_question(self._question_graph.get_next_question(actual_question))
+        return form.question_list[-1]
+
+    def get_all_users(self) -> list[Username]:
+        self._round_trip()
+        return [Username(vertex_id) for vertex_id, vertex in self._vertices.items() if vertex["label"] == "user"]
+
+    def get_all_feedbacks(self) -> list[UserFeedback]:
+        return self.get_feedbacks_page()
+
+    def get_feedbacks_page(self, offset: int = 0, limit: Optional[int] = None) -> list[UserFeedback]:
+        self._round_trip()
+        users = sorted(vertex_id for vertex_id, vertex in self._vertices.items() if vertex["label"] == "user")
+        users = users[offset:] if limit is None else users[offset : offset + limit]
+        return [
+            UserFeedback(
+                Username(user),
+                [edge["properties"]["text"] for edge in self._out_edges[user] if edge["label"] == "Feedback"],
+            )
+            for user in users
+        ]
+
+    def get_nb_users(self) -> int:
+        self._round_trip()
+        return sum(vertex["label"] == "user" for vertex in self._vertices.values())
+
+    def save_feedback(self, username: Username, feedback: Feedback) -> None:
+        if not self.check_node_exist(f"feedback{username}"):
+            self._round_trip()
+            self._add_vertex(f"feedback{username}", "Feedback", {"partitionKey": "Feedback"})
+        self._round_trip(2)  # Count of the feedbacks of the user, then creation of the edge
+        if username in self._vertices:
+            self._add_edge(username, f"feedback{username}", "Feedback", {"text": feedback})
+
+    def check_node_exist(self, node_id: Optional[str]) -> bool:
+        if node_id is None or not node_id:
+            return False
+        self._round_trip()
+        return node_id in self._vertices
+
+    def save_answers(
+        self, form: Form, best_ais: list[Tuple[str, float]], mlflow_id: Optional[str] = "", new_form_name: str = ""
+    ) -> bool:
+        """
+        Save a Form like DbConnection.save_answers_batched : 1 query to check the Form, 1 traversal for the nodes
+        and 1 traversal per EDGES_PER_TRAVERSAL edges
+        """
+        if new_form_name:
+            self.drop_form(form)
+            form.form_name = new_form_name
+        if form.username is None:
+            return False
+        if self.check_form_exist(form.username, form.form_name):
+            return False
+        end_index = next(index for index, question in enumerate(form.question_list) if question.type == END_TYPE)
+        questions = form.question_list[: end_index + 1]
+        nodes_id = [f"{form.username}-answer{question.question_id}-{form.form_name}" for question in questions]
+        nb_edges = sum(len(question.choosen_answers) for question in questions[:-1]) + 1
+        self._round_trip(1 + math.ceil(nb_edges / EDGES_PER_TRAVERSAL))
+
+        self._add_vertex(form.username, "user", {"partitionKey": "Answer"})
+        for question, node_id in zip(questions, nodes_id):
+            properties = {"partitionKey": "Answer", "question_id": question.question_id}
+            if question.type != END_TYPE:
+                properties["question"] = question.text
+            if question.question_id == FIRST_NODE_ID:
+                properties["best_ais"] = ", ".join([ai[0] for ai in best_ais])
+                if mlflow_id is not None:
+                    properties["mlflow_id"] = mlflow_id
+            self._add_vertex(node_id, END_TYPE if question.type == END_TYPE else "Answer", properties)
+        for index, question in enumerate(questions[:-1]):
+            for proposition in question.choosen_answers:
+                self._add_edge(
+                    nodes_id[index], nodes_id[index + 1], "Answer", self._answer_edge_properties(proposition)
+                )
+        self._add_edge(form.username, nodes_id[0], "Answer", {"partitionKey": "Answer"})
+        self.update_answer_counters(form_answers_counts(form))
+        return True
+
+    def _answer_edge_properties(self, proposition: Answer) -> dict:
+        """Return the properties of an Answer edge, stored as strings like in the database"""
+        properties = {
+            "answer": proposition.text,
+            "proposition_id": proposition.answer_id,
+            "list_coef": encode_coefs(proposition.list_coef),
+        }
+        if proposition.metric is not None:
+            properties["metric"] = (
+                proposition.metric if isinstance(proposition.metric, str) else ",".join(proposition.metric)
+            )
+        return properties
+
+    def check_form_exist(self, username: Username, form_name: str) -> bool:
+        return self.check_node_exist(f"{username}-answer{FIRST_NODE_ID}-{form_name}")
+
+    def _form_chain_ids(self, first_node_id: str) -> list[str]:
+        """Ids of all nodes of a saved Form (from its first node to its end node)"""
+        chain_ids: list[str] = []
+        to_visit = [first_node_id] if first_node_id in self._vertices else []
+        while to_visit:
+            node_id = to_visit.pop()
+            if node_id in chain_ids:
+                continue
+            chain_ids.append(node_id)
+            if self._vertices[node_id]["label"] != END_TYPE:
+                to_visit.extend(edge["inV"] for edge in self._out_edges[node_id] if edge["label"] == "Answer")
+        return chain_ids
+
+    def drop_form(self, form: Form) -> int:
+        self._round_trip()
+        chain_ids = set(self._form_chain_ids(f"{form.username}-answer{FIRST_NODE_ID}-{form.form_name}"))
+        deltas: dict[str, int] = {}
+        for node_id in chain_ids:
+            for edge in self._out_edges[node_id]:
+                if edge["label"] == "Answer" and "proposition_id" in edge["properties"]:
+                    proposition_id = edge["properties"]["proposition_id"]
+                    deltas[proposition_id] = deltas.get(proposition_id, 0) - 1
+        for node_id in chain_ids:
+            del self._vertices[node_id]
+            del self._out_edges[node_id]
+        for source_id, edges in self._out_edges.items():
+            self._out_edges[source_id] = [edge for edge in edges if edge["inV"] not in chain_ids]
+        self.update_answer_counters(deltas)
+        return len(chain_ids)
+
+    def get_all_forms_names(self, username: Username) -> list[str]:
+        self._round_trip()
+        return [edge["inV"].split("-")[-1] for edge in self._out_edges.get(username, []) if edge["label"] == "Answer"]
+
+    def retrieve_previous_form(self, username: Username, selected_form_name: str) -> Form:
+        """
+        Retrieve a already answered Form in one simulated round trip, the Form is rebuilt like in DbConnection
+        """
+        self._round_trip()
+        first_node_id = f"{username}-answer{FIRST_NODE_ID}-{selected_form_name}"
+        nodes = [
+            {
+                "id": node_id,
+                "label": self._vertices[node_id]["label"],
+                "question_id": self._vertices[node_id]["properties"].get("question_id", ""),
+                "mlflow_id": self._vertices[node_id]["properties"].get("mlflow_id", ""),
+                "answers": [
+                    edge["properties"] | {"next": edge["inV"]}
+                    for edge in self._out_edges[node_id]
+                    if edge["label"] == "Answer"
+                ],
+            }
+            for node_id in self._form_chain_ids(first_node_id)
+        ]
+        chain = order_form_chain(first_node_id, nodes)
+        return build_form_from_chain(username, selected_form_name, chain, self._question_graph)
+
+    def get_nb_selected_edge(self) -> list[AnswersStats]:
+        nb_selected_edge = self.get_answer_counters()
+        propositions = self._question_graph.propositions
+        return [
+            (
+                Answer(
+                    answer_id=proposition_id,
+                    text=propositions[proposition_id].text if proposition_id in propositions else "",
+                ),
+                nb_selected,
+            )
+            for proposition_id, nb_selected in nb_selected_edge.items()
+            if nb_selected > 0
+        ]
+
+    def get_all_ais(self) -> list[str]:
+        self._round_trip()
+        return self._vertices[FIRST_NODE_ID]["properties"]["list_AI"].split(", ")
+
+    def get_best_ais(self, username: Username, form_name: str) -> list[str]:
+        self._round_trip()
+        node = self._vertices.get(f"{username}-answer{FIRST_NODE_ID}-{form_name}", {"properties": {}})
+        best_ais = node["properties"].get("best_ais", "")
+        return best_ais.split(", ") if best_ais else []
+
+    def get_all_best_ais(self) -> dict[Tuple[Username, str], list[str]]:
+        self._round_trip()
+        all_best_ais = {}
+        for vertex_id, vertex in self._vertices.items():
+            if vertex["label"] != "user":
+                continue
+            for edge in self._out_edges[vertex_id]:
+                if edge["label"] == "Answer":
+                    best_ais = self._vertices[edge["inV"]]["properties"].get("best_ais", "")
+                    all_best_ais[(Username(vertex_id), edge["inV"].split("-")[-1])] = (
+                        best_ais.split(", ") if best_ais else []
+                    )
+        return all_best_ais
+
+    def get_experiment_id(self, username: Username, form_name: str) -> list[str]:
+        self._round_trip()
+        node = self._vertices.get(f"{username}-answer{FIRST_NODE_ID}-{form_name}", {"properties": {}})
+        return [node["properties"]["mlflow_id"]] if "mlflow_id" in node["properties"] else []
+
+
+def fill_random_form(database: DBInterface, username: Username, form_name: str, rng: random.Random) -> Form:
+    """
+    Walk through the Form like a user, choosing random answers (one for a QCM, a few for a QRM)
+    """
+    form = Form(username=username, form_name=form_name)
+    question_number = 1
+    question = database.get_next_question(form, 0)
+    while question.type != END_TYPE:
+        if question.type == "Q_QRM":
+            answers = rng.sample(question.possible_answers, rng.randint(1, len(question.possible_answers)))
+        else:
+            answers = [rng.choice(question.possible_answers)]
+        form.add_answers(answers, question_number)
+        question = database.get_next_question(form, question_number)
+        question_number += 1
+    form.add_answers([Answer.create_end_answer()], question_number)
+    return form
+
+
+if __name__ == "__main__":
+    # Benchmark of the Form app with a simulated latency of 20ms +/- 10ms by query :
+    #   - fill and save forms, retrieve them, compute the statistics
+
+    NB_FORMS = 50
+    benchmark_rng = random.Random(0)
+    in_memory_db = InMemoryDbConnection(latency=0.02, jitter=0.01, seed=0)
+    list_ai = in_memory_db.get_all_ais()
+    usernames = [Username(f"user{index}") for index in range(5)]
+
+    def run_step(name: str, step: Callable[[], object]) -> None:
+        in_memory_db.reset_stats()
+        start = time.perf_counter()
+        step()
+        duration = time.perf_counter() - start
+        print(
+            f"{name:<10} : {duration:7.3f}s, {in_memory_db.nb_queries:5} queries "
+            f"({duration / NB_FORMS * 1000:7.2f}ms by form)"
+        )
+
+    def fill_and_save() -> None:
+        for index in range(NB_FORMS):
+            username = usernames[index % len(usernames)]
+            form = fill_random_form(in_memory_db, username, f"form{index}", benchmark_rng)
+            in_memory_db.save_answers(form, form.calcul_best_ais(nb_ai=5, list_ai=list_ai), mlflow_id=None)
+
+    def retrieve() -> None:
+        for username in in_memory_db.get_all_users():
+            for form_name in in_memory_db.get_all_forms_names(username):
+                in_memory_db.retrieve_previous_form(username, form_name)
+                in_memory_db.get_best_ais(username, form_name)
+
+    run_step("save", fill_and_save)
+    run_step("retrieve", retrieve)
+    run_step("statistic", in_memory_db.get_nb_selected_edge)
+    run_step("ai statistic", in_memory_db.get_all_best_ais)
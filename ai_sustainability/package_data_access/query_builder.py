@@ -0,0 +1,136 @@
+"""
+This file contains the class QueryBuilder, used by all data access classes to submit gremlin queries as fixed script
+templates with bindings : the variable parts of a query (ids, texts, ...) are sent as bindings, so the same script is
+sent each time and the server-side script cache is hit (and no user text has to be escaped)
+The cost of each query (wall time, result size, request charge) is recorded in QueryBuilder.metrics
+"""
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Any, Optional, Sequence
+
+from gremlin_python.driver import client
+
+from ai_sustainability.package_data_access.query_metrics import (
+    QueryMetrics,
+    current_tag,
+    request_charge,
+)
+
+
+@dataclass
+class TemplateStats:
+    """Dataclass with the counters of one script template"""
+
+    nb_runs: int = 0
+    total_time: float = 0.0  # in seconds
+    max_time: float = 0.0  # in seconds
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.nb_runs if self.nb_runs else 0.0
+
+    @property
+    def nb_reuses(self) -> int:
+        return max(self.nb_runs - 1, 0)
+
+
+class QueryBuilder:
+    """
+    Class used to submit script templates with bindings and to keep client-side counters of the templates reuse and of
+    the latency of each template (the client is shared by all sessions, so the counters are protected by a lock)
+
+    Parameters :
+        - gremlin_client : the client connected to the database
+
+    Methods :
+        - submit : submit a script template with its bindings
+        - submit_async : submit a script template with its bindings without blocking the event loop
+        - templates_stats : counters of each template (number of runs, latency), a copy
+        - metrics : cost of the queries by calling method (latency, result size, request charge)
+        - cache_hit_rate : part of the submitted queries whose script was already submitted before
+        - reset_stats
+    """
+
+    def __init__(self, gremlin_client: client.Client) -> None:
+        self.gremlin_client = gremlin_client
+        self._templates_stats: dict[str, TemplateStats] = {}
+        self._lock = threading.Lock()
+        self.metrics = QueryMetrics()
+
+    def submit(self, template: str, bindings: Optional[dict[str, Any]] = None) -> list:
+        """
+        Submit a script template with its bindings
+
+        Parameters :
+            - template : the gremlin script (Exemple : "g.V(node_id)")
+            - bindings : the values of the variables of the script (Exemple : {"node_id": "1"})
+
+        Return :
+            - list of all result that correspond to the query
+        """
+        start = time.perf_counter()
+        result_set = self.gremlin_client.submit(template, bindings)
+        result = result_set.all().result()
+        self._record(template, time.perf_counter() - start, len(result), request_charge(result_set.status_attributes))
+        return result
+
+    async def submit_async(self, template: str, bindings: Optional[dict[str, Any]] = None) -> list:
+        """
+        Submit a script template with its bindings, the query runs in the connection pool of the client while the
+        event loop can run other queries
+
+        Parameters :
+            - template : the gremlin script (Exemple : "g.V(node_id)")
+            - bindings : the values of the variables of the script (Exemple : {"node_id": "1"})
+
+        Return :
+            - list of all result that correspond to the query
+        """
+        start = time.perf_counter()
+        result_set = await asyncio.wrap_future(self.gremlin_client.submit_async(template, bindings))
+        result = await asyncio.wrap_future(result_set.all())
+        self._record(template, time.perf_counter() - start, len(result), request_charge(result_set.status_attributes))
+        return result
+
+    def _record(self, template: str, duration: float, result_size: int, charge: float) -> None:
+        with self._lock:
+            stats = self._templates_stats.setdefault(template, TemplateStats())
+            stats.nb_runs += 1
+            stats.total_time += duration
+            stats.max_time = max(stats.max_time, duration)
+        self.metrics.record(current_tag(), duration, result_size, charge)
+
+    @property
+    def templates_stats(self) -> dict[str, TemplateStats]:
+        with self._lock:
+            return {template: replace(stats) for template, stats in self._templates_stats.items()}
+
+    @property
+    def cache_hit_rate(self) -> float:
+        templates_stats = self.templates_stats.values()
+        nb_runs = sum(stats.nb_runs for stats in templates_stats)
+        nb_reuses = sum(stats.nb_reuses for stats in templates_stats)
+        return nb_reuses / nb_runs if nb_runs else 0.0
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._templates_stats = {}
+        self.metrics.reset()
+
+
+def bind_list(prefix: str, values: Sequence[Any]) -> tuple[str, dict[str, Any]]:
+    """
+    Create the variables for a list of values
+
+    Parameters :
+        - prefix : prefix of the variables names (Exemple : "label")
+        - values : list of values (Exemple : ["Proposition", "Q_Next"])
+
+    Return :
+        - the variables to put in the script (Exemple : "label0, label1")
+        - the corresponding bindings (Exemple : {"label0": "Proposition", "label1": "Q_Next"})
+    """
+    bindings = {f"{prefix}{index}": value for index, value in enumerate(values)}
+    return ", ".join(bindings), bindings
@@ -0,0 +1,201 @@
+"""
+This file contains the class QueryMetrics, used by QueryBuilder to record the wall time, the result size and the
+request charge (Cosmos DB request units) of each query, aggregated by the method that sent the query
+(Exemple : the Application method "save_answers"), for the whole app and for each streamlit session
+"""
+import bisect
+import json
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field, replace
+from functools import wraps
+from typing import Any, Callable, Optional, TypeVar
+
+LATENCY_BUCKETS = (5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0)  # Upper bounds (in ms)
+CHARGE_BUCKETS = (1.0, 2.0, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 1000.0)  # Upper bounds (in request units)
+REQUEST_CHARGE_ATTRIBUTE = "x-ms-total-request-charge"
+UNTAGGED = "untagged"
+MAX_SESSIONS = 100  # Number of sessions whose metrics are kept (the least recently active ones are removed)
+
+_query_tag: ContextVar[Optional[str]] = ContextVar("query_tag", default=None)
+_query_session: ContextVar[Optional[str]] = ContextVar("query_session", default=None)
+Method = TypeVar("Method", bound=Callable[..., Any])
+
+
+def tag_queries(method: Method) -> Method:
+    """
+    Decorator tagging all queries sent during a call of method with the name of method
+    (the outermost tagged method wins : the queries of check_form_exist called by save_answers are tagged save_answers)
+    """
+
+    @wraps(method)
+    def tagged_method(*args: Any, **kwargs: Any) -> Any:
+        if _query_tag.get() is not None:
+            return method(*args, **kwargs)
+        token = _query_tag.set(method.__name__)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            _query_tag.reset(token)
+
+    return tagged_method  # type: ignore[return-value]
+
+
+def current_tag() -> str:
+    tag = _query_tag.get()
+    return UNTAGGED if tag is None else tag
+
+
+def set_query_session(session_id: Optional[str]) -> None:
+    """
+    Record the next queries of the current thread (Exemple : the thread running the script of a streamlit session)
+    in the metrics of the session session_id too
+    """
+    _query_session.set(session_id)
+
+
+def current_session() -> Optional[str]:
+    return _query_session.get()
+
+
+def request_charge(status_attributes: Optional[dict]) -> float:
+    """Return the request charge sent back by Cosmos DB with the result of a query (0.0 if there is none)"""
+    if not status_attributes or REQUEST_CHARGE_ATTRIBUTE not in status_attributes:
+        return 0.0
+    return float(status_attributes[REQUEST_CHARGE_ATTRIBUTE])
+
+
+@dataclass
+class TagStats:
+    """Dataclass with the counters of all queries sent by one method"""
+
+    nb_queries: int = 0
+    total_time: float = 0.0  # in seconds
+    total_results: int = 0
+    total_charge: float = 0.0  # in request units
+    latency_histogram: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    charge_histogram: list[int] = field(default_factory=lambda: [0] * (len(CHARGE_BUCKETS) + 1))
+
+    @property
+    def mean_time(self) -> float:
+        return self.total_time / self.nb_queries if self.nb_queries else 0.0
+
+    @property
+    def mean_charge(self) -> float:
+        return self.total_charge / self.nb_queries if self.nb_queries else 0.0
+
+    def add(self, duration: float, result_size: int, charge: float) -> None:
+        self.nb_queries += 1
+        self.total_time += duration
+        self.total_results += result_size
+        self.total_charge += charge
+        self.latency_histogram[bisect.bisect_left(LATENCY_BUCKETS, duration * 1000)] += 1
+        self.charge_histogram[bisect.bisect_left(CHARGE_BUCKETS, charge)] += 1
+
+    def copy(self) -> "TagStats":
+        return replace(
+            self, latency_histogram=list(self.latency_histogram), charge_histogram=list(self.charge_histogram)
+        )
+
+
+class QueryMetrics:
+    """
+    Class used to aggregate the cost of the queries by tag, with a latency histogram and a request charge histogram
+    (the last bucket of each histogram counts the values above the last bound)
+    The queries are aggregated for the whole app, and for the session which sent them (see set_query_session) so a
+    session can dump only its own queries, the metrics are shared by all sessions so they are protected by a lock
+
+    Methods :
+        - record : record one query
+        - tags_stats : counters of each tag (a copy)
+        - session_tags_stats : counters of each tag for the queries of one session (a copy)
+        - summary : one dict by tag, sorted by total request charge
+        - export : write the counters and the histograms in a json file
+        - to_json : the counters and the histograms as a json string
+        - reset : reset the counters of the whole app (and of all sessions), or of one session
+    """
+
+    def __init__(self) -> None:
+        self._tags_stats: dict[str, TagStats] = {}
+        # Session id -> counters of each tag, from the least to the most recently active session
+        self._sessions_stats: OrderedDict[str, dict[str, TagStats]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, tag: str, duration: float, result_size: int, charge: float) -> None:
+        """
+        Record one query
+
+        Parameters :
+            - tag : the method which sent the query (Exemple : "save_answers")
+            - duration : wall time of the query (in seconds)
+            - result_size : number of elements returned by the query
+            - charge : request charge of the query (in request units)
+        """
+        session_id = current_session()
+        with self._lock:
+            self._tags_stats.setdefault(tag, TagStats()).add(duration, result_size, charge)
+            if session_id is None:
+                return
+            if session_id not in self._sessions_stats and len(self._sessions_stats) >= MAX_SESSIONS:
+                self._sessions_stats.popitem(last=False)
+            session_stats = self._sessions_stats.setdefault(session_id, {})
+            self._sessions_stats.move_to_end(session_id)
+            session_stats.setdefault(tag, TagStats()).add(duration, result_size, charge)
+
+    @property
+    def tags_stats(self) -> dict[str, TagStats]:
+        with self._lock:
+            return {tag: stats.copy() for tag, stats in self._tags_stats.items()}
+
+    def session_tags_stats(self, session_id: str) -> dict[str, TagStats]:
+        with self._lock:
+            return {tag: stats.copy() for tag, stats in self._sessions_stats.get(session_id, {}).items()}
+
+    def _stats(self, session_id: Optional[str]) -> dict[str, TagStats]:
+        return self.tags_stats if session_id is None else self.session_tags_stats(session_id)
+
+    def summary(self, session_id: Optional[str] = None) -> list[dict[str, Any]]:
+        """
+        Return one dict by tag sorted by total request charge, for the whole app or for the queries of one session
+        """
+        return [
+            {
+                "tag": tag,
+                "nb_queries": stats.nb_queries,
+                "mean_time_ms": round(stats.mean_time * 1000, 2),
+                "total_time_s": round(stats.total_time, 3),
+                "total_results": stats.total_results,
+                "mean_charge_ru": round(stats.mean_charge, 2),
+                "total_charge_ru": round(stats.total_charge, 2),
+            }
+            for tag, stats in sorted(self._stats(session_id).items(), key=lambda item: -item[1].total_charge)
+        ]
+
+    def export(self, path: str, session_id: Optional[str] = None) -> None:
+        """
+        Write the counters and the histograms of all tags in a json file
+
+        Parameters :
+            - path : the path of the json file (string) (Exemple : "query_metrics.json")
+            - session_id : only the queries of this session if given
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.to_json(session_id))
+
+    def to_json(self, session_id: Optional[str] = None) -> str:
+        """Return the counters and the histograms of all tags (of one session if given) as a json string"""
+        content = {
+            "latency_buckets_ms": LATENCY_BUCKETS,
+            "charge_buckets_ru": CHARGE_BUCKETS,
+            "tags": {tag: asdict(stats) for tag, stats in self._stats(session_id).items()},
+        }
+        return json.dumps(content, indent=4)
+
+    def reset(self, session_id: Optional[str] = None) -> None:
+        with self._lock:
+            if session_id is not None:
+                self._sessions_stats.pop(session_id, None)
+                return
+            self._tags_stats = {}
+            self._sessions_stats = OrderedDict()
@@ -0,0 +1,285 @@
+"""
+This file contains the class QuestionGraph, an immutable in-memory snapshot of the question graph
+(the question-nodes and their proposition-edges) used to navigate in a Form without querying the database
+"""
+import threading
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Callable, Mapping, Optional, Sequence
+
+import numpy as np
+
+from ai_sustainability.package_business.models import Answer, Question
+from ai_sustainability.package_data_access.coef_codec import decode_coefs
+from ai_sustainability.package_data_access.graph_file import read_graph_file
+
+FIRST_NODE_ID = "1"
+QUESTION_PARTITION_KEY = "Questions"
+QUESTION_EDGE_LABELS = ("Proposition", "Q_Next")
+VERSION_PROPERTY = "graph_version"
+
+
+@dataclass(frozen=True)
+class QuestionNode:
+    """Immutable question-node of the question graph"""
+
+    question_id: str
+    type: str
+    text: str = ""
+    help_text: str = ""
+
+
+@dataclass(frozen=True)
+class PropositionEdge:
+    """Immutable proposition-edge of the question graph (a possible answer between two question-nodes)"""
+
+    answer_id: str
+    source_id: str
+    target_id: str
+    text: str = "Q_Next"
+    help_text: str = ""
+    modif_crypted: bool = False
+    metric: Optional[str] = None
+    list_coef: Sequence[float] = field(default=(), compare=False)  # A row of the coefficient matrix of the graph
+
+    def to_answer(self) -> Answer:
+        return Answer(
+            answer_id=self.answer_id,
+            text=self.text,
+            help_text=self.help_text,
+            modif_crypted=self.modif_crypted,
+            metric=None if self.metric is None else self.metric.split(","),  # type: ignore[arg-type]
+            list_coef=self.list_coef,
+        )
+
+
+def coefficient_matrix(propositions: list[PropositionEdge]) -> np.ndarray:
+    """
+    Stack the coefficients of the propositions which have some (in their order) in a read-only float32 matrix
+    (propositions x AIs)
+    """
+    list_coefs = [proposition.list_coef for proposition in propositions if len(proposition.list_coef)]
+    if len({len(list_coef) for list_coef in list_coefs}) > 1:
+        raise ValueError("All the propositions of the question graph must have the same number of coefficients")
+    coefficients = np.array(list_coefs, dtype=np.float32).reshape(len(list_coefs), -1 if list_coefs else 0)
+    coefficients.setflags(write=False)
+    return coefficients
+
+
+def _vertex_property(vertex: dict, name: str, default: str = "") -> str:
+    return vertex["properties"][name][0]["value"] if name in vertex.get("properties", {}) else default
+
+
+class QuestionGraph:
+    """
+    Immutable snapshot of the question graph, built once from the database or from a json file created by
+    DbGestion.save_graph, with the adjacency keyed by question id and by answer text
+    The Answers are created once and shared by all Questions (and all Forms), their coefficients are the rows of one
+    read-only float32 matrix (propositions x AIs)
+    A snapshot loaded without the coefficients (the live question graph) fills its matrix once, the first time a Form
+    is scored (see load_coefficients), the rest of the snapshot never changes
+
+    Methods :
+        - from_graphson : build a snapshot from the vertices and edges returned by the database
+        - from_json_file : build a snapshot from a json file (Exemple : "ai_sustainability/datas/data_weight.json")
+        - load_coefficients : fill the coefficient matrix of a snapshot loaded without the coefficients
+        - get_coefficients : get the coefficients of some propositions
+        - get_question : create a new Question (with the shared possible answers) from a question id
+        - get_propositions : get all possible Answers of a question
+        - get_next_question_id : get the id of the question following a question (and an answer)
+        - get_next_question : create the Question following the actual Question according to its choosen answers
+    """
+
+    def __init__(self, nodes: list[QuestionNode], propositions: list[PropositionEdge], version: str = "") -> None:
+        self._version = version
+        self._nodes: Mapping[str, QuestionNode] = MappingProxyType({node.question_id: node for node in nodes})
+        self._coefficients = coefficient_matrix(propositions)
+        self._coefficients_loaded = len(self._coefficients) > 0
+        self._coefficients_lock = threading.Lock()
+        rows = iter(self._coefficients)
+        propositions = [
+            replace(proposition, list_coef=next(rows)) if len(proposition.list_coef) else proposition
+            for proposition in propositions
+        ]
+        self._coefficient_rows: Mapping[str, Sequence[float]] = MappingProxyType(
+            {proposition.answer_id: proposition.list_coef for proposition in propositions if len(proposition.list_coef)}
+        )
+        self._propositions: Mapping[str, PropositionEdge] = MappingProxyType(
+            {proposition.answer_id: proposition for proposition in propositions}
+        )
+        out_propositions: dict[str, list[PropositionEdge]] = {node.question_id: [] for node in nodes}
+        next_by_answer: dict[str, dict[str, str]] = {node.question_id: {} for node in nodes}
+        for proposition in propositions:
+            out_propositions.setdefault(proposition.source_id, []).append(proposition)
+            next_by_answer.setdefault(proposition.source_id, {})[proposition.text] = proposition.target_id
+        self._out_propositions: Mapping[str, tuple[PropositionEdge, ...]] = MappingProxyType(
+            {question_id: tuple(edges) for question_id, edges in out_propositions.items()}
+        )
+        self._next_by_answer: Mapping[str, Mapping[str, str]] = MappingProxyType(
+            {question_id: MappingProxyType(targets) for question_id, targets in next_by_answer.items()}
+        )
+        self._answers: Mapping[str, Answer] = MappingProxyType(
+            {proposition.answer_id: proposition.to_answer() for proposition in propositions}
+        )
+        self._question_answers: Mapping[str, tuple[Answer, ...]] = MappingProxyType(
+            {
+                question_id: tuple(self._answers[edge.answer_id] for edge in edges)
+                for question_id, edges in self._out_propositions.items()
+            }
+        )
+        for question_id, answers in self._question_answers.items():
+            if len({answer.text for answer in answers}) < len(answers):
+                raise ValueError(f"The Question {question_id} can not have 2 Answer with the same text")
+
+    @property
+    def version(self) -> str:
+        return self._version
+
+    @property
+    def nodes(self) -> Mapping[str, QuestionNode]:
+        return self._nodes
+
+    @property
+    def propositions(self) -> Mapping[str, PropositionEdge]:
+        return self._propositions
+
+    @property
+    def answers(self) -> Mapping[str, Answer]:
+        return self._answers
+
+    @property
+    def coefficients(self) -> np.ndarray:
+        return self._coefficients
+
+    @property
+    def has_coefficients(self) -> bool:
+        return self._coefficients_loaded
+
+    @classmethod
+    def from_graphson(cls, vertices: list[dict], edges: list[dict], version: str = "") -> "QuestionGraph":
+        """
+        Build a snapshot from vertices and edges in the GraphSON format (result of g.V() and g.E() queries)
+        Only the question-nodes and the proposition-edges are kept
+        """
+        nodes = [
+            QuestionNode(
+                question_id=vertex["id"],
+                type=vertex["label"],
+                text=_vertex_property(vertex, "text"),
+                help_text=_vertex_property(vertex, "help text"),
+            )
+            for vertex in vertices
+            if _vertex_property(vertex, "partitionKey") == QUESTION_PARTITION_KEY
+        ]
+        propositions = []
+        for edge in edges:
+            if edge["label"] not in QUESTION_EDGE_LABELS:
+                continue
+            properties = edge.get("properties", {})
+            propositions.append(
+                PropositionEdge(
+                    answer_id=edge["id"],
+                    source_id=edge["outV"],
+                    target_id=edge["inV"],
+                    text=properties.get("text", "Q_Next"),
+                    help_text=properties.get("help text", ""),
+                    modif_crypted=properties.get("modif_crypted", "false") == "true",
+                    metric=properties.get("metric"),
+                    list_coef=decode_coefs(properties.get("list_coef", "")),
+                )
+            )
+        return cls(nodes, propositions, version)
+
+    @classmethod
+    def from_json_file(cls, path: str) -> "QuestionGraph":
+        """
+        Build a snapshot from a graph file created by DbGestion.save_graph, the version is the one stored in the first
+        node (if any)
+
+        Parameters :
+            - path : the path of the graph file (string) (Exemple : "ai_sustainability/datas/data_weight.json")
+        """
+        vertices, edges = read_graph_file(path)
+        first_node = next((vertex for vertex in vertices if vertex["id"] == FIRST_NODE_ID), {})
+        return cls.from_graphson(vertices, edges, _vertex_property(first_node, VERSION_PROPERTY))
+
+    def load_coefficients(self, loader: Callable[[], Mapping[str, Sequence[float]]]) -> None:
+        """
+        Fill the coefficient matrix of a snapshot loaded without the coefficients with the result of loader (the
+        coefficients by proposition id), loader is only called once even if several sessions score a Form at the
+        same time (the shared Answers keep an empty list_coef, the rows are returned by get_coefficients)
+
+        Exemple : question_graph.load_coefficients(database.load_coefficients)
+        """
+        with self._coefficients_lock:
+            if self._coefficients_loaded:
+                return
+            loaded = loader()
+            proposition_ids = [answer_id for answer_id in self._propositions if len(loaded.get(answer_id, ()))]
+            coefficients = coefficient_matrix(
+                [replace(self._propositions[answer_id], list_coef=loaded[answer_id]) for answer_id in proposition_ids]
+            )
+            self._coefficient_rows = MappingProxyType(dict(zip(proposition_ids, coefficients)))
+            self._coefficients = coefficients
+            self._coefficients_loaded = True
+
+    def get_coefficients(self, proposition_ids: Sequence[str]) -> dict[str, Sequence[float]]:
+        """
+        Get the coefficients (rows of the coefficient matrix) of some propositions, the ids which are not propositions
+        of the graph are ignored and a proposition without coefficients (Exemple : Q_Next) has an empty one
+        """
+        return {
+            proposition_id: self._coefficient_rows.get(proposition_id, ())
+            for proposition_id in dict.fromkeys(proposition_ids)
+            if proposition_id in self._propositions
+        }
+
+    def get_question(self, question_id: str) -> Question:
+        """
+        Create a new Question from the snapshot, its possible answers are the shared Answers of the snapshot
+        """
+        if question_id not in self._nodes:
+            raise ValueError(f"Question {question_id} does not exist in the question graph")
+        node = self._nodes[question_id]
+        return Question(
+            question_id=node.question_id,
+            text=node.text,
+            type=node.type,
+            _possible_answers=self.get_propositions(question_id),
+            _help_text=node.help_text,
+        )
+
+    def get_propositions(self, question_id: str) -> tuple[Answer, ...]:
+        """
+        Get all possibles Answers for a Question from the snapshot (shared, immutable)
+        """
+        return self._question_answers.get(question_id, ())
+
+    def get_next_question_id(self, question_id: str, answer_text: Optional[str] = None) -> str:
+        """
+        Get the id of the question following question_id, through the proposition with the text answer_text
+        (or through the first proposition if answer_text is None)
+        """
+        if answer_text is None:
+            out_propositions = self._out_propositions.get(question_id, ())
+            if not out_propositions:
+                raise ValueError(f"Question {question_id} has no next question")
+            return out_propositions[0].target_id
+        next_by_answer = self._next_by_answer.get(question_id, {})
+        if answer_text not in next_by_answer:
+            raise ValueError(f"Question {question_id} has no proposition '{answer_text}'")
+        return next_by_answer[answer_text]
+
+    def get_next_question(self, actual_question: Optional[Question]) -> Question:
+        """
+        Create the Question following actual_question according to its choosen answers
+        (the first Question of the Form if actual_question is None)
+        """
+        if actual_question is None:
+            return self.get_question(FIRST_NODE_ID)
+        if actual_question.type in ("Q_Open", "Q_QRM"):
+            return self.get_question(self.get_next_question_id(actual_question.question_id))
+        if actual_question.type in ("Q_QCM", "Q_QCM_Bool"):
+            answer_text = actual_question.choosen_answers[0].text
+            return self.get_question(self.get_next_question_id(actual_question.question_id, answer_text))
+        raise ValueError(f"Question type {actual_question.type} not supported")
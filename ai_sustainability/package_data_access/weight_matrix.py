@@ -0,0 +1,156 @@
+"""
+This file contains the class WeightMatrix, the weight matrix excel file (the coefficient of each AI for each
+proposition-edge, and the metric of the edges) compiled in a npz file next to it : the excel file is parsed again only
+when it changed, and the row of an edge is found with a dict lookup
+"""
+import hashlib
+import os
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ai_sustainability.package_data_access.coef_codec import COMPACT_LIST_COEF, encode_coefs
+
+NON_AI_COLUMNS = ["id_edges", "text", "metric"]  # The columns of the excel file which are not AIs
+
+
+def file_sha256(path: str) -> str:
+    """Return the sha256 of the content of a file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass(frozen=True)
+class SourceStamp:
+    """Dataclass identifying a version of the excel file, the sha256 is only computed when the mtime or size changed"""
+
+    mtime_ns: int
+    size: int
+    sha256: str = ""
+
+    @classmethod
+    def of_file(cls, path: str, with_sha256: bool = False) -> "SourceStamp":
+        stat = os.stat(path)
+        return cls(stat.st_mtime_ns, stat.st_size, file_sha256(path) if with_sha256 else "")
+
+
+@dataclass(frozen=True)
+class WeightMatrix:
+    """
+    Dataclass with the content of a weight matrix excel file
+
+    Parameters :
+        - edge_ids : the ids of the proposition-edges (the rows)
+        - list_ai : the names of the AIs (the columns)
+        - coefficients : (edges x AIs) read-only matrix of the coefficients
+        - metrics : the metric of each edge ("" if the edge has no metric)
+        - source : the version of the excel file compiled
+
+    Methods :
+        - load : read the compiled npz file, compiled again if the excel file changed
+        - from_excel : parse the excel file
+        - save_npz / from_npz : write and read the compiled file
+        - row : the coefficients of an edge
+        - coef_string : the coefficients of an edge encoded for the list_coef property (see encode_coefs)
+        - metric : the metric of an edge (None if it has no metric)
+        - list_ai_string : the names of the AIs in the list_AI format ("AI1, AI2, ...")
+    """
+
+    edge_ids: Tuple[str, ...]
+    list_ai: Tuple[str, ...]
+    coefficients: np.ndarray
+    metrics: Tuple[str, ...]
+    source: SourceStamp
+    _index: Mapping[str, int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.coefficients.setflags(write=False)
+        object.__setattr__(
+            self, "_index", MappingProxyType({edge_id: row for row, edge_id in enumerate(self.edge_ids)})
+        )
+
+    @classmethod
+    def load(cls, matrix_path: str, compiled_path: Optional[str] = None) -> "WeightMatrix":
+        """
+        Read the compiled weight matrix, the excel file is compiled again if its mtime or its size changed and its
+        content is not the one compiled (a file only touched, Exemple : by a checkout, is not parsed again)
+
+        Parameters :
+            - matrix_path : the path of the excel file (Exemple : "ai_sustainability/datas/Weight_matrix.xlsx")
+            - compiled_path : the path of the npz file (Exemple : "ai_sustainability/datas/Weight_matrix.npz" by
+                default)
+        """
+        compiled_path = f"{os.path.splitext(matrix_path)[0]}.npz" if compiled_path is None else compiled_path
+        stamp = SourceStamp.of_file(matrix_path)
+        if os.path.exists(compiled_path):
+            compiled = cls.from_npz(compiled_path)
+            if (compiled.source.mtime_ns, compiled.source.size) == (stamp.mtime_ns, stamp.size):
+                return compiled
+            stamp = SourceStamp.of_file(matrix_path, with_sha256=True)
+            if compiled.source.sha256 == stamp.sha256:
+                compiled = cls(compiled.edge_ids, compiled.list_ai, compiled.coefficients, compiled.metrics, stamp)
+                compiled.save_npz(compiled_path)
+                return compiled
+        weight_matrix = cls.from_excel(matrix_path)
+        weight_matrix.save_npz(compiled_path)
+        print(f"Weight matrix {matrix_path} compiled in {compiled_path}")
+        return weight_matrix
+
+    @classmethod
+    def from_excel(cls, matrix_path: str) -> "WeightMatrix":
+        """
+        Parse the excel file : one row by edge with its id (id_edges), its text, its metric and its coefficients
+        """
+        stamp = SourceStamp.of_file(matrix_path, with_sha256=True)
+        data = pd.read_excel(matrix_path)
+        return cls(
+            edge_ids=tuple(str(edge_id) for edge_id in data["id_edges"]),
+            list_ai=tuple(str(name) for name in data.drop(NON_AI_COLUMNS, axis=1).keys()),
+            coefficients=data.drop(NON_AI_COLUMNS, axis=1).to_numpy(dtype=np.float64),
+            metrics=tuple(metric if isinstance(metric, str) else "" for metric in data["metric"]),
+            source=stamp,
+        )
+
+    def save_npz(self, path: str) -> None:
+        with open(path, "wb") as file:  # An open file, so np.savez does not add .npz to the path
+            np.savez(
+                file,
+                edge_ids=np.array(self.edge_ids, dtype=str),
+                list_ai=np.array(self.list_ai, dtype=str),
+                coefficients=self.coefficients,
+                metrics=np.array(self.metrics, dtype=str),
+                source=np.array([self.source.mtime_ns, self.source.size], dtype=np.int64),
+                sha256=np.array(self.source.sha256),
+            )
+
+    @classmethod
+    def from_npz(cls, path: str) -> "WeightMatrix":
+        with np.load(path, allow_pickle=False) as npz_file:
+            content: dict[str, np.ndarray] = dict(npz_file.items())  # All arrays are read before the file is closed
+        return cls(
+            edge_ids=tuple(content["edge_ids"].tolist()),
+            list_ai=tuple(content["list_ai"].tolist()),
+            coefficients=content["coefficients"],
+            metrics=tuple(content["metrics"].tolist()),
+            source=SourceStamp(int(content["source"][0]), int(content["source"][1]), str(content["sha256"])),
+        )
+
+    def row(self, edge_id: str) -> np.ndarray:
+        """Return the coefficients of an edge (KeyError if the edge is not in the matrix)"""
+        return self.coefficients[self._index[edge_id]]
+
+    def coef_string(self, edge_id: str, compact: bool = COMPACT_LIST_COEF) -> str:
+        """Return the coefficients of an edge encoded for the list_coef property (Exemple : "1.0, 0.5, 0.0")"""
+        return encode_coefs(self.row(edge_id), compact)
+
+    def metric(self, edge_id: str) -> Optional[str]:
+        return self.metrics[self._index[edge_id]] or None
+
+    def list_ai_string(self) -> str:
+        return ", ".join(self.list_ai)
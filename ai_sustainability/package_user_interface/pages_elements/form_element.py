@@ -1,6 +1,7 @@
 """
 File used to show a Form
 """
+from dataclasses import replace
 from typing import Optional, Tuple, Union
 
 import plotly.graph_objects as go
@@ -15,7 +16,7 @@ from ai_sustainability.package_business.models import (
     Question,
     Username,
 )
-from ai_sustainability.utils import check_if_name_ok, sanitize_text_input
+from ai_sustainability.utils import check_if_name_ok
 
 EDIT_FORM_TEXT = (
     "If you want to change the name of the form, change it here (don't forget to press Enter to validate the name):"
@@ -91,20 +92,17 @@ class FormRender:
             else Answer(answer_id=question.possible_answers[0].answer_id, text="")
         )
         # We show the question text area
-        answer_text = sanitize_text_input(
-            str(
-                st.text_area(
-                    label=question.text,
-                    height=100,
-                    label_visibility="visible",
-                    value=previous_answer.text,
-                    help=question.help_text,
-                    disabled=self.locked,
-                )
+        answer_text = str(
+            st.text_area(
+                label=question.text,
+                height=100,
+                label_visibility="visible",
+                value=previous_answer.text,
+                help=question.help_text,
+                disabled=self.locked,
             )
         )
-        previous_answer.text = answer_text
-        return AnswersList([previous_answer]) if answer_text else None
+        return AnswersList([replace(previous_answer, text=answer_text)]) if answer_text else None
 
     def show_qcm_question(
         self, question: Question, previous_answers: Optional[AnswersList] = None
@@ -193,7 +191,7 @@ class FormRender:
         if dash:
             st.warning(f"Please don't use the {char} character in your form name")
             return ""
-        return sanitize_text_input(form_name)
+        return form_name
 
     def show_input_form_name(self, previous_name="") -> str:
         text = EDIT_FORM_TEXT if previous_name else INPUT_FORM_TEXT
@@ -10,7 +10,8 @@ from ai_sustainability.package_user_interface.utils_streamlit import (
     check_user_connection,
     get_application,
 )
-from ai_sustainability.utils import sanitize_text_input
+
+FEEDBACKS_PER_PAGE = 20  # Number of users shown in one page of the admin view
 
 
 class FeedbackPage:
@@ -21,6 +22,7 @@ class FeedbackPage:
         - __init__ : initialise the UI and check if the user is connected
         - render
         - show_all_feedbacks
+        - show_choice_page
         - show_user_feedback
         - warn_unexisting_user
         - retrieve_user_feedback : show a box where the user can give a feedback
@@ -44,13 +46,25 @@ class FeedbackPage:
         self.retrieve_user_feedback()
 
     def show_all_feedbacks(self) -> None:
-        all_feedbacks = self.app.get_all_feedbacks()
-        if not all_feedbacks:
+        nb_users = self.app.get_nb_users()
+        if not nb_users:
             st.write("There is no user in the database.")
             return
-        has_feedback = [self.show_user_feedback(user_feedback) for user_feedback in all_feedbacks]
+        page = self.show_choice_page(nb_users)
+        page_feedbacks = self.app.get_feedbacks_page(page * FEEDBACKS_PER_PAGE, FEEDBACKS_PER_PAGE)
+        has_feedback = [self.show_user_feedback(user_feedback) for user_feedback in page_feedbacks]
         if not any(has_feedback):
-            st.write("There is no feedback in the database.")
+            st.write("There is no feedback from these users.")
+
+    def show_choice_page(self, nb_users: int) -> int:
+        """
+        Show a number input to select the page of users (only if there is more than one page), return the page index
+        """
+        nb_pages = (nb_users - 1) // FEEDBACKS_PER_PAGE + 1
+        if nb_pages == 1:
+            return 0
+        page = st.number_input(f"Page (1 to {nb_pages})", min_value=1, max_value=nb_pages, value=1, step=1)
+        return int(page) - 1
 
     def show_user_feedback(self, user_feedback: UserFeedback) -> bool:
         with st.expander("Feedbacks from " + user_feedback.user):
@@ -79,4 +93,4 @@ class FeedbackPage:
             return Feedback("")
         st.write("Your feedback has been saved")
         st.write("Thank you!")
-        return Feedback(sanitize_text_input(text))
+        return Feedback(text)
@@ -113,11 +113,11 @@ class HistoricStreamlit:
         if not selected_form_name:  # if no form selected, don't show the rest
             return
 
-        # get the list with all previous answers contained in the form
-        previous_form_answers = self.app.get_previous_form(choosen_user, selected_form_name)
+        # get the list with all previous answers contained in the form (and its best AIs)
+        previous_form_answers, list_bests_ais = self.app.get_previous_form_and_best_ais(
+            choosen_user, selected_form_name
+        )
         self.form_ui.render_as_text(previous_form_answers)
-
-        list_bests_ais = self.app.get_best_ais(choosen_user, selected_form_name)
         self.form_ui.show_best_ai(list_bests_ais)
 
         if previous_form_answers.experiment_id is not None:
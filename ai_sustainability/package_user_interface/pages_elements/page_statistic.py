@@ -9,6 +9,7 @@ from decouple import config
 from ai_sustainability.package_business.models import AnswersStats
 from ai_sustainability.package_user_interface.utils_streamlit import (
     check_user_connection,
+    current_session_id,
     get_application,
 )
 
@@ -22,7 +23,9 @@ class StatisticPage:
         - render
         - check_if_admin : chek if the user is an admin, show some messages in both cases
         - display_statistic_edges : show stats based on the edges
-        - display_statistic_ais : show stats based on the AIs (not implemented yet)
+        - display_statistic_ais : show stats based on the AIs recommended to the forms
+        - display_query_metrics : show the cost of the database queries by Application method, how often a write
+            needed a retry and the hit rate of the caches
     """
 
     def __init__(self) -> None:
@@ -35,7 +38,8 @@ class StatisticPage:
             return
         selected_edges = self.app.get_nb_selected_answer_stats()
         self.display_answers_statistic(selected_edges)
-        self.display_statistic_ais()  # Don't do anything for now
+        self.display_statistic_ais()
+        self.display_query_metrics()
 
     def check_if_admin(self, username: str) -> bool:
         if username != config("ADMIN_USERNAME"):
@@ -76,5 +80,50 @@ class StatisticPage:
 
     def display_statistic_ais(self) -> None:
         """
-        Show stats based on the AIs (not implemented yet)
+        Show how often each AI is recommended (stacked by rank) and a table with the share of the forms and the mean
+        rank of each AI
         """
+        ai_statistics = self.app.get_ai_statistics()
+        if not ai_statistics.nb_forms:
+            return
+        with st.spinner("Loading..."):
+            summary = ai_statistics.summary()
+            summary = summary[summary["nb_recommendations"] > 0]
+            fig = go.Figure(
+                data=[
+                    go.Bar(x=summary["ai"], y=summary[f"rank_{rank}"], name=f"Rank {rank}")
+                    for rank in range(1, ai_statistics.nb_ranks + 1)
+                ]
+            )
+            fig.update_layout(
+                barmode="stack",
+                title=f"Number of times each AI was recommended ({ai_statistics.nb_forms} forms)",
+                xaxis_title="AIs",
+                yaxis_title="Number of forms",
+            )
+            st.plotly_chart(fig)
+            st.dataframe(summary.set_index("ai"))
+
+    def display_query_metrics(self) -> None:
+        """
+        Show the latency and the request charge of the database queries by Application method (since the start of
+        the app, or of the current session only), the histograms can be downloaded as a json file
+        Also show how often a write needed a retry to be visible, and the hit rate of the caches
+        """
+        query_metrics = self.app.get_query_metrics()
+        with st.expander("Cost of the database queries"):
+            session_id = current_session_id() if st.checkbox("Only the queries of this session") else None
+            summary = query_metrics.summary(session_id)
+            if not summary:
+                st.write("No query recorded")
+                return
+            st.dataframe(summary)
+            st.download_button("Export (json)", query_metrics.to_json(session_id), file_name="query_metrics.json")
+            consistency_stats = self.app.get_consistency_stats()
+            st.caption(
+                f"Write confirmations : {consistency_stats.nb_writes} writes, {consistency_stats.nb_retried_writes} "
+                f"needed a retry ({consistency_stats.retry_rate:.0%}, {consistency_stats.nb_retries} retries), "
+                f"{consistency_stats.nb_failures} not confirmed"
+            )
+            for name, stats in self.app.get_cache_stats().items():
+                st.caption(f"Cache {name} : {stats.nb_hits} hits, {stats.nb_misses} misses ({stats.hit_rate:.0%})")
@@ -4,24 +4,46 @@ ONLY STREAMLIT UTILS, who puts DB connect here died
 function usefull for the project's UI
 
 method:
+    - current_session_id : the id of the streamlit session running the script
+    - get_application : the Application shared by all sessions, its queries are recorded for the current session too
     - check_user_connection
     - dash_error : show the error message if no_dash_in_my_text retrun True
 """
+import os
+from typing import Optional
+
 import streamlit as st
 from decouple import config
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 
 from ai_sustainability.package_application.application import Application
 from ai_sustainability.package_business.models import Username
+from ai_sustainability.package_data_access.async_db_connection import AsyncDbConnection
+from ai_sustainability.package_data_access.best_ais_table import BestAisTable
 from ai_sustainability.package_data_access.db_connection import DbConnection
+from ai_sustainability.package_data_access.query_metrics import set_query_session
+
+BEST_AIS_TABLE_PATH = "ai_sustainability/datas/best_ais_table.json"  # Created by best_ais_table.py (optional)
 
 
 @st.cache_resource
-def get_application() -> Application:
+def _create_application() -> Application:
     database = DbConnection()
-    app = Application(database)
+    best_ais_table = BestAisTable.from_json_file(BEST_AIS_TABLE_PATH) if os.path.exists(BEST_AIS_TABLE_PATH) else None
+    app = Application(database, AsyncDbConnection(database), best_ais_table=best_ais_table)
     return app
 
 
+def current_session_id() -> Optional[str]:
+    script_run_ctx = get_script_run_ctx()
+    return None if script_run_ctx is None else script_run_ctx.session_id
+
+
+def get_application() -> Application:
+    set_query_session(current_session_id())
+    return _create_application()
+
+
 def check_user_connection() -> Username:
     if "username" not in st.session_state or st.session_state.username == "":
         # User not connected, don't show the form, ask for connection
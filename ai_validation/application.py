@@ -3,6 +3,7 @@
 
 from typing import Optional, Tuple
 
+from ai_sustainability.package_data_access.query_metrics import tag_queries
 from ai_validation.business import Business
 from ai_validation.db_access import DbAccess
 from ai_validation.mlflow_access import MlflowConnector
@@ -17,18 +18,22 @@ class Application:
         self.mlflow_connector = MlflowConnector()
         self.business = Business()
 
+    @tag_queries
     def get_all_user(self) -> list[str]:
         return self.database.get_all_users()
 
+    @tag_queries
     def get_form_id(self, experiment_id: str) -> Optional[str]:
         return self.database.get_form_id(experiment_id)
 
+    @tag_queries
     def get_metrics(self, form_id: str, delete_accuracy: bool = True) -> list[str]:
         # Use delete_accuracy if an "Accuracy" metric is log in the mlflow experience
         # a score parameters it's alway log before but with an other name (max_error, f1_score, etc.)
         raw_metrics = self.database.get_metrics_from_form(form_id)
         return self.business.delete_accuracy(raw_metrics) if delete_accuracy else raw_metrics
 
+    @tag_queries
     def get_experiment_from_user(self, selected_user: Optional[str]) -> Optional[list[Experiment]]:
         id_list = self.database.get_experiment_id(selected_user)
         return self.mlflow_connector.get_experiment(selected_user, id_list)
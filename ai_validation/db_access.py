@@ -8,6 +8,8 @@ from decouple import config
 from gremlin_python import statics
 from gremlin_python.driver import client, serializer
 
+from ai_sustainability.package_data_access.query_builder import QueryBuilder
+
 FIRST_NODE_ID = "1"
 END_TYPE = config("END_TYPE")
 statics.load_statics(globals())
@@ -35,6 +37,7 @@ class DbAccess:
             container_name=config("DATABASENAME"),
             primary_key=config("PRIMARYKEY"),
         )
+        self.query_builder = QueryBuilder(self.gremlin_client)
 
     def close(self) -> None:
         """
@@ -42,18 +45,18 @@ class DbAccess:
         """
         self.gremlin_client.close()
 
-    def run_gremlin_query(self, query: str) -> list:
+    def run_gremlin_query(self, query: str, bindings: Optional[dict] = None) -> list:
         """
         Run a gremlin query
 
         Parameters :
-            - query : the gremlin query to run (Exemple : Query("g.V()"))
+            - query : the gremlin script template to run (Exemple : "g.V(node_id)")
+            - bindings : the values of the variables of the template (Exemple : {"node_id": "1"})
 
         Return :
             - list of all result that correspond to the query
         """
-        run = self.gremlin_client.submit(query).all()
-        return run.result()
+        return self.query_builder.submit(query, bindings)
 
     def get_all_users(self) -> list[str]:
         """
@@ -63,7 +66,9 @@ class DbAccess:
 
     def get_form_id(self, experiment_id: str) -> Optional[str]:
         """Method used to get the id of the first node of an Answer from an experiment id"""
-        form_id_list = self.run_gremlin_query(f"g.V().where(values('mlflow_id').is('{experiment_id}')).id()")
+        form_id_list = self.run_gremlin_query(
+            "g.V().where(values('mlflow_id').is(experiment_id)).id()", {"experiment_id": experiment_id}
+        )
         return form_id_list[0] if form_id_list else None
 
     def get_metrics_from_form(self, form_id: str) -> list[str]:
@@ -72,15 +77,12 @@ class DbAccess:
         """
         list_metrics: list[str] = []
         first_node_id = form_id
-        query = f"g.V('{first_node_id}')"
-        node = self.run_gremlin_query(query)[0]
+        node = self.run_gremlin_query("g.V(node_id)", {"node_id": first_node_id})[0]
         while node["label"] != "end":
-            query_edge = f"g.V('{node['id']}').outE()"
-            out_edge = self.run_gremlin_query(query_edge)[0]
+            out_edge = self.run_gremlin_query("g.V(node_id).outE()", {"node_id": node["id"]})[0]
             if "metric" in out_edge["properties"]:
                 list_metrics += out_edge["properties"]["metric"].split(",")
-            query = f"g.V('{node['id']}').out()"
-            node = self.run_gremlin_query(query)[0]
+            node = self.run_gremlin_query("g.V(node_id).out()", {"node_id": node["id"]})[0]
         return list_metrics
 
     def get_experiment_id(self, selected_user: Optional[str]) -> list[str]:
@@ -90,6 +92,6 @@ class DbAccess:
             )
         else:
             all_node = self.run_gremlin_query(
-                f"g.V('{selected_user}').outE().hasLabel('Answer').inV().properties('mlflow_id')"
+                "g.V(username).outE().hasLabel('Answer').inV().properties('mlflow_id')", {"username": selected_user}
             )
         return [i["value"] for i in all_node]
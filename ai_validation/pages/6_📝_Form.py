@@ -9,9 +9,7 @@ from ai_sustainability.package_business.models import Username
 from ai_sustainability.package_user_interface.pages_elements.form_element import (
     FormRender,
 )
-from ai_sustainability.package_user_interface.utils_streamlit import (
-    get_application as get_application_form,
-)
+from ai_sustainability.package_user_interface.utils_streamlit import get_application as get_application_form
 from ai_validation.global_variables import DENOMINATOR_METRICS, NUMERATOR_METRICS
 from ai_validation.utils import get_actual_experiment, get_application
 
@@ -78,11 +76,11 @@ class Form:
             return
         username, _, form_name = form_id.split("-")
 
-        # get the list with all previous answers contained in the form
-        previous_form_answers = self.app_form.get_previous_form(Username(username), form_name)
+        # get the list with all previous answers contained in the form (and its best AIs)
+        previous_form_answers, list_bests_ais = self.app_form.get_previous_form_and_best_ais(
+            Username(username), form_name
+        )
         self.form_ui.render_as_text(previous_form_answers)
-
-        list_bests_ais = self.app_form.get_best_ais(Username(username), form_name)
         self.form_ui.show_best_ai(list_bests_ais)
 
         self.show_relevant_metrics(form_id)
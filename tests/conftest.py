@@ -0,0 +1,172 @@
+"""
+Shared fixtures of the tests : the settings read when the data-access layer is imported, and a small question graph
+(in the GraphSON format of the database) :
+
+    1 (Q_Open) -Q_Next-> 2 (Q_QCM_Bool) -Yes/No-> 3 (Q_QRM) -A/B/C-> 4 (end)
+
+with 3 AIs (AI1, AI2, AI3) and the coefficients of the propositions in COEFFICIENTS
+"""
+import concurrent.futures
+import os
+import sys
+from typing import Callable, Optional
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("END_TYPE", "end")
+os.environ.setdefault("NBEST_AI", "2")
+
+LIST_AI = ["AI1", "AI2", "AI3"]
+COEFFICIENTS = {
+    "2-3-1": [1.0, 0.5, 0.0],  # Yes
+    "2-3-2": [0.5, 1.0, 1.0],  # No
+    "3-4-1": [1.0, 1.0, 0.5],  # A
+    "3-4-2": [0.5, 0.5, 1.0],  # B
+    "3-4-3": [1.0, 0.25, 1.0],  # C
+}
+
+
+def graphson_vertex(vertex_id: str, label: str, text: str, **properties: str) -> dict:
+    properties = {"text": text, "partitionKey": "Questions", **properties}
+    return {
+        "id": vertex_id,
+        "label": label,
+        "type": "vertex",
+        "properties": {name: [{"id": f"{vertex_id}|{name}", "value": value}] for name, value in properties.items()},
+    }
+
+
+def graphson_edge(edge_id: str, label: str, source_id: str, target_id: str, **properties: str) -> dict:
+    return {
+        "id": edge_id,
+        "label": label,
+        "type": "edge",
+        "outV": source_id,
+        "inV": target_id,
+        "properties": properties,
+    }
+
+
+def proposition(edge_id: str, text: str) -> dict:
+    source_id, target_id, _ = edge_id.split("-")
+    list_coef = ", ".join(str(coef) for coef in COEFFICIENTS[edge_id])
+    return graphson_edge(
+        edge_id, "Proposition", source_id, target_id, text=text, modif_crypted="false", list_coef=list_coef
+    )
+
+
+def small_graph_elements() -> tuple[list[dict], list[dict]]:
+    """Return the vertices and the edges of the small question graph"""
+    vertices = [
+        graphson_vertex("1", "Q_Open", "Describe the problem", list_AI=", ".join(LIST_AI)),
+        graphson_vertex("2", "Q_QCM_Bool", "Are the data crypted ?"),
+        graphson_vertex("3", "Q_QRM", "Which constraints ?"),
+        graphson_vertex("4", "end", "end"),
+    ]
+    edges = [
+        graphson_edge("1-2-1", "Q_Next", "1", "2"),
+        proposition("2-3-1", "Yes"),
+        proposition("2-3-2", "No"),
+        proposition("3-4-1", "A"),
+        proposition("3-4-2", "B"),
+        proposition("3-4-3", "C"),
+    ]
+    return vertices, edges
+
+
+@pytest.fixture
+def graph_path(tmp_path) -> str:
+    """The small question graph in a graph file (the format of DbGestion.save_graph)"""
+    from ai_sustainability.package_data_access.graph_file import (
+        open_graph_file,
+        write_graph_elements,
+    )
+
+    vertices, edges = small_graph_elements()
+    path = str(tmp_path / "graph.ndjson")
+    with open_graph_file(path, "w") as file:
+        write_graph_elements(file, vertices + edges)
+    return path
+
+
+@pytest.fixture
+def question_graph(graph_path):
+    from ai_sustainability.package_data_access.question_graph import QuestionGraph
+
+    return QuestionGraph.from_json_file(graph_path)
+
+
+@pytest.fixture
+def in_memory_db(graph_path):
+    from ai_sustainability.package_data_access.in_memory_db_connection import (
+        InMemoryDbConnection,
+    )
+
+    return InMemoryDbConnection(graph_path, sleep=lambda _: None)
+
+
+class ScriptedResultSet:
+    """Result of a ScriptedClient query, with the interface of gremlin_python.driver.resultset.ResultSet used here"""
+
+    def __init__(self, result: list) -> None:
+        self._result = result
+        self.status_attributes = {"x-ms-total-request-charge": 1.0}
+
+    def all(self):
+        future = concurrent.futures.Future()
+        future.set_result(self._result)
+        return future
+
+
+class ScriptedClient:
+    """
+    Gremlin client answering the queries with a function (template, bindings) -> result, the queries sent are kept
+    in submitted
+    """
+
+    def __init__(self) -> None:
+        self.submitted: list[tuple[str, dict]] = []
+        self.answer: Callable[[str, dict], list] = lambda template, bindings: []
+
+    def submit(self, template: str, bindings: Optional[dict] = None) -> ScriptedResultSet:
+        self.submitted.append((template, dict(bindings or {})))
+        return ScriptedResultSet(self.answer(template, dict(bindings or {})))
+
+    def submit_async(self, template: str, bindings: Optional[dict] = None):
+        future = concurrent.futures.Future()
+        future.set_result(self.submit(template, bindings))
+        return future
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def scripted_client(monkeypatch) -> ScriptedClient:
+    """The client used by the DbConnection and DbGestion created in a test (no connection to the database)"""
+    from ai_sustainability.package_data_access import db_connection, db_gestion
+
+    gremlin_client = ScriptedClient()
+    monkeypatch.setenv("DATABASENAME", "tests")
+    monkeypatch.setenv("PRIMARYKEY", "tests")
+    monkeypatch.setattr(db_connection, "connect", lambda **_: gremlin_client)
+    monkeypatch.setattr(db_gestion.client, "Client", lambda *_, **__: gremlin_client)
+    return gremlin_client
+
+
+def fill_form(database, form_name: str, choices: list[list[str]], username: str = "user"):
+    """
+    Fill a Form like a user : choices are the texts of the choosen answers of each question before the end
+    (Exemple : [["Q_Next"], ["Yes"], ["A", "C"]] for the small question graph)
+    """
+    from ai_sustainability.package_business.models import Answer, Form
+
+    form = Form(username=username, form_name=form_name)
+    question = database.get_next_question(form, 0)
+    for question_number, texts in enumerate(choices, start=1):
+        answers_by_text = {answer.text: answer for answer in question.possible_answers}
+        form.add_answers([answers_by_text[text] for text in texts], question_number)
+        question = database.get_next_question(form, question_number)
+    form.add_answers([Answer.create_end_answer()], len(choices) + 1)
+    return form
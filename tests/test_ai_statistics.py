@@ -0,0 +1,90 @@
+"""
+Tests of the AiStatistics : how often each AI is recommended and at which rank, built at once or form by form
+"""
+import threading
+
+import numpy as np
+import pytest
+from conftest import LIST_AI
+
+from ai_sustainability.package_business.ai_statistics import AiStatistics
+from ai_sustainability.package_data_access.db_connection import (
+    ALL_BEST_AIS_QUERY,
+    DbConnection,
+)
+
+FORMS_BEST_AIS = {
+    ("alice", "first"): ["AI1", "AI2"],
+    ("alice", "second"): ["AI3", "AI1"],
+    ("bob", "first"): ["AI1"],
+    ("bob", "second"): [],
+}
+
+
+def test_forms_added_one_by_one_give_the_same_statistics():
+    statistics = AiStatistics(LIST_AI, 2)
+    for form_key, best_ais in FORMS_BEST_AIS.items():
+        statistics.set_form(form_key, best_ais)
+    built = AiStatistics.from_forms(LIST_AI, 2, FORMS_BEST_AIS)
+    np.testing.assert_array_equal(statistics.rank_histogram, built.rank_histogram)
+    np.testing.assert_array_equal(built.rank_histogram, [[2, 1], [0, 1], [1, 0]])
+    assert built.nb_forms == 4
+
+
+def test_replaced_and_removed_forms_are_not_counted_anymore():
+    statistics = AiStatistics.from_forms(LIST_AI, 2, FORMS_BEST_AIS)
+    statistics.set_form(("alice", "first"), ["AI2", "AI3"])
+    statistics.remove_form(("alice", "second"))
+    statistics.remove_form(("carol", "unknown"))
+    np.testing.assert_array_equal(statistics.rank_histogram, [[1, 0], [1, 0], [0, 1]])
+    assert statistics.nb_forms == 3
+
+
+def test_unknown_ais_and_extra_ranks_are_ignored():
+    statistics = AiStatistics.from_forms(LIST_AI, 2, {("alice", "form"): ["AI4", "AI2", "AI3"]})
+    np.testing.assert_array_equal(statistics.rank_histogram, [[0, 0], [0, 1], [0, 0]])
+
+
+def test_summary_is_sorted_by_number_of_recommendations():
+    summary = AiStatistics.from_forms(LIST_AI, 2, FORMS_BEST_AIS).summary()
+    assert list(summary.columns) == ["ai", "nb_recommendations", "share_of_forms", "mean_rank", "rank_1", "rank_2"]
+    assert list(summary["ai"]) == ["AI1", "AI2", "AI3"]
+    assert list(summary["share_of_forms"]) == pytest.approx([0.75, 0.25, 0.25])
+    assert list(summary["mean_rank"]) == pytest.approx([4 / 3, 2.0, 1.0])
+
+
+def test_never_recommended_ai_has_no_mean_rank():
+    summary = AiStatistics(LIST_AI, 2).summary()
+    assert summary["nb_recommendations"].sum() == 0 and summary["mean_rank"].isna().all()
+
+
+def test_best_ais_of_all_forms_are_read_with_one_query(scripted_client, question_graph):
+    scripted_client.answer = lambda template, bindings: [
+        {"username": "alice", "form_id": "alice-answer1-first", "best_ais": "AI1, AI2"},
+        {"username": "bob", "form_id": "bob-answer1-first", "best_ais": ""},
+    ]
+    all_best_ais = DbConnection(question_graph=question_graph).get_all_best_ais()
+    assert all_best_ais == {("alice", "first"): ["AI1", "AI2"], ("bob", "first"): []}
+    assert [template for template, _ in scripted_client.submitted] == [ALL_BEST_AIS_QUERY]
+
+
+def test_summary_is_consistent_during_concurrent_saves():
+    statistics = AiStatistics(LIST_AI, 2)
+    stop = threading.Event()
+
+    def save_forms() -> None:
+        index = 0
+        while not stop.is_set():
+            statistics.set_form(("alice", f"form{index}"), ["AI1", "AI2"])
+            index += 1
+
+    thread = threading.Thread(target=save_forms)
+    thread.start()
+    try:
+        for _ in range(200):
+            summary = statistics.summary().set_index("ai")
+            assert summary.loc["AI1", "share_of_forms"] in (0.0, 1.0)
+            assert summary.loc["AI1", "nb_recommendations"] == summary.loc["AI2", "nb_recommendations"]
+    finally:
+        stop.set()
+        thread.join()
@@ -0,0 +1,130 @@
+"""
+Tests of the counters of the stats vertex (number of times each proposition was selected) : the compare-and-set of
+DbConnection.update_answer_counters, their creation from the Answer edges, and the in-memory connection
+"""
+import pytest
+from conftest import fill_form
+from gremlin_python.driver.protocol import GremlinServerError
+
+from ai_sustainability.package_data_access.db_connection import (
+    ANSWER_COUNTS_QUERY,
+    ANSWER_STATS_QUERY,
+    COUNTER_PREFIX,
+    COUNTERS_MAX_ATTEMPTS,
+    DbConnection,
+)
+
+
+class StatsVertex:
+    """Answer the counters queries of a DbConnection like a database with one stats vertex"""
+
+    def __init__(self, counters=None, answer_counts=None) -> None:
+        self.counters = counters  # None while the stats vertex does not exist
+        self.answer_counts = answer_counts or {}
+        self.concurrent_updates: list[dict] = []  # Counters written by another session before the next compare-and-set
+
+    def answer(self, template: str, bindings: dict) -> list:
+        if template == ANSWER_STATS_QUERY:
+            if self.counters is None:
+                return []
+            return [{COUNTER_PREFIX + key: [value] for key, value in self.counters.items()}]
+        if template == ANSWER_COUNTS_QUERY:
+            return [dict(self.answer_counts)]
+        if self.concurrent_updates:
+            self.counters = {**(self.counters or {}), **self.concurrent_updates.pop(0)}
+        counters = self.counters or {}
+        names = {
+            bindings[f"k{index}"][len(COUNTER_PREFIX) :]: index
+            for index in range(len(bindings))
+            if f"k{index}" in bindings
+        }
+        if any(
+            counters.get(name, 0) != bindings[f"e{index}"] for name, index in names.items() if f"e{index}" in bindings
+        ):
+            return []
+        self.counters = {**counters, **{name: bindings[f"c{index}"] for name, index in names.items()}}
+        return [{"id": "stats"}]
+
+
+@pytest.fixture
+def database(scripted_client, question_graph) -> DbConnection:
+    return DbConnection(question_graph=question_graph)
+
+
+def test_counters_are_incremented_with_one_compare_and_set(scripted_client, database):
+    stats = StatsVertex(counters={"2-3-1": 3})
+    scripted_client.answer = stats.answer
+    database.update_answer_counters({"2-3-1": 1, "3-4-1": 1, "3-4-2": 0})
+    assert stats.counters == {"2-3-1": 4, "3-4-1": 1}
+    template = scripted_client.submitted[-1][0]
+    assert ".property(single, k0, c0)" in template and ".where(" in template
+    assert len(scripted_client.submitted) == 2
+
+
+def test_concurrent_update_is_not_lost(scripted_client, database):
+    stats = StatsVertex(counters={"2-3-1": 3})
+    stats.concurrent_updates = [{"2-3-1": 5}]
+    scripted_client.answer = stats.answer
+    database.update_answer_counters({"2-3-1": 1})
+    assert stats.counters == {"2-3-1": 6}
+
+
+def test_precondition_failed_is_retried(scripted_client, database):
+    stats = StatsVertex(counters={"2-3-1": 3})
+    conflict = GremlinServerError({"code": 500, "message": "conflict", "attributes": {"x-ms-status-code": 412}})
+    nb_conflicts = [1]
+
+    def answer(template: str, bindings: dict) -> list:
+        if template != ANSWER_STATS_QUERY and nb_conflicts[0]:
+            nb_conflicts[0] -= 1
+            raise conflict
+        return stats.answer(template, bindings)
+
+    scripted_client.answer = answer
+    database.update_answer_counters({"2-3-1": -1})
+    assert stats.counters == {"2-3-1": 2}
+
+
+def test_too_many_concurrent_updates_raise(scripted_client, database):
+    stats = StatsVertex(counters={"2-3-1": 0})
+    stats.concurrent_updates = [{"2-3-1": attempt + 1} for attempt in range(COUNTERS_MAX_ATTEMPTS)]
+    scripted_client.answer = stats.answer
+    with pytest.raises(RuntimeError):
+        database.update_answer_counters({"2-3-1": 1})
+
+
+def test_missing_stats_vertex_is_created_from_the_answer_edges(scripted_client, database):
+    # The Answer edges already include the saved Form, so its deltas are not added again
+    stats = StatsVertex(answer_counts={"2-3-1": 2, "3-4-3": 1})
+    scripted_client.answer = stats.answer
+    database.update_answer_counters({"2-3-1": 1})
+    assert stats.counters == {"2-3-1": 2, "3-4-3": 1}
+
+
+def test_selected_edges_are_counted_on_a_database_without_stats_vertex(scripted_client, database):
+    scripted_client.answer = StatsVertex(answer_counts={"2-3-2": 4}).answer
+    nb_selected = {answer.answer_id: nb_selected for answer, nb_selected in database.get_nb_selected_edge()}
+    assert nb_selected["2-3-2"] == 4
+
+
+def test_in_memory_counters_follow_the_saved_and_dropped_forms(in_memory_db):
+    assert in_memory_db.get_answer_counters() == {}
+    first_form = fill_form(in_memory_db, "first", [["Q_Next"], ["Yes"], ["A", "C"]])
+    second_form = fill_form(in_memory_db, "second", [["Q_Next"], ["Yes"], ["B"]])
+    in_memory_db.save_answers(first_form, [])
+    in_memory_db.save_answers(second_form, [])
+    assert in_memory_db.get_answer_counters() == {"1-2-1": 2, "2-3-1": 2, "3-4-1": 1, "3-4-2": 1, "3-4-3": 1}
+    in_memory_db.drop_form(first_form)
+    counters = in_memory_db.get_answer_counters()
+    assert {key: value for key, value in counters.items() if value} == {"1-2-1": 1, "2-3-1": 1, "3-4-2": 1}
+    assert in_memory_db.reconcile_answer_counters() == 0
+
+
+def test_selected_edges_are_read_in_one_query_with_the_texts_of_the_propositions(scripted_client, database):
+    scripted_client.answer = StatsVertex(counters={"2-3-1": 3, "3-4-2": 0, "3-4-3": 1}).answer
+    selected_edges = database.get_nb_selected_edge()
+    assert [(answer.answer_id, answer.text, nb_selected) for answer, nb_selected in selected_edges] == [
+        ("2-3-1", "Yes", 3),
+        ("3-4-3", "C", 1),
+    ]
+    assert [template for template, _ in scripted_client.submitted] == [ANSWER_STATS_QUERY]
@@ -0,0 +1,24 @@
+"""
+Tests of the Application with the in-memory connection (the Application needs mlflow to be installed)
+"""
+import pytest
+from conftest import fill_form
+
+pytest.importorskip("mlflow")
+
+# pylint: disable=wrong-import-position
+from ai_sustainability.package_application.application import (  # noqa: E402
+    Application,
+)
+
+
+@pytest.fixture
+def application(in_memory_db) -> Application:
+    return Application(in_memory_db)
+
+
+def test_forms_do_not_share_their_questions(application):
+    form = fill_form(application, "first", [["Q_Next"], ["Yes"], ["A", "C"]])
+    other_form = fill_form(application, "second", [["Q_Next"], ["Yes"], ["B"]])
+    assert form.question_list[2] is not other_form.question_list[2]
+    assert [answer.text for answer in form.question_list[2].choosen_answers] == ["A", "C"]
@@ -0,0 +1,134 @@
+"""
+Tests of the AsyncDbConnection : independent queries run concurrently, with a limit on the number of queries in flight
+"""
+import asyncio
+import concurrent.futures
+import threading
+import time
+
+import pytest
+from conftest import ScriptedClient
+from test_form_chain import CHAIN
+
+from ai_sustainability.package_business.models import Username
+from ai_sustainability.package_data_access.async_db_connection import (
+    AsyncDbConnection,
+)
+from ai_sustainability.package_data_access.db_connection import (
+    BEST_AIS_QUERY,
+    FORM_CHAIN_QUERY,
+    NODE_EXIST_QUERY,
+    DbConnection,
+)
+
+
+class SlowClient(ScriptedClient):
+    """ScriptedClient whose asynchronous queries take some time in a pool of threads, counting the queries in flight"""
+
+    def __init__(self, duration: float) -> None:
+        super().__init__()
+        self.duration = duration
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=16)
+
+    def _slow_submit(self, template: str, bindings: dict):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.duration)
+        with self._lock:
+            self.in_flight -= 1
+        return self.submit(template, bindings)
+
+    def submit_async(self, template: str, bindings=None):
+        return self._pool.submit(self._slow_submit, template, bindings)
+
+    def close(self) -> None:
+        self._pool.shutdown()
+
+
+@pytest.fixture
+def slow_client(monkeypatch):
+    from ai_sustainability.package_data_access import db_connection
+
+    gremlin_client = SlowClient(duration=0.05)
+    monkeypatch.setenv("DATABASENAME", "tests")
+    monkeypatch.setenv("PRIMARYKEY", "tests")
+    monkeypatch.setattr(db_connection, "connect", lambda **_: gremlin_client)
+    yield gremlin_client
+    gremlin_client.close()
+
+
+@pytest.fixture
+def async_database(slow_client, question_graph) -> AsyncDbConnection:
+    return AsyncDbConnection(DbConnection(question_graph=question_graph), max_in_flight=2)
+
+
+def test_queries_in_flight_are_limited(slow_client, async_database):
+    slow_client.answer = lambda template, bindings: [{"id": bindings["node_id"]}] if bindings["node_id"] != "b" else []
+    exist = asyncio.run(async_database.check_nodes_exist(["a", "b", "c", "d", "e", "f"]))
+    assert exist == [True, False, True, True, True, True]
+    assert slow_client.max_in_flight == 2
+    assert [template for template, _ in slow_client.submitted] == [NODE_EXIST_QUERY] * 6
+
+
+def test_form_and_best_ais_are_read_concurrently(slow_client, async_database):
+    def answer(template: str, _: dict) -> list:
+        return list(reversed(CHAIN)) if template == FORM_CHAIN_QUERY else ["AI3, AI1"]
+
+    async def read_form_and_best_ais():
+        return await asyncio.gather(
+            async_database.retrieve_previous_form(Username("user"), "form"),
+            async_database.get_best_ais(Username("user"), "form"),
+        )
+
+    slow_client.answer = answer
+    form, best_ais = asyncio.run(read_form_and_best_ais())
+    assert [question.question_id for question in form.question_list] == ["1", "2", "3", "4"]
+    assert best_ais == ["AI3", "AI1"]
+    assert slow_client.max_in_flight == 2
+    assert {template for template, _ in slow_client.submitted} == {FORM_CHAIN_QUERY, BEST_AIS_QUERY}
+
+
+def test_semaphore_of_a_closed_event_loop_is_not_reused(slow_client, async_database):
+    slow_client.answer = lambda template, bindings: []
+    assert asyncio.run(async_database.check_nodes_exist(["a"])) == [False]
+    assert asyncio.run(async_database.check_nodes_exist(["a", "b"])) == [False, False]
+
+
+def test_sessions_running_their_own_event_loop_at_once(slow_client, async_database):
+    slow_client.answer = lambda template, bindings: [{"id": bindings["node_id"]}]
+    barrier = threading.Barrier(2)
+    results: dict[str, list[bool]] = {}
+
+    def session(name: str) -> None:
+        barrier.wait()
+        results[name] = asyncio.run(async_database.check_nodes_exist([f"{name}{index}" for index in range(6)]))
+
+    threads = [threading.Thread(target=session, args=(name,)) for name in ("alice", "bob")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {"alice": [True] * 6, "bob": [True] * 6}
+    assert slow_client.max_in_flight <= 2 * async_database.max_in_flight
+
+
+def test_question_graph_is_not_resolved_in_the_event_loop(slow_client, async_database, monkeypatch):
+    get_question_graph = async_database.database.get_question_graph
+    threads_id = []
+
+    def resolve_question_graph():
+        threads_id.append(threading.get_ident())
+        return get_question_graph()
+
+    async def retrieve_form():
+        return threading.get_ident(), await async_database.retrieve_previous_form(Username("user"), "form")
+
+    monkeypatch.setattr(async_database.database, "get_question_graph", resolve_question_graph)
+    slow_client.answer = lambda template, bindings: list(reversed(CHAIN))
+    loop_thread_id, form = asyncio.run(retrieve_form())
+    assert [question.question_id for question in form.question_list] == ["1", "2", "3", "4"]
+    assert threads_id and loop_thread_id not in threads_id
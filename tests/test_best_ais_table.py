@@ -0,0 +1,62 @@
+"""
+Tests of the BestAisTable : the best AIs of a Form found with a lookup are the ones computed from its answers
+"""
+import itertools
+
+import pytest
+from conftest import LIST_AI, fill_form
+
+from ai_sustainability.package_data_access.best_ais_table import BestAisTable
+
+
+def assert_same_best_ais(best_ais, expected_best_ais) -> None:
+    assert [name for name, _ in best_ais] == [name for name, _ in expected_best_ais]
+    assert [score for _, score in best_ais] == pytest.approx([score for _, score in expected_best_ais])
+
+
+QRM_CHOICES = [list(choice) for size in (1, 2, 3) for choice in itertools.combinations(["A", "B", "C"], size)]
+
+
+@pytest.fixture
+def table(question_graph) -> BestAisTable:
+    return BestAisTable.build(question_graph, LIST_AI, 2)
+
+
+@pytest.mark.parametrize("qcm_choice", ["Yes", "No"])
+@pytest.mark.parametrize("qrm_choice", QRM_CHOICES)
+def test_lookup_gives_the_best_ais_of_the_answers(table, in_memory_db, qcm_choice, qrm_choice):
+    form = fill_form(in_memory_db, "form", [["Q_Next"], [qcm_choice], qrm_choice])
+    assert_same_best_ais(table.lookup(form), form.calcul_best_ais(2, LIST_AI))
+
+
+def test_table_has_one_path_by_single_choice_signature(table):
+    assert not table.best_ais
+    assert set(table.qrm_paths) == {("1-2-1", "2-3-1"), ("1-2-1", "2-3-2")}
+    assert set(table.qrm_factors["3"]) == {"3-4-1", "3-4-2", "3-4-3"}
+
+
+def test_unknown_path_is_not_found(table, in_memory_db):
+    form = fill_form(in_memory_db, "form", [["Q_Next"], ["Yes"], ["A"]])
+    form.question_list[1].choosen_answers = [in_memory_db.get_question_graph().answers["2-3-2"]]
+    table.qrm_paths.pop(("1-2-1", "2-3-2"))
+    assert table.lookup(form) is None
+
+
+def test_json_round_trip(table, in_memory_db, tmp_path):
+    path = str(tmp_path / "best_ais_table.json")
+    table.save(path)
+    loaded = BestAisTable.from_json_file(path)
+    assert (loaded.list_ai, loaded.nb_ai, loaded.version) == (table.list_ai, table.nb_ai, table.version)
+    form = fill_form(in_memory_db, "form", [["Q_Next"], ["No"], ["B", "C"]])
+    assert_same_best_ais(loaded.lookup(form), table.lookup(form))
+
+
+def test_best_ais_of_the_paths_without_qrm_are_read_back_as_tuples(tmp_path):
+    path = str(tmp_path / "best_ais_table.json")
+    BestAisTable(LIST_AI, 2, {("1-2-1", "2-3-1"): [("AI1", 1.0), ("AI2", 0.5)]}, {}, {}, "v1").save(path)
+    assert BestAisTable.from_json_file(path).best_ais == {("1-2-1", "2-3-1"): [("AI1", 1.0), ("AI2", 0.5)]}
+
+
+def test_no_path_can_have_an_empty_list_of_best_ais(table):
+    # AI1 has no zero coefficient, so every Form has at least one best AI
+    assert not table.possibly_empty_paths()
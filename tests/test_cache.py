@@ -0,0 +1,79 @@
+"""
+Tests of the TTLCache of the Application (time to live, invalidation and bounded size)
+"""
+from ai_sustainability.package_application.cache import TTLCache
+
+
+class Clock:
+    """Clock of a TTLCache moved by hand"""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_value_is_loaded_once_until_it_expires():
+    clock = Clock()
+    cache = TTLCache({"all_ais": 10.0}, clock=clock)
+    loads = []
+    loader = lambda: loads.append(1) or len(loads)  # noqa: E731
+    assert cache.get(("all_ais",), loader) == 1
+    clock.now = 9.0
+    assert cache.get(("all_ais",), loader) == 1
+    clock.now = 10.0
+    assert cache.get(("all_ais",), loader) == 2
+    assert (cache.stats["all_ais"].nb_hits, cache.stats["all_ais"].nb_misses) == (1, 2)
+
+
+def test_peek_does_not_load_nor_count():
+    cache = TTLCache(clock=Clock())
+    assert cache.peek(("all_ais",)) is None
+    cache.get(("all_ais",), lambda: ["AI1"])
+    assert cache.peek(("all_ais",)) == ["AI1"]
+    assert cache.stats["all_ais"].nb_misses == 1
+
+
+def test_invalidate_a_key_or_a_whole_lookup():
+    cache = TTLCache(clock=Clock())
+    for username in ("alice", "bob"):
+        cache.get(("forms_names", username), lambda username=username: [username])
+    cache.get(("all_ais",), lambda: [])
+    cache.invalidate(("forms_names", "alice"))
+    assert cache.peek(("forms_names", "alice")) is None and cache.peek(("forms_names", "bob")) == ["bob"]
+    cache.invalidate(("forms_names",))
+    assert cache.peek(("forms_names", "bob")) is None and cache.peek(("all_ais",)) == []
+    assert cache.stats["forms_names"].nb_invalidations == 2
+
+
+def test_expired_entries_are_purged_when_the_cache_is_full():
+    clock = Clock()
+    cache = TTLCache({"short": 1.0}, default_ttl=100.0, clock=clock, max_size=3)
+    cache.get(("short", 1), lambda: 1)
+    cache.get(("long", 1), lambda: 1)
+    cache.get(("long", 2), lambda: 2)
+    clock.now = 2.0
+    cache.get(("long", 3), lambda: 3)
+    assert [cache.peek(("long", index)) for index in (1, 2, 3)] == [1, 2, 3]
+    assert len(cache._entries) == 3  # pylint: disable=protected-access
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(clock=Clock(), max_size=2)
+    cache.get(("forms_names", "alice"), lambda: ["a"])
+    cache.get(("forms_names", "bob"), lambda: ["b"])
+    cache.get(("forms_names", "alice"), lambda: ["reloaded"])
+    cache.get(("forms_names", "carol"), lambda: ["c"])
+    assert cache.peek(("forms_names", "bob")) is None
+    assert cache.peek(("forms_names", "alice")) == ["a"]
+
+
+def test_stats_are_copies():
+    cache = TTLCache(clock=Clock())
+    cache.get(("all_ais",), lambda: ["AI1"])
+    stats = cache.stats
+    stats["all_ais"].nb_misses = 10
+    stats["forms_names"] = stats["all_ais"]
+    cache.get(("forms_names", "alice"), lambda: [])
+    assert cache.stats["all_ais"].nb_misses == 1 and cache.stats["forms_names"].nb_misses == 1
@@ -0,0 +1,55 @@
+"""
+Tests of the two formats of the list_coef property (text and compact) and of their comparison
+"""
+import numpy as np
+import pytest
+
+from ai_sustainability.package_data_access.coef_codec import (
+    COMPACT_TAG,
+    decode_coefs,
+    decode_coefs_matrix,
+    encode_coefs,
+    is_compact,
+    same_coefs,
+)
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_round_trip(compact):
+    coefs = np.array([1.0, 0.5, 0.0, 0.1], dtype=np.float32)
+    value = encode_coefs(coefs, compact)
+    assert is_compact(value) == compact
+    np.testing.assert_array_equal(decode_coefs(value).astype(np.float32), coefs)
+
+
+def test_text_format_keeps_the_shortest_text_of_each_coefficient():
+    assert encode_coefs([1.0, 0.5, 0.0], compact=False) == "1.0, 0.5, 0.0"
+    assert encode_coefs(np.array([0.1, 0.25], dtype=np.float32), compact=False) == "0.1, 0.25"
+
+
+def test_compact_format_is_tagged_base64():
+    assert encode_coefs([1.0, 0.5, 0.0], compact=True) == COMPACT_TAG + "AACAPwAAAD8AAAAA"
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_no_coefficient_is_an_empty_string(compact):
+    assert encode_coefs([], compact) == ""
+    assert decode_coefs("").size == 0
+
+
+def test_unknown_compact_version_raises():
+    with pytest.raises(ValueError):
+        decode_coefs("f32le-b64:2:AACAPw==")
+
+
+def test_matrix_of_both_formats():
+    values = ["1.0, 0.5", encode_coefs([0.25, 1.0], compact=True), encode_coefs([0.0, 2.0], compact=True)]
+    np.testing.assert_array_equal(decode_coefs_matrix(values, 2), [[1.0, 0.5], [0.25, 1.0], [0.0, 2.0]])
+
+
+def test_same_coefficients_in_any_format():
+    assert same_coefs("0.1, 1.0", encode_coefs([0.1, 1.0], compact=True))
+    assert same_coefs("0.1, 1.0", "0.10000000001, 1")
+    assert not same_coefs("0.1, 1.0", "0.1, 0.99")
+    assert not same_coefs("0.1, 1.0", "0.1, 1.0, 0.0")
+    assert same_coefs("", "")
@@ -0,0 +1,90 @@
+"""
+Tests of the coefficients of a snapshot loaded without them (the live question graph) : one query fills the shared
+coefficient matrix, used to score and to save the Forms
+"""
+import numpy as np
+import pytest
+from conftest import COEFFICIENTS, fill_form, small_graph_elements
+
+from ai_sustainability.package_data_access.coef_codec import encode_coefs
+from ai_sustainability.package_data_access.consistency import WriteConfirmation
+from ai_sustainability.package_data_access.db_connection import (
+    NODE_EXIST_QUERY,
+    DbConnection,
+)
+from ai_sustainability.package_data_access.question_graph import QuestionGraph
+
+
+def coefficients_rows(template: str, bindings: dict) -> list:
+    """Answer the query of DbConnection.load_coefficients (and confirm the writes)"""
+    if "project('id', 'list_coef')" in template:
+        return [{"id": edge_id, "list_coef": encode_coefs(list_coef)} for edge_id, list_coef in COEFFICIENTS.items()]
+    return [] if template == NODE_EXIST_QUERY else [{"id": "created"}]
+
+
+@pytest.fixture
+def database(scripted_client) -> DbConnection:
+    vertices, edges = small_graph_elements()
+    for edge in edges:
+        edge["properties"].pop("list_coef", None)
+    database = DbConnection(question_graph=QuestionGraph.from_graphson(vertices, edges, "v1"))
+    database.consistency = WriteConfirmation(max_retries=2, base_delay=0.0)
+    scripted_client.answer = coefficients_rows
+    return database
+
+
+def test_coefficients_are_loaded_once_in_the_snapshot(scripted_client, database):
+    question_graph = database.get_question_graph()
+    assert not question_graph.has_coefficients
+    first = database.get_coefficients(["1-2-1", "2-3-1", "unknown"])
+    second = database.get_coefficients(["3-4-2"])
+    assert len(scripted_client.submitted) == 1
+    assert set(first) == {"1-2-1", "2-3-1"} and len(first["1-2-1"]) == 0
+    np.testing.assert_allclose(first["2-3-1"], COEFFICIENTS["2-3-1"])
+    np.testing.assert_allclose(second["3-4-2"], COEFFICIENTS["3-4-2"])
+    assert question_graph.coefficients.shape == (len(COEFFICIENTS), 3)
+    assert question_graph.coefficients.dtype == np.float32
+    assert np.shares_memory(second["3-4-2"], question_graph.coefficients)
+
+
+def test_snapshot_with_coefficients_does_not_query(scripted_client, question_graph):
+    database = DbConnection(question_graph=question_graph)
+    assert question_graph.has_coefficients
+    np.testing.assert_allclose(database.get_coefficients(["3-4-3"])["3-4-3"], COEFFICIENTS["3-4-3"])
+    assert not scripted_client.submitted
+
+
+def test_saved_answer_edges_keep_the_loaded_coefficients(scripted_client, database):
+    form = fill_form(database, "form", [["Q_Next"], ["No"], ["B"]])
+    database.save_answers(form, [])
+    edges_bindings = next(bindings for template, bindings in scripted_client.submitted if ".addE(" in template)
+    list_coefs = {
+        edges_bindings[f"proposition_id{index}"]: edges_bindings[f"list_coef{index}"]
+        for index in range(3)
+        if f"proposition_id{index}" in edges_bindings
+    }
+    assert list_coefs["2-3-2"] == encode_coefs(np.array(COEFFICIENTS["2-3-2"], dtype=np.float32))
+    assert list_coefs["3-4-2"] == encode_coefs(np.array(COEFFICIENTS["3-4-2"], dtype=np.float32))
+
+
+def test_new_snapshot_during_a_save_keeps_the_loaded_coefficients(scripted_client, database, monkeypatch):
+    form = fill_form(database, "form", [["Q_Next"], ["No"], ["B"]])
+    vertices, edges = small_graph_elements()
+    for edge in edges:
+        edge["properties"].pop("list_coef", None)
+    new_question_graph = QuestionGraph.from_graphson(vertices, edges, "v2")
+
+    def reimported_graph(username, form_name) -> bool:
+        # The graph is re-imported after the coefficients of the Form are read, before its edges are written
+        database._question_graph = new_question_graph  # pylint: disable=protected-access
+        return False
+
+    monkeypatch.setattr(database, "check_form_exist", reimported_graph)
+    database.save_answers(form, [])
+    edges_bindings = next(bindings for template, bindings in scripted_client.submitted if ".addE(" in template)
+    assert all(
+        edges_bindings[f"list_coef{index}"]
+        for index in range(3)
+        if edges_bindings.get(f"proposition_id{index}") != "1-2-1"
+    )
+    assert "2-3-2" in edges_bindings.values() and "3-4-2" in edges_bindings.values()
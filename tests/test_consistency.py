@@ -0,0 +1,64 @@
+"""
+Tests of the write confirmation (WriteConfirmation) and of its use by DbConnection
+"""
+import pytest
+
+from ai_sustainability.package_business.models import Username
+from ai_sustainability.package_data_access.consistency import WriteConfirmation
+from ai_sustainability.package_data_access.db_connection import DbConnection
+
+
+def writes_visible_after(nb_tries: int):
+    """A write returning nothing (not visible yet) for its nb_tries - 1 first tries"""
+    calls = []
+
+    def write() -> list:
+        calls.append(None)
+        return [{"id": "written"}] if len(calls) >= nb_tries else []
+
+    return write, calls
+
+
+def test_visible_write_is_not_retried():
+    confirmation = WriteConfirmation(base_delay=0.0)
+    write, calls = writes_visible_after(1)
+    assert confirmation.run_confirmed(write)
+    assert len(calls) == 1
+    assert (confirmation.stats.nb_confirmed_first_try, confirmation.stats.nb_retries) == (1, 0)
+
+
+def test_write_is_retried_until_visible():
+    confirmation = WriteConfirmation(max_retries=5, base_delay=0.0)
+    write, calls = writes_visible_after(3)
+    assert confirmation.run_confirmed(write)
+    assert len(calls) == 3
+    stats = confirmation.stats
+    assert (stats.nb_writes, stats.nb_retried_writes, stats.nb_retries, stats.nb_failures) == (1, 1, 2, 0)
+
+
+def test_write_never_visible_is_counted_as_failure():
+    confirmation = WriteConfirmation(max_retries=2, base_delay=0.0)
+    write, calls = writes_visible_after(10)
+    assert not confirmation.run_confirmed(write)
+    assert len(calls) == 3
+    assert confirmation.stats.nb_failures == 1
+    assert confirmation.stats.retry_rate == 1.0
+
+
+def test_delays_are_bounded():
+    assert WriteConfirmation(max_retries=4, base_delay=0.1, max_delay=0.3).delays() == [0.1, 0.2, 0.3, 0.3]
+
+
+def test_stats_are_a_copy():
+    confirmation = WriteConfirmation()
+    confirmation.stats.nb_writes = 10
+    assert confirmation.stats.nb_writes == 0
+
+
+def test_unconfirmed_write_raises(scripted_client, question_graph):
+    database = DbConnection(question_graph=question_graph)
+    database.consistency = WriteConfirmation(max_retries=1, base_delay=0.0)
+    with pytest.raises(RuntimeError):
+        database.create_feedback_node(Username("user"))
+    assert len(scripted_client.submitted) == 2
+    assert database.get_consistency_stats().nb_failures == 1
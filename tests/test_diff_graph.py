@@ -0,0 +1,74 @@
+"""
+Tests of diff_graph, the queries of DbGestion.sync_graph making the question graph of the database equal to a local one
+"""
+import copy
+
+import numpy as np
+import pytest
+from conftest import COEFFICIENTS, small_graph_elements
+
+from ai_sustainability.package_data_access.coef_codec import encode_coefs
+from ai_sustainability.package_data_access.db_gestion import diff_graph, graph_element
+
+
+@pytest.fixture
+def graph() -> tuple[dict[str, dict], dict[str, dict]]:
+    vertices, edges = small_graph_elements()
+    return (
+        {vertex["id"]: graph_element(vertex) for vertex in vertices},
+        {edge["id"]: graph_element(edge) for edge in edges},
+    )
+
+
+def all_queries(diff) -> list[dict]:
+    return diff.drop_queries + diff.vertex_queries + diff.edge_queries
+
+
+def test_same_graph_has_no_query(graph):
+    assert not all_queries(diff_graph(graph, copy.deepcopy(graph)))
+
+
+def test_coefficients_in_another_format_are_not_written(graph):
+    live = copy.deepcopy(graph)
+    for edge_id, list_coef in COEFFICIENTS.items():
+        live[1][edge_id]["properties"]["list_coef"] = encode_coefs(np.array(list_coef, dtype=np.float32), compact=True)
+    live[1]["3-4-3"]["properties"]["list_coef"] = "1.0000000001, 0.25, 1.0"
+    assert not all_queries(diff_graph(graph, live))
+
+
+def test_changed_coefficient_is_one_edge_query(graph):
+    local = copy.deepcopy(graph)
+    local[1]["2-3-1"]["properties"]["list_coef"] = "1.0, 0.5, 0.25"
+    diff = diff_graph(local, graph)
+    assert not diff.drop_queries and not diff.vertex_queries
+    assert [query["bindings"] for query in diff.edge_queries] == [{"element_id": "2-3-1", "value0": "1.0, 0.5, 0.25"}]
+    assert diff.edge_queries[0]["query"] == "g.E(element_id).property('list_coef', value0)"
+
+
+def test_vertex_properties_are_replaced(graph):
+    local = copy.deepcopy(graph)
+    local[0]["2"]["properties"]["text"] = "Are the data encrypted ?"
+    del local[0]["3"]["properties"]["text"]
+    queries = diff_graph(local, graph).vertex_queries
+    assert queries[0]["query"] == "g.V(element_id).property(single, 'text', value0)"
+    assert queries[1]["query"] == "g.V(element_id).properties('text').drop()"
+
+
+def test_element_whose_ends_changed_is_dropped_and_created_again(graph):
+    local = copy.deepcopy(graph)
+    local[1]["2-3-2"]["inV"] = "4"
+    diff = diff_graph(local, graph)
+    assert diff.drop_queries == [{"query": "g.E(edge_id).drop()", "bindings": {"edge_id": "2-3-2"}}]
+    assert [query["bindings"]["in_id"] for query in diff.edge_queries] == ["4"]
+
+
+def test_dropped_vertex_drops_its_edges_and_missing_elements_are_created(graph):
+    local = copy.deepcopy(graph)
+    del local[0]["4"]
+    for edge_id in ("3-4-1", "3-4-2", "3-4-3"):
+        del local[1][edge_id]
+    local[0]["5"] = {"label": "end", "properties": {"text": "end", "partitionKey": "Questions"}}
+    diff = diff_graph(local, graph)
+    assert diff.drop_queries == [{"query": "g.V(vertex_id).drop()", "bindings": {"vertex_id": "4"}}]
+    assert [query["bindings"]["vertex_id"] for query in diff.vertex_queries] == ["5"]
+    assert not diff.edge_queries
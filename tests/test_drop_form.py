@@ -0,0 +1,38 @@
+"""
+Tests of DbConnection.drop_form : the whole answer chain of a Form removed with a single traversal
+"""
+import pytest
+
+from ai_sustainability.package_business.models import Form, Username
+from ai_sustainability.package_data_access.db_connection import (
+    DROP_FORM_QUERY,
+    DbConnection,
+)
+
+
+@pytest.fixture
+def updated_counters() -> list[dict[str, int]]:
+    """The deltas given to update_answer_counters"""
+    return []
+
+
+@pytest.fixture
+def database(scripted_client, question_graph, updated_counters, monkeypatch) -> DbConnection:
+    database = DbConnection(question_graph=question_graph)
+    monkeypatch.setattr(database, "update_answer_counters", updated_counters.append)
+    return database
+
+
+def test_form_is_dropped_with_one_traversal(scripted_client, database, updated_counters):
+    scripted_client.answer = lambda template, bindings: [
+        {"propositions": ["1-2-1", "2-3-2", "3-4-1", "3-4-3"], "nb_nodes": 4}
+    ]
+    assert database.drop_form(Form(username=Username("user"), form_name="form")) == 4
+    assert scripted_client.submitted == [(DROP_FORM_QUERY, {"node_id": "user-answer1-form"})]
+    assert updated_counters == [{"1-2-1": -1, "2-3-2": -1, "3-4-1": -1, "3-4-3": -1}]
+
+
+def test_missing_form_changes_no_counter(scripted_client, database, updated_counters):
+    assert database.drop_form(Form(username=Username("user"), form_name="unknown")) == 0
+    assert len(scripted_client.submitted) == 1
+    assert not updated_counters
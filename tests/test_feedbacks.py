@@ -0,0 +1,49 @@
+"""
+Tests of the feedbacks of the admin view : all feedbacks grouped by user with one traversal, page by page
+"""
+import pytest
+from conftest import fill_form
+
+from ai_sustainability.package_business.models import UserFeedback, Username
+from ai_sustainability.package_data_access.db_connection import DbConnection
+
+USERS_FEEDBACKS = [
+    {"user": "alice", "feedbacks": ["Nice", "Too long"]},
+    {"user": "bob", "feedbacks": []},
+    {"user": "carol", "feedbacks": ["Clear"]},
+]
+
+
+@pytest.fixture
+def database(scripted_client, question_graph) -> DbConnection:
+    scripted_client.answer = lambda template, bindings: USERS_FEEDBACKS[bindings.get("low", 0) : bindings.get("high")]
+    return DbConnection(question_graph=question_graph)
+
+
+def test_all_feedbacks_are_read_with_one_traversal(scripted_client, database):
+    assert database.get_all_feedbacks() == [
+        UserFeedback(Username(user_feedbacks["user"]), user_feedbacks["feedbacks"])
+        for user_feedbacks in USERS_FEEDBACKS
+    ]
+    assert len(scripted_client.submitted) == 1
+    assert ".project('user', 'feedbacks')" in scripted_client.submitted[0][0]
+
+
+def test_page_is_a_range_of_the_users_ordered_by_username(scripted_client, database):
+    assert [user_feedbacks.user for user_feedbacks in database.get_feedbacks_page(1, 2)] == ["bob", "carol"]
+    template, bindings = scripted_client.submitted[0]
+    assert "order().by(id).range(low, high)" in template
+    assert bindings == {"low": 1, "high": 3}
+
+
+def test_in_memory_pages_of_feedbacks(in_memory_db):
+    for username in ("carol", "alice", "bob"):
+        in_memory_db.save_answers(fill_form(in_memory_db, "form", [["Q_Next"], ["No"], ["A"]], username), [])
+    in_memory_db.save_feedback(Username("alice"), "Nice")
+    in_memory_db.save_feedback(Username("carol"), "Clear")
+    assert in_memory_db.get_nb_users() == 3
+    assert in_memory_db.get_feedbacks_page(0, 2) == [
+        UserFeedback(Username("alice"), ["Nice"]),
+        UserFeedback(Username("bob"), []),
+    ]
+    assert in_memory_db.get_feedbacks_page(2, 2) == [UserFeedback(Username("carol"), ["Clear"])]
@@ -0,0 +1,63 @@
+"""
+Tests of the retrieval of a saved Form with one traversal (order_form_chain, build_form_from_chain)
+"""
+import pytest
+
+from ai_sustainability.package_business.models import Username
+from ai_sustainability.package_data_access.db_connection import (
+    FORM_CHAIN_QUERY,
+    DbConnection,
+    order_form_chain,
+)
+
+
+def chain_node(question_id: str, label: str, answers: list[tuple[str, str]], next_id: str, mlflow_id: str = "") -> dict:
+    """A node returned by FORM_CHAIN_QUERY for the Form "form" of "user", answers are (proposition id, text)"""
+    return {
+        "id": f"user-answer{question_id}-form",
+        "label": label,
+        "question_id": question_id,
+        "mlflow_id": mlflow_id,
+        "answers": [
+            {"proposition_id": proposition_id, "answer": text, "metric": "", "list_coef": "", "next": next_id}
+            for proposition_id, text in answers
+        ],
+    }
+
+
+CHAIN = [
+    chain_node("1", "Answer", [("1-2-1", "A problem to solve")], "user-answer2-form", mlflow_id="42"),
+    chain_node("2", "Answer", [("2-3-2", "No")], "user-answer3-form"),
+    chain_node("3", "Answer", [("3-4-1", "A"), ("3-4-3", "C")], "user-answer4-form"),
+    chain_node("4", "end", [], ""),
+]
+
+
+def test_chain_is_ordered_from_the_first_node():
+    ordered = order_form_chain("user-answer1-form", [CHAIN[2], CHAIN[3], CHAIN[0], CHAIN[1]])
+    assert [node["question_id"] for node in ordered] == ["1", "2", "3", "4"]
+
+
+def test_missing_node_ends_the_chain():
+    assert [node["question_id"] for node in order_form_chain("user-answer1-form", [CHAIN[0], CHAIN[2]])] == ["1"]
+
+
+def test_form_is_retrieved_with_one_query(scripted_client, question_graph):
+    scripted_client.answer = lambda template, bindings: list(reversed(CHAIN)) if template == FORM_CHAIN_QUERY else []
+    form = DbConnection(question_graph=question_graph).retrieve_previous_form(Username("user"), "form")
+    assert len(scripted_client.submitted) == 1
+    assert form.already_completed and form.experiment_id == "42"
+    assert [question.question_id for question in form.question_list] == ["1", "2", "3", "4"]
+    assert [[answer.text for answer in question.choosen_answers] for question in form.question_list[:3]] == [
+        ["A problem to solve"],
+        ["No"],
+        ["A", "C"],
+    ]
+    # The answers of the snapshot are shared, with their coefficients
+    assert form.question_list[2].choosen_answers[0] is question_graph.answers["3-4-1"]
+    assert len(form.question_list[1].choosen_answers[0].list_coef) == 3
+
+
+def test_unknown_form_raises(scripted_client, question_graph):
+    with pytest.raises(ValueError):
+        DbConnection(question_graph=question_graph).retrieve_previous_form(Username("user"), "unknown")
@@ -0,0 +1,82 @@
+"""
+Tests of DbGestion.import_graph : the retries of the throttled queries and the checkpoint of an interrupted import
+"""
+import hashlib
+import json
+
+import pytest
+from gremlin_python.driver.protocol import GremlinServerError
+
+from ai_sustainability.package_data_access.db_gestion import DbGestion, ImportCheckpoint
+
+SCRIPT = [
+    "g.addV('Q_Open').property('id', '1')",
+    {"query": "g.addV('end').property('id', id)", "bindings": {"id": "2"}},
+    "g.V('1').addE('Q_Next').to(g.V('2'))",
+]
+
+
+def cosmos_error(status_code: int) -> GremlinServerError:
+    attributes = {"x-ms-status-code": status_code, "x-ms-retry-after-ms": 0}
+    return GremlinServerError({"code": 500, "message": f"status {status_code}", "attributes": attributes})
+
+
+@pytest.fixture
+def script_path(tmp_path) -> str:
+    path = tmp_path / "script.json"
+    path.write_text(json.dumps(SCRIPT), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def database(scripted_client) -> DbGestion:
+    return DbGestion("endpoint", "database", "container", "key")
+
+
+def imported_templates(scripted_client) -> list[str]:
+    return [template for template, _ in scripted_client.submitted if "graph_version" not in template]
+
+
+def test_vertices_are_imported_before_the_edges_and_throttled_queries_are_retried(
+    scripted_client, database, script_path
+):
+    nb_throttled = [2]
+
+    def answer(template: str, bindings: dict) -> list:
+        if template.startswith("g.V('1').addE") and nb_throttled[0]:
+            nb_throttled[0] -= 1
+            raise cosmos_error(429)
+        return []
+
+    scripted_client.answer = answer
+    stats = database.import_graph(script_path, max_in_flight=1)
+    assert (stats.nb_sent, stats.nb_retries) == (3, 2)
+    assert imported_templates(scripted_client)[-1].startswith("g.V('1').addE")
+    assert all(template.startswith("g.addV") for template in imported_templates(scripted_client)[:2])
+
+
+def test_interrupted_import_resumes_from_its_checkpoint(scripted_client, database, script_path):
+    def answer(template: str, bindings: dict) -> list:
+        if ".addE(" in template:
+            raise cosmos_error(400)
+        return []
+
+    scripted_client.answer = answer
+    with pytest.raises(GremlinServerError):
+        database.import_graph(script_path, max_in_flight=1)
+    scripted_client.submitted.clear()
+    scripted_client.answer = lambda template, bindings: []
+    stats = database.import_graph(script_path, max_in_flight=1)
+    assert stats.nb_sent == 1
+    assert imported_templates(scripted_client) == [SCRIPT[2]]
+
+
+def test_checkpoint_of_another_script_content_is_ignored(tmp_path, script_path):
+    checkpoint_path = str(tmp_path / "script.json.checkpoint")
+    sha256 = hashlib.sha256(b"content").hexdigest()
+    checkpoint = ImportCheckpoint(checkpoint_path, script_path, 3, sha256)
+    checkpoint.done = {0, 1}
+    checkpoint.save()
+    assert ImportCheckpoint.load(checkpoint_path, script_path, 3, sha256).done == {0, 1}
+    assert not ImportCheckpoint.load(checkpoint_path, script_path, 3, hashlib.sha256(b"changed").hexdigest()).done
+    assert not ImportCheckpoint.load(checkpoint_path, script_path, 4, sha256).done
@@ -0,0 +1,78 @@
+"""
+Tests of the InMemoryDbConnection : the Forms saved in memory are retrieved and dropped like in the database, and each
+operation costs the simulated queries of DbConnection
+"""
+import random
+
+import pytest
+from conftest import LIST_AI, fill_form
+
+from ai_sustainability.package_business.models import Username
+from ai_sustainability.package_data_access.in_memory_db_connection import (
+    InMemoryDbConnection,
+    fill_random_form,
+)
+
+
+def choosen_answers(form) -> list[list[str]]:
+    return [[answer.answer_id for answer in question.choosen_answers] for question in form.question_list[:-1]]
+
+
+def test_saved_form_is_retrieved(in_memory_db):
+    form = fill_form(in_memory_db, "form", [["Q_Next"], ["No"], ["A", "C"]])
+    assert in_memory_db.save_answers(form, form.calcul_best_ais(2, LIST_AI), mlflow_id="42")
+    retrieved = in_memory_db.retrieve_previous_form(Username("user"), "form")
+    assert retrieved.already_completed
+    assert choosen_answers(retrieved) == [["1-2-1"], ["2-3-2"], ["3-4-1", "3-4-3"]]
+    assert in_memory_db.get_best_ais(Username("user"), "form") == ["AI1", "AI3"]
+    assert in_memory_db.get_experiment_id(Username("user"), "form") == ["42"]
+    assert in_memory_db.get_all_forms_names(Username("user")) == ["form"]
+
+
+def test_form_name_can_only_be_saved_once(in_memory_db):
+    assert in_memory_db.save_answers(fill_form(in_memory_db, "form", [["Q_Next"], ["No"], ["A"]]), [])
+    assert not in_memory_db.save_answers(fill_form(in_memory_db, "form", [["Q_Next"], ["Yes"], ["B"]]), [])
+
+
+def test_renamed_form_replaces_the_previous_one(in_memory_db):
+    form = fill_form(in_memory_db, "first", [["Q_Next"], ["No"], ["A"]])
+    in_memory_db.save_answers(form, [])
+    assert in_memory_db.save_answers(form, [], new_form_name="second")
+    assert not in_memory_db.check_form_exist(Username("user"), "first")
+    assert in_memory_db.get_all_forms_names(Username("user")) == ["second"]
+
+
+def test_dropped_form_keeps_the_other_forms(in_memory_db):
+    first_form = fill_form(in_memory_db, "first", [["Q_Next"], ["No"], ["A"]])
+    second_form = fill_form(in_memory_db, "second", [["Q_Next"], ["Yes"], ["B", "C"]])
+    in_memory_db.save_answers(first_form, [])
+    in_memory_db.save_answers(second_form, [])
+    assert in_memory_db.drop_form(first_form) == 4
+    assert in_memory_db.drop_form(first_form) == 0
+    assert in_memory_db.get_all_forms_names(Username("user")) == ["second"]
+    assert choosen_answers(in_memory_db.retrieve_previous_form(Username("user"), "second"))[1:] == [
+        ["2-3-1"],
+        ["3-4-2", "3-4-3"],
+    ]
+    with pytest.raises(ValueError):
+        in_memory_db.retrieve_previous_form(Username("user"), "first")
+
+
+def test_each_query_waits_the_simulated_latency(graph_path):
+    waits: list[float] = []
+    database = InMemoryDbConnection(graph_path, latency=0.02, jitter=0.01, seed=0, sleep=waits.append)
+    database.get_all_ais()
+    database.get_nb_users()
+    assert database.nb_queries == len(waits) == 2
+    assert all(0.01 <= wait <= 0.03 for wait in waits)
+    assert database.simulated_time == pytest.approx(sum(waits))
+    database.reset_stats()
+    assert database.nb_queries == 0 and not database.get_query_metrics().summary()
+
+
+def test_random_forms_reach_the_end(in_memory_db):
+    rng = random.Random(0)
+    for index in range(10):
+        form = fill_random_form(in_memory_db, Username("user"), f"form{index}", rng)
+        assert in_memory_db.save_answers(form, form.calcul_best_ais(2, LIST_AI))
+    assert len(in_memory_db.get_all_best_ais()) == 10
@@ -0,0 +1,48 @@
+"""
+Tests of the dataclasses of the Form (shared immutable Answers, Question, Form)
+"""
+import dataclasses
+
+import numpy as np
+import pytest
+
+from ai_sustainability.package_business.models import Answer, Question
+
+
+def test_answers_are_equal_if_they_are_the_same_proposition():
+    answer = Answer(answer_id="1-2-1", text="Q_Next")
+    open_answer = dataclasses.replace(answer, text="The text of the user")
+    assert answer == open_answer
+    assert hash(answer) == hash(open_answer)
+    assert answer != Answer(answer_id="2-3-1", text="Q_Next")
+
+
+def test_answers_can_be_used_in_sets_and_dicts():
+    answers = [
+        Answer(answer_id="2-3-1", text="Yes"),
+        Answer(answer_id="2-3-1", text="Yes"),
+        Answer(answer_id="2-3-2", text="No"),
+    ]
+    assert len(set(answers)) == 2
+    assert {answer: answer.text for answer in answers}[Answer(answer_id="2-3-2", text="")] == "No"
+
+
+def test_answers_are_immutable(question_graph):
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        question_graph.answers["2-3-1"].text = "Maybe"  # type: ignore[misc]
+
+
+def test_question_refuses_two_answers_with_the_same_text():
+    question = Question(question_id="2", text="Are the data crypted ?", type="Q_QCM_Bool")
+    with pytest.raises(ValueError):
+        question.possible_answers = [Answer(answer_id="2-3-1", text="Yes"), Answer(answer_id="2-3-2", text="Yes")]
+
+
+def test_questions_have_no_dict():
+    assert not hasattr(Question(question_id="2", text="", type="Q_QCM"), "__dict__")
+
+
+def test_answers_of_the_snapshot_share_one_coefficient_matrix(question_graph):
+    list_coef = question_graph.answers["3-4-2"].list_coef
+    assert np.shares_memory(list_coef, question_graph.coefficients)
+    assert list(list_coef) == [0.5, 0.5, 1.0]
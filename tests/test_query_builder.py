@@ -0,0 +1,56 @@
+"""
+Tests of the QueryBuilder : the queries are submitted as fixed script templates with bindings, and the reuse of each
+template is counted
+"""
+import asyncio
+
+import pytest
+from conftest import ScriptedClient
+
+from ai_sustainability.package_business.models import Username
+from ai_sustainability.package_data_access.db_connection import (
+    NODE_EXIST_QUERY,
+    DbConnection,
+)
+from ai_sustainability.package_data_access.query_builder import QueryBuilder, bind_list
+
+
+@pytest.fixture
+def query_builder() -> QueryBuilder:
+    gremlin_client = ScriptedClient()
+    gremlin_client.answer = lambda template, bindings: [bindings["node_id"]]
+    return QueryBuilder(gremlin_client)
+
+
+def test_reused_templates_are_counted(query_builder):
+    for node_id in ("1", "2", "3"):
+        assert query_builder.submit("g.V(node_id)", {"node_id": node_id}) == [node_id]
+    assert asyncio.run(query_builder.submit_async("g.V(node_id).out()", {"node_id": "4"})) == ["4"]
+    assert {template: stats.nb_runs for template, stats in query_builder.templates_stats.items()} == {
+        "g.V(node_id)": 3,
+        "g.V(node_id).out()": 1,
+    }
+    assert query_builder.cache_hit_rate == pytest.approx(2 / 4)
+    assert query_builder.metrics.tags_stats["untagged"].total_charge == pytest.approx(4.0)
+    query_builder.reset_stats()
+    assert not query_builder.templates_stats and query_builder.cache_hit_rate == 0.0
+
+
+def test_bind_list():
+    assert bind_list("label", ["Proposition", "Q_Next"]) == (
+        "label0, label1",
+        {"label0": "Proposition", "label1": "Q_Next"},
+    )
+
+
+def test_user_text_is_only_sent_in_the_bindings(scripted_client, question_graph):
+    def answer(template: str, _: dict) -> list:
+        if template == NODE_EXIST_QUERY:
+            return []
+        return [0] if template.endswith("count()") else [{"id": "created"}]
+
+    scripted_client.answer = answer
+    feedback = "It's \"great\" ')).drop()"
+    DbConnection(question_graph=question_graph).save_feedback(Username("o'brien"), feedback)
+    assert all("o'brien" not in template and feedback not in template for template, _ in scripted_client.submitted)
+    assert any(bindings.get("feedback_text") == feedback for _, bindings in scripted_client.submitted)
@@ -0,0 +1,97 @@
+"""
+Tests of the QueryMetrics and of the QueryBuilder counters, shared by the threads of all streamlit sessions
+"""
+import threading
+
+import pytest
+
+from ai_sustainability.package_data_access.query_builder import QueryBuilder
+from ai_sustainability.package_data_access.query_metrics import (
+    MAX_SESSIONS,
+    QueryMetrics,
+    set_query_session,
+)
+
+NB_THREADS = 8
+NB_QUERIES = 500
+
+
+def run_in_threads(target) -> None:
+    threads = [threading.Thread(target=target, args=(f"session{index}",)) for index in range(NB_THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_concurrent_records_are_all_counted():
+    metrics = QueryMetrics()
+
+    def record_queries(session_id: str) -> None:
+        set_query_session(session_id)
+        for _ in range(NB_QUERIES):
+            metrics.record("save_answers", 0.001, 1, 2.0)
+
+    run_in_threads(record_queries)
+    stats = metrics.tags_stats["save_answers"]
+    assert stats.nb_queries == NB_THREADS * NB_QUERIES
+    assert sum(stats.latency_histogram) == sum(stats.charge_histogram) == NB_THREADS * NB_QUERIES
+    assert stats.total_charge == pytest.approx(2.0 * NB_THREADS * NB_QUERIES)
+    assert metrics.session_tags_stats("session3")["save_answers"].nb_queries == NB_QUERIES
+
+
+def test_concurrent_template_runs_are_all_counted():
+    query_builder = QueryBuilder(gremlin_client=None)
+
+    def run_templates(_: str) -> None:
+        for _ in range(NB_QUERIES):
+            query_builder._record("g.V(vertex_id)", 0.001, 1, 0.0)  # pylint: disable=protected-access
+
+    run_in_threads(run_templates)
+    assert query_builder.templates_stats["g.V(vertex_id)"].nb_runs == NB_THREADS * NB_QUERIES
+
+
+def test_stats_are_copies():
+    metrics = QueryMetrics()
+    metrics.record("get_form", 0.001, 1, 1.0)
+    metrics.tags_stats["get_form"].nb_queries = 10
+    metrics.tags_stats["get_form"].latency_histogram[0] = 10
+    assert metrics.tags_stats["get_form"].nb_queries == 1
+    assert sum(metrics.tags_stats["get_form"].latency_histogram) == 1
+
+
+def test_queries_are_recorded_for_their_session():
+    metrics = QueryMetrics()
+    set_query_session("alice")
+    metrics.record("get_form", 0.001, 1, 1.0)
+    set_query_session("bob")
+    metrics.record("save_answers", 0.001, 1, 5.0)
+    set_query_session(None)
+    metrics.record("save_answers", 0.001, 1, 5.0)
+    assert [row["tag"] for row in metrics.summary("alice")] == ["get_form"]
+    assert [row["tag"] for row in metrics.summary()] == ["save_answers", "get_form"]
+    assert metrics.summary()[0]["nb_queries"] == 2
+    assert '"get_form"' not in metrics.to_json("bob")
+
+
+def test_reset_of_one_session_keeps_the_others():
+    metrics = QueryMetrics()
+    for session_id in ("alice", "bob"):
+        set_query_session(session_id)
+        metrics.record("get_form", 0.001, 1, 1.0)
+    set_query_session(None)
+    metrics.reset("alice")
+    assert not metrics.summary("alice")
+    assert metrics.summary("bob") and metrics.summary()[0]["nb_queries"] == 2
+    metrics.reset()
+    assert not metrics.summary() and not metrics.summary("bob")
+
+
+def test_least_recently_active_sessions_are_removed():
+    metrics = QueryMetrics()
+    for index in range(MAX_SESSIONS + 1):
+        set_query_session(f"session{index}")
+        metrics.record("get_form", 0.001, 1, 1.0)
+    set_query_session(None)
+    assert not metrics.summary("session0")
+    assert metrics.summary(f"session{MAX_SESSIONS}")
@@ -0,0 +1,52 @@
+"""
+Tests of the QuestionGraph snapshot and of the navigation of DbConnection.get_next_question through it
+"""
+import pytest
+from conftest import graphson_edge, small_graph_elements
+
+from ai_sustainability.package_business.models import Form
+from ai_sustainability.package_data_access.db_connection import DbConnection
+from ai_sustainability.package_data_access.question_graph import QuestionGraph
+
+
+def test_first_question_is_the_first_node(question_graph):
+    question = question_graph.get_next_question(None)
+    assert (question.question_id, question.type) == ("1", "Q_Open")
+    assert [answer.text for answer in question.possible_answers] == ["Q_Next"]
+
+
+def test_next_question_follows_the_choosen_answer(question_graph):
+    question = question_graph.get_question("2")
+    question.choosen_answers = [question_graph.answers["2-3-2"]]
+    assert question_graph.get_next_question(question).question_id == "3"
+
+
+def test_next_question_of_a_qrm_does_not_depend_on_the_answers(question_graph):
+    question = question_graph.get_question("3")
+    question.choosen_answers = [question_graph.answers["3-4-2"], question_graph.answers["3-4-3"]]
+    assert question_graph.get_next_question(question).type == "end"
+
+
+def test_questions_share_the_answers_of_the_snapshot(question_graph):
+    assert question_graph.get_question("3").possible_answers is question_graph.get_question("3").possible_answers
+
+
+def test_two_propositions_with_the_same_text_are_refused():
+    vertices, edges = small_graph_elements()
+    edges.append(graphson_edge("2-3-3", "Proposition", "2", "3", text="Yes"))
+    with pytest.raises(ValueError):
+        QuestionGraph.from_graphson(vertices, edges)
+
+
+def test_unknown_answer_text_raises(question_graph):
+    with pytest.raises(ValueError):
+        question_graph.get_next_question_id("2", "Maybe")
+
+
+def test_db_connection_navigates_without_query(scripted_client, question_graph):
+    database = DbConnection(question_graph=question_graph)
+    form = Form()
+    assert database.get_next_question(form, 0).question_id == "1"
+    form.add_answers([question_graph.answers["1-2-1"]], 1)
+    assert database.get_next_question(form, 1).question_id == "2"
+    assert not scripted_client.submitted
@@ -0,0 +1,64 @@
+"""
+Tests of DbGestion.rescore_forms : the best AIs of the stored forms computed again in one batch, and written back in
+a few traversals
+"""
+import pytest
+from conftest import COEFFICIENTS, LIST_AI
+
+from ai_sustainability.package_data_access.coef_codec import encode_coefs
+from ai_sustainability.package_data_access.db_gestion import DbGestion
+
+STORED_FORMS = [
+    {"id": "alice-answer1-first", "best_ais": "AI1, AI2", "propositions": ["1-2-1", "2-3-1", "3-4-1"]},
+    {"id": "bob-answer1-first", "best_ais": "AI1, AI2", "propositions": ["1-2-1", "2-3-2", "3-4-2"]},
+    {"id": "bob-answer1-second", "best_ais": "", "propositions": ["1-2-1", "2-3-2", "3-4-3"]},
+]
+
+
+def stored_graph(template: str, bindings: dict) -> list:
+    if "values('list_AI')" in template:
+        return [", ".join(LIST_AI)]
+    if "project('id', 'list_coef')" in template:
+        return [{"id": edge_id, "list_coef": encode_coefs(list_coef)} for edge_id, list_coef in COEFFICIENTS.items()]
+    if "has(id, gt(cursor))" in template:
+        return [form for form in STORED_FORMS if form["id"] > bindings["cursor"]][: bindings["page_size"]]
+    return [{"id": "written"}]
+
+
+@pytest.fixture
+def database(scripted_client) -> DbGestion:
+    scripted_client.answer = stored_graph
+    return DbGestion("endpoint", "database", "container", "key")
+
+
+def written_best_ais(scripted_client) -> dict[str, str]:
+    written = {}
+    for template, bindings in scripted_client.submitted:
+        if "property(single, 'best_ais'" in template:
+            written.update({bindings[f"n{index}"]: bindings[f"b{index}"] for index in range(template.count(".V("))})
+    return written
+
+
+def test_only_the_changed_forms_are_written_in_one_traversal(scripted_client, database):
+    assert database.rescore_forms(2) == 2
+    assert written_best_ais(scripted_client) == {"bob-answer1-first": "AI3, AI2", "bob-answer1-second": "AI3, AI1"}
+    assert sum("property(single, 'best_ais'" in template for template, _ in scripted_client.submitted) == 1
+
+
+def test_changed_forms_are_written_in_bounded_traversals(scripted_client, database, monkeypatch):
+    monkeypatch.setattr("ai_sustainability.package_data_access.db_gestion.FORMS_PER_TRAVERSAL", 1)
+    database.rescore_forms(2)
+    assert sum("property(single, 'best_ais'" in template for template, _ in scripted_client.submitted) == 2
+    assert len(written_best_ais(scripted_client)) == 2
+
+
+def test_dry_run_writes_nothing(scripted_client, database):
+    assert database.rescore_forms(2, dry_run=True) == 2
+    assert not written_best_ais(scripted_client)
+
+
+def test_forms_are_loaded_after_the_last_id_of_the_previous_page(scripted_client, database, monkeypatch):
+    monkeypatch.setattr("ai_sustainability.package_data_access.db_gestion.FORMS_PER_PAGE", 2)
+    database.rescore_forms(2, dry_run=True)
+    cursors = [bindings["cursor"] for template, bindings in scripted_client.submitted if "cursor" in bindings]
+    assert cursors == ["", "bob-answer1-first"]
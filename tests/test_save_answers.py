@@ -0,0 +1,73 @@
+"""
+Tests of the batched write path of DbConnection.save_answers (the traversals sent and the failure handling)
+"""
+import pytest
+from conftest import fill_form
+
+from ai_sustainability.package_data_access.consistency import WriteConfirmation
+from ai_sustainability.package_data_access.db_connection import (
+    EDGES_PER_TRAVERSAL,
+    NODE_EXIST_QUERY,
+    DbConnection,
+)
+
+
+@pytest.fixture
+def database(scripted_client, question_graph) -> DbConnection:
+    database = DbConnection(question_graph=question_graph)
+    database.consistency = WriteConfirmation(max_retries=2, base_delay=0.0)
+    # Nothing exists yet, and each write returns the element it created
+    scripted_client.answer = lambda template, bindings: [] if template == NODE_EXIST_QUERY else [{"id": "created"}]
+    return database
+
+
+def test_form_is_saved_with_one_nodes_traversal_and_one_edges_traversal(scripted_client, database):
+    form = fill_form(database, "form", [["Q_Next"], ["Yes"], ["A", "C"]])
+    assert database.save_answers_batched(form, [("AI1", 1.0)])
+    templates = [template for template, _ in scripted_client.submitted]
+    assert templates[0] == NODE_EXIST_QUERY
+    assert len(templates) == 3
+    nodes_bindings, edges_bindings = scripted_client.submitted[1][1], scripted_client.submitted[2][1]
+    assert nodes_bindings["best_ais"] == "AI1"
+    assert [edges_bindings[f"proposition_id{index}"] for index in range(4)] == ["1-2-1", "2-3-1", "3-4-1", "3-4-3"]
+
+
+def test_all_nodes_are_found_before_the_first_edge_is_added(scripted_client, database):
+    form = fill_form(database, "form", [["Q_Next"], ["No"], ["A", "B", "C"]])
+    database.save_answers_batched(form, [])
+    edges_template = scripted_client.submitted[2][0]
+    last_lookup = edges_template.rindex(".V(")
+    assert last_lookup < edges_template.index(".addE(")
+    assert edges_template.count(".V(") == 5  # The User and the 4 answer nodes, each one found once
+    assert edges_template.count(".addE(") == 6
+
+
+def test_edges_are_split_in_bounded_traversals(scripted_client, database, monkeypatch):
+    monkeypatch.setattr("ai_sustainability.package_data_access.db_connection.EDGES_PER_TRAVERSAL", 2)
+    form = fill_form(database, "form", [["Q_Next"], ["No"], ["A", "B", "C"]])
+    database.save_answers_batched(form, [])
+    assert [template.count(".addE(") for template, _ in scripted_client.submitted[2:]] == [2, 2, 2]
+    assert EDGES_PER_TRAVERSAL > 2
+
+
+def test_existing_form_is_not_saved_again(scripted_client, database):
+    form = fill_form(database, "form", [["Q_Next"], ["Yes"], ["A"]])
+    scripted_client.answer = lambda template, bindings: [{"id": "exists"}]
+    assert not database.save_answers_batched(form, [])
+    assert len(scripted_client.submitted) == 1
+
+
+def test_failed_edges_remove_the_nodes_and_raise(scripted_client, database):
+    form = fill_form(database, "form", [["Q_Next"], ["Yes"], ["A"]])
+    scripted_client.answer = (
+        lambda template, bindings: []
+        if template == NODE_EXIST_QUERY or ".addE(" in template or "drop()" in template
+        else [{"id": "created"}]
+    )
+    with pytest.raises(RuntimeError):
+        database.save_answers_batched(form, [])
+    drop_template, drop_bindings = scripted_client.submitted[-1]
+    assert drop_template.endswith(".drop()")
+    assert sorted(drop_bindings.values()) == sorted(
+        f"user-answer{question_id}-form" for question_id in ("1", "2", "3", "4")
+    )
@@ -0,0 +1,62 @@
+"""
+Tests of the graph files (one GraphSON element by line) and of DbGestion.save_graph, which streams the graph page by
+page into a graph file
+"""
+import json
+import os
+
+import pytest
+from conftest import small_graph_elements
+
+from ai_sustainability.package_data_access.db_gestion import DbGestion, export_filters
+from ai_sustainability.package_data_access.graph_file import (
+    open_graph_file,
+    read_graph_file,
+    write_graph_elements,
+)
+
+
+@pytest.mark.parametrize("file_name", ["graph.ndjson", "graph.ndjson.gz"])
+def test_graph_file_round_trip(tmp_path, file_name):
+    vertices, edges = small_graph_elements()
+    path = str(tmp_path / file_name)
+    with open_graph_file(path, "w") as file:
+        assert write_graph_elements(file, vertices + edges) == 10
+    assert read_graph_file(path) == (vertices, edges)
+
+
+def test_graph_file_of_the_previous_format_is_read(tmp_path):
+    vertices, edges = small_graph_elements()
+    path = tmp_path / "data_weight.json"
+    path.write_text(json.dumps([vertices, edges], indent=4), encoding="utf-8")
+    assert read_graph_file(str(path)) == (vertices, edges)
+
+
+def graph_pages(template: str, bindings: dict) -> list:
+    """Answer the page queries of save_graph with the elements of the small question graph"""
+    vertices, edges = small_graph_elements()
+    elements = sorted(vertices if template.startswith("g.V()") else edges, key=lambda element: element["id"])
+    return [element for element in elements if element["id"] > bindings["cursor"]][: bindings["page_size"]]
+
+
+@pytest.mark.parametrize("page_size", [1, 2, 3, 100])
+def test_graph_is_saved_page_by_page(scripted_client, tmp_path, page_size):
+    scripted_client.answer = graph_pages
+    path = str(tmp_path / "graph.ndjson.gz")
+    assert DbGestion("endpoint", "database", "container", "key").save_graph(path, page_size=page_size) == (4, 6)
+    vertices, edges = read_graph_file(path)
+    assert [vertex["id"] for vertex in vertices] == ["1", "2", "3", "4"]
+    assert [edge["id"] for edge in edges] == sorted(edge["id"] for edge in small_graph_elements()[1])
+    assert len(scripted_client.submitted) == 4 // page_size + 1 + 6 // page_size + 1
+    assert os.listdir(tmp_path) == ["graph.ndjson.gz"]
+
+
+def test_export_scopes():
+    assert export_filters("all") == ("", "", {})
+    vertex_filter, edge_filter, bindings = export_filters("questions")
+    assert vertex_filter == ".has('partitionKey', partition_key)"
+    assert edge_filter.startswith(".hasLabel(edge_label0")
+    assert bindings["partition_key"] == "Questions"
+    assert export_filters("answers")[0] == ".not(has('partitionKey', partition_key))"
+    with pytest.raises(ValueError):
+        export_filters("forms")
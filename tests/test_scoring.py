@@ -0,0 +1,57 @@
+"""
+Tests of the scores of the AIs in log-space (top_k, best_ais_from_log_scores) and of the log-scores of a Form kept up
+to date incrementally (Form.update_log_scores)
+"""
+import dataclasses
+
+import numpy as np
+import pytest
+from conftest import LIST_AI, fill_form
+
+from ai_sustainability.package_business.scoring import (
+    answers_log_scores,
+    best_ais_from_log_scores,
+    top_k,
+)
+
+
+@pytest.mark.parametrize("nb_best", [0, 1, 2, 3, 5])
+def test_top_k_is_the_start_of_a_stable_sort(nb_best):
+    scores = np.array([0.5, 2.0, 0.5, 1.0, 2.0])
+    np.testing.assert_array_equal(top_k(scores, nb_best), np.argsort(-scores, kind="stable")[:nb_best])
+
+
+def test_top_k_keeps_the_ties_in_the_order_of_the_indexes():
+    np.testing.assert_array_equal(top_k(np.array([1.0, 3.0, 1.0, 1.0]), 3), [1, 0, 2])
+
+
+def test_best_ais_have_a_positive_score():
+    log_scores = answers_log_scores([[1.0, 0.5, 0.0], [0.5, np.nan, 1.0]], 3)
+    assert best_ais_from_log_scores(log_scores, LIST_AI, 3) == [("AI1", pytest.approx(0.5))]
+
+
+def test_equal_products_are_ranked_in_the_order_of_the_ais():
+    log_scores = answers_log_scores([[0.1, 0.3, 0.5], [0.3, 0.1, 0.06]], 3)
+    assert [name for name, _ in best_ais_from_log_scores(log_scores, LIST_AI, 2)] == ["AI1", "AI2"]
+
+
+def test_form_best_ais_are_the_products_of_the_coefficients(in_memory_db):
+    form = fill_form(in_memory_db, "form", [["Q_Next"], ["Yes"], ["A", "C"]])
+    best_ais = form.calcul_best_ais(3, LIST_AI)
+    assert [name for name, _ in best_ais] == ["AI1", "AI2"]
+    assert [score for _, score in best_ais] == pytest.approx([1.0, 0.125])
+
+
+def test_changed_answer_is_replaced_in_the_log_scores(in_memory_db):
+    form = fill_form(in_memory_db, "form", [["Q_Next"], ["Yes"], ["A", "C"]])
+    form.update_log_scores(3)
+    form.question_list[2].choosen_answers = [in_memory_db.get_question_graph().answers["3-4-2"]]
+    np.testing.assert_allclose(form.update_log_scores(3), dataclasses.replace(form).update_log_scores(3), atol=1e-12)
+
+
+def test_dropped_questions_are_removed_from_the_log_scores(in_memory_db):
+    form = fill_form(in_memory_db, "form", [["Q_Next"], ["Yes"], ["A", "C"]])
+    form.update_log_scores(3)
+    form.add_answers([in_memory_db.get_question_graph().answers["2-3-2"]], 2)
+    assert len(form.question_list) == 2
+    np.testing.assert_allclose(form.update_log_scores(3), answers_log_scores([[0.5, 1.0, 1.0]], 3), atol=1e-12)
@@ -0,0 +1,63 @@
+"""
+Tests of the WeightMatrix compiled in a npz file next to the weight matrix excel file
+"""
+import os
+
+import numpy as np
+import pytest
+
+from ai_sustainability.package_data_access.weight_matrix import SourceStamp, WeightMatrix
+
+
+@pytest.fixture
+def matrix_path(tmp_path) -> str:
+    """A stand-in for the excel file : it is never parsed while its compiled npz file is up to date"""
+    path = tmp_path / "Weight_matrix.xlsx"
+    path.write_bytes(b"not an excel file")
+    return str(path)
+
+
+def compile_matrix(matrix_path: str) -> WeightMatrix:
+    weight_matrix = WeightMatrix(
+        edge_ids=("2-3-1", "2-3-2"),
+        list_ai=("AI1", "AI2"),
+        coefficients=np.array([[1.0, 0.5], [0.25, 1.0]]),
+        metrics=("accuracy", ""),
+        source=SourceStamp.of_file(matrix_path, with_sha256=True),
+    )
+    weight_matrix.save_npz(f"{os.path.splitext(matrix_path)[0]}.npz")
+    return weight_matrix
+
+
+def test_npz_round_trip(matrix_path):
+    compiled = compile_matrix(matrix_path)
+    loaded = WeightMatrix.from_npz(f"{os.path.splitext(matrix_path)[0]}.npz")
+    assert (loaded.edge_ids, loaded.list_ai, loaded.metrics, loaded.source) == (
+        compiled.edge_ids,
+        compiled.list_ai,
+        compiled.metrics,
+        compiled.source,
+    )
+    np.testing.assert_array_equal(loaded.row("2-3-2"), [0.25, 1.0])
+    assert loaded.metric("2-3-1") == "accuracy" and loaded.metric("2-3-2") is None
+    assert loaded.coef_string("2-3-1", compact=False) == "1.0, 0.5"
+    assert loaded.list_ai_string() == "AI1, AI2"
+
+
+def test_up_to_date_npz_is_loaded_without_parsing_the_excel_file(matrix_path):
+    compile_matrix(matrix_path)
+    assert WeightMatrix.load(matrix_path).edge_ids == ("2-3-1", "2-3-2")
+
+
+def test_touched_excel_file_is_not_parsed_again(matrix_path):
+    compile_matrix(matrix_path)
+    stat = os.stat(matrix_path)
+    os.utime(matrix_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    loaded = WeightMatrix.load(matrix_path)
+    assert loaded.source.mtime_ns == stat.st_mtime_ns + 10**9
+    assert WeightMatrix.from_npz(f"{os.path.splitext(matrix_path)[0]}.npz").source == loaded.source
+
+
+def test_coefficients_are_read_only(matrix_path):
+    with pytest.raises(ValueError):
+        compile_matrix(matrix_path).coefficients[0, 0] = 2.0